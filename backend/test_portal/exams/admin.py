@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Course, Question, TestSession,GroupTest, Material
+from .models import Course, Question, TestSession,GroupTest, Material, OutboxEmail
 
 
 
@@ -40,4 +40,11 @@ class QuestionAdmin(admin.ModelAdmin):
 class TestSessionAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'course', 'start_time', 'end_time', 'score')
     list_filter = ('course', 'user')
-    readonly_fields = ('start_time', 'end_time', 'score')
\ No newline at end of file
+    readonly_fields = ('start_time', 'end_time', 'score')
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'recipient', 'group_test', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('recipient',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
@@ -0,0 +1,220 @@
+# exams/async_views.py
+"""
+Async versions of the busiest exam endpoints: start-test, submit-test and
+group-test/<pk>/.  DRF views always run in the ASGI server's thread pool;
+these are plain Django async views, so a worker keeps serving other
+requests while one waits on the database.  Reads use the async ORM;
+writes that need a transaction (scoring, the first group test join) run
+through sync_to_async, as Django's async ORM cannot open transactions.
+
+Responses match the DRF views.  Routed instead of them when
+settings.ASYNC_EXAM_VIEWS is on (see exams/urls.py).
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from . import papers, progress
+from .models import Course, GroupTest, TestSession
+from .sampling import NotEnoughQuestions, asample_questions
+from .scoring import record_score, score_answers, session_result
+from .serializers import QuestionSerializer
+from .views import parse_flag
+
+jwt_authentication = JWTAuthentication()
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=DjangoJSONEncoder)
+
+
+async def authenticate(request):
+    """
+    Async counterpart of simplejwt's JWTAuthentication: the token is checked
+    in-process and the user is loaded with the async ORM.  Returns None for
+    a missing header; raises AuthenticationFailed for a bad token or user.
+    """
+    header = jwt_authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = jwt_authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = jwt_authentication.get_validated_token(raw_token)
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        raise AuthenticationFailed('Given token not valid for any token type')
+    user = await User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+    if user is None:
+        raise AuthenticationFailed('User not found')
+    if not user.is_active:
+        raise AuthenticationFailed('User is inactive')
+    return user
+
+
+def jwt_required(view):
+    """Authenticate like the DRF views and reply 401 as DRF would."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await authenticate(request)
+        except AuthenticationFailed as e:
+            return json_response({'detail': str(e.detail)}, status=401)
+        if user is None:
+            return json_response(
+                {'detail': 'Authentication credentials were not provided.'}, status=401
+            )
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return csrf_exempt(wrapper)
+
+
+def request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+    return request.POST
+
+
+def session_data(session, questions):
+    """TestSessionSerializer's fields for a session with loaded questions."""
+    return {
+        'id': session.id,
+        'user': session.user_id,
+        'course': session.course_id,
+        'questions': QuestionSerializer(questions, many=True).data,
+        'start_time': session.start_time,
+        'end_time': session.end_time,
+        'score': session.score,
+        'duration': session.duration,
+        'question_count': session.question_count,
+    }
+
+
+@require_POST
+@jwt_required
+async def start_test(request):
+    data = request_data(request)
+    if data is None:
+        return json_response({'detail': 'JSON parse error'}, status=400)
+    try:
+        count = int(data.get('question_count', 0))
+        duration = int(data.get('duration', 0))
+    except (TypeError, ValueError):
+        return json_response({'error': 'question_count and duration must be integers.'}, status=400)
+
+    course = await Course.objects.filter(id=data.get('course_id')).afirst()
+    if course is None:
+        return json_response({'detail': 'No Course matches the given query.'}, status=404)
+
+    try:
+        chosen = await asample_questions(course, count)
+    except NotEnoughQuestions:
+        return json_response({'error': 'Not enough questions in this course.'}, status=400)
+
+    session = await TestSession.objects.acreate(
+        user=request.user,
+        course=course,
+        duration=duration,
+        question_count=len(chosen)
+    )
+    through = TestSession.questions.through
+    await through.objects.abulk_create(
+        through(testsession_id=session.id, question_id=q.id) for q in chosen
+    )
+    return json_response(session_data(session, chosen), status=201)
+
+
+@require_POST
+@jwt_required
+async def submit_test(request, session_id):
+    data = request_data(request)
+    if data is None:
+        return json_response({'detail': 'JSON parse error'}, status=400)
+    session = await TestSession.objects.filter(
+        id=session_id, user=request.user
+    ).select_related('user', 'course').afirst()
+    if session is None:
+        return json_response({'detail': 'No TestSession matches the given query.'}, status=404)
+
+    answers = data.get('answers', {})
+    include_questions = parse_flag(data.get('include_questions', True))
+    if include_questions:
+        # One query serves both the answer key and the response
+        questions = [q async for q in session.questions.all()]
+        key = [(q.id, q.correct_option) for q in questions]
+    else:
+        key = [row async for row in session.questions.order_by().values_list('id', 'correct_option')]
+
+    await sync_to_async(record_score)(session, score_answers(key, answers))
+    if session.group_test_id:
+        await progress.anotify_changed(session.group_test_id)
+
+    if not include_questions:
+        return json_response(session_result(session))
+    return json_response(session_data(session, questions))
+
+
+async def _existing_join(group_test, user):
+    # Async version of papers.existing_session for the common case of a
+    # cached paper; anything else falls back to the sync path.
+    row = await TestSession.objects.filter(
+        group_test=group_test, user=user
+    ).values_list('id', 'paper__variant').afirst()
+    if row is None or row[1] is None:
+        return None
+    paper = await cache.aget(papers.CACHE_KEY.format(group_test.id, row[1]))
+    if paper is None:
+        return None
+    return row[0], paper
+
+
+@require_GET
+@jwt_required
+async def group_test_detail(request, pk):
+    group_test = await GroupTest.objects.select_related('course').filter(pk=pk).afirst()
+    if group_test is None:
+        return json_response({'detail': 'No GroupTest matches the given query.'}, status=404)
+
+    data = {
+        'id': group_test.id,
+        'name': group_test.name,
+        'course': {
+            'id': group_test.course.id,
+            'name': group_test.course.name
+        },
+        'question_count': group_test.question_count,
+        'duration_minutes': group_test.duration_minutes,
+        'scheduled_start': group_test.scheduled_start,
+    }
+
+    if timezone.now() >= group_test.scheduled_start:
+        joined = await _existing_join(group_test, request.user)
+        if joined is None:
+            try:
+                joined = await sync_to_async(papers.join)(group_test, request.user)
+            except NotEnoughQuestions:
+                return json_response({'error': 'Not enough questions in this course.'}, status=400)
+        session_id, paper = joined
+        data['questions'] = paper['questions']
+        data['session_id'] = session_id
+    else:
+        data['questions'] = []
+        data['session_id'] = None
+
+    return json_response(data)
@@ -0,0 +1,81 @@
+# exams/blob_cache.py
+"""
+Per-process caches in front of the bucket, keyed by blob name:
+
+* `metadata` holds {'exists', 'size', 'content_type'} for
+  BLOB_CACHE_SECONDS.  Storage fills it when it writes a blob, so a fresh
+  upload never needs a lookup; misses cost one GET of the blob.
+* `signed_urls` holds signed download URLs until GCS_SIGNED_URL_REFRESH_SECONDS
+  before they expire, so a listing reuses URLs instead of signing per row.
+
+Both are LRUs capped at BLOB_CACHE_MAX_ENTRIES.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class TTLCache:
+    """Thread-safe LRU whose entries each expire after their own TTL."""
+
+    def __init__(self, max_entries, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+metadata = TTLCache(settings.BLOB_CACHE_MAX_ENTRIES)
+signed_urls = TTLCache(settings.BLOB_CACHE_MAX_ENTRIES)
+
+
+def remember(name, exists=True, size=None, content_type=None):
+    metadata.set(name, {
+        'exists': exists,
+        'size': size,
+        'content_type': content_type,
+    }, settings.BLOB_CACHE_SECONDS)
+
+
+def remember_blob(blob):
+    remember(blob.name, size=blob.size, content_type=blob.content_type)
+
+
+def forget(name):
+    metadata.delete(name)
+    signed_urls.delete(name)
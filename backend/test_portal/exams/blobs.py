@@ -0,0 +1,175 @@
+# exams/blobs.py
+"""
+Content-addressed material files.  Uploads are hashed while they stream
+(HashingUploadHandler); a file whose SHA-256 is already in the bucket is
+not transferred again and the new Material points at the existing
+StoredBlob.  exams/signals.py keeps StoredBlob.ref_count in step with the
+materials that point at a blob and deletes the object when none are left.
+
+Files that arrive without a trusted hash (resumable uploads, materials
+from before this) are hashed from storage by adopt(): see the
+`material_preview` job and `manage.py dedup_materials`.
+"""
+import hashlib
+import os
+
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from .models import Material, StoredBlob
+
+READ_CHUNK = 1024 * 1024
+
+
+def blob_name(sha256, filename=''):
+    # Keep the extension so content types still work when serving locally
+    ext = os.path.splitext(filename)[1].lower()[:16]
+    return f'blobs/{sha256[:2]}/{sha256}{ext}'
+
+
+def storage():
+    return Material._meta.get_field('file').storage
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Pass-through handler that hashes each uploaded file as its chunks go
+    by.  Put it first in request.upload_handlers; the digest and size end
+    up in request.upload_hashes[field_name].
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+        if not hasattr(self.request, 'upload_hashes'):
+            self.request.upload_hashes = {}
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.request.upload_hashes[self.field_name] = (self.hasher.hexdigest(), file_size)
+        return None
+
+
+def hash_stored_file(name):
+    """SHA-256 and size of an object already in storage, read in chunks."""
+    hasher = hashlib.sha256()
+    size = 0
+    with storage().open(name, 'rb') as f:
+        for block in iter(lambda: f.read(READ_CHUNK), b''):
+            hasher.update(block)
+            size += len(block)
+    return hasher.hexdigest(), size
+
+
+def existing(sha256, size=None):
+    """The blob with this content, locked until the transaction ends."""
+    blobs = StoredBlob.objects.select_for_update().filter(sha256=sha256)
+    if size is not None:
+        blobs = blobs.filter(size=size)
+    return blobs.first()
+
+
+def store(uploaded_file, sha256, size):
+    """
+    StoredBlob for an uploaded file, uploading it only if its content is
+    new.  Call inside a transaction that also saves the Material, so the
+    blob can't be released in between.
+    """
+    blob = existing(sha256, size)
+    if blob is not None:
+        return blob
+    name = storage().save(blob_name(sha256, uploaded_file.name), uploaded_file)
+    try:
+        with transaction.atomic():
+            return StoredBlob.objects.create(
+                sha256=sha256,
+                name=name,
+                size=size,
+                content_type=getattr(uploaded_file, 'content_type', '') or '',
+            )
+    except IntegrityError:
+        # A concurrent upload of the same content created the blob first
+        blob = existing(sha256)
+        if blob is None:
+            raise
+    if name != blob.name:
+        storage().delete(name)
+    return blob
+
+
+def acquire(blob_id):
+    StoredBlob.objects.filter(pk=blob_id).update(ref_count=F('ref_count') + 1)
+
+
+def release(blob_id):
+    """Drop one reference; the last one deletes the object after commit."""
+    with transaction.atomic():
+        blob = StoredBlob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+        remaining = blob.ref_count - 1
+        if remaining <= 0:
+            # Trust the rows over a counter that may have drifted
+            remaining = Material.objects.filter(blob_id=blob_id).count()
+        if remaining:
+            StoredBlob.objects.filter(pk=blob_id).update(ref_count=remaining)
+            return
+        names = [n for n in (blob.name, blob.thumbnail) if n]
+        blob.delete()
+
+    def delete_objects():
+        for name in names:
+            storage().delete(name)
+    transaction.on_commit(delete_objects)
+
+
+def adopt(material):
+    """
+    Content-address a material whose file was stored without a hash.  A
+    duplicate is repointed at the existing blob and its own object is
+    deleted; otherwise the object becomes a new blob where it is.  Returns
+    the number of bytes freed.
+    """
+    if material.blob_id is not None:
+        return 0
+    old_name = material.file.name
+    sha256, size = hash_stored_file(old_name)
+    with transaction.atomic():
+        material = Material.objects.select_for_update().get(pk=material.pk)
+        if material.blob_id is not None:
+            return 0
+        blob = existing(sha256, size)
+        duplicate = blob is not None
+        if not duplicate:
+            blob = StoredBlob.objects.create(sha256=sha256, name=old_name, size=size)
+        material.blob = blob
+        material.file.name = blob.name
+        material.save(update_fields=['blob', 'file'])
+    if duplicate and old_name != blob.name:
+        transaction.on_commit(lambda: storage().delete(old_name))
+        return size
+    return 0
+
+
+def link(material_fields, sha256, size):
+    """
+    Create a Material pointing at an existing blob with this content, or
+    return None.  Used when the client sends the hash before uploading, so
+    the transfer can be skipped.  The client hasn't shown it holds the
+    file, so only a blob already behind a material of the same uploader
+    or course is reused; other copies are uploaded and merged by adopt().
+    """
+    with transaction.atomic():
+        blob = existing(sha256, size)
+        if blob is None:
+            return None
+        visible = Material.objects.filter(blob=blob).filter(
+            Q(uploaded_by=material_fields['uploaded_by']) | Q(course=material_fields['course'])
+        )
+        if not visible.exists():
+            return None
+        return Material.objects.create(blob=blob, file=blob.name, **material_fields)
@@ -0,0 +1,30 @@
+# exams/channel_layers.py
+"""
+In-process channel layer for single-process deployments and for exercising
+the chat without Redis.  Channels' InMemoryChannelLayer sweeps every
+channel and group membership for expired entries on each receive and
+group_send, which makes fan-out quadratic in the number of sockets; this
+layer runs the same sweep at most once per `sweep_interval` seconds.
+"""
+import time
+
+from channels.layers import InMemoryChannelLayer
+
+
+class LocalChannelLayer(InMemoryChannelLayer):
+
+    def __init__(self, sweep_interval=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+
+    def _clean_expired(self):
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        super()._clean_expired()
+
+    async def flush(self):
+        await super().flush()
+        self._next_sweep = 0.0
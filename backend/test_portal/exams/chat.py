@@ -0,0 +1,64 @@
+# exams/chat.py
+"""
+Backpressure for ChatConsumer: a per-connection token bucket, and
+process-wide counters of what was accepted, dropped, queued and sent so
+the CHAT_* settings can be tuned under load (see ChatMetricsAPIView).
+"""
+import os
+import time
+from collections import Counter
+
+
+class TokenBucket:
+    """Allow `rate` messages per second on average, bursts of `burst`."""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def consume(self, tokens=1):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
+
+
+class ChatMetrics:
+    """
+    Counters for this process.  Consumers all run on one event loop, so
+    plain integers are safe without locking.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counters = Counter()
+        self.queued = 0
+        self.max_queued = 0
+        self.started = time.time()
+
+    def incr(self, name, amount=1):
+        self.counters[name] += amount
+
+    def queue_changed(self, delta):
+        self.queued += delta
+        self.max_queued = max(self.max_queued, self.queued)
+
+    def snapshot(self):
+        return {
+            'pid': os.getpid(),
+            'since': self.started,
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            **self.counters,
+        }
+
+
+metrics = ChatMetrics()
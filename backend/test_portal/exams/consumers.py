@@ -1,23 +1,148 @@
+import asyncio
 import json
+from collections import deque
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from .chat import TokenBucket, metrics
+from .models import Course, GroupTest
+from .progress import ProgressHub
+
+# Kept for the dashboard's site-wide chat at ws/chat/
+LOBBY = 'lobby'
+ROOM_MODELS = {
+    'course': Course,
+    'group-test': GroupTest,
+}
+
+
+def room_group(kind, pk=None):
+    """Channel layer group of a chat room, e.g. 'chat.course.12'."""
+    if kind == LOBBY:
+        return 'chat.lobby'
+    return f'chat.{kind}.{pk}'
+
+
+@database_sync_to_async
+def room_exists(kind, pk):
+    return ROOM_MODELS[kind].objects.filter(pk=pk).exists()
+
 
 class ChatConsumer(AsyncWebsocketConsumer):
+    """
+    Chat for one room: the lobby, a course or a group test.  Messages only
+    fan out to the sockets of the same room.
+
+    Inbound frames over CHAT_MAX_FRAME_BYTES, malformed frames and frames
+    beyond the connection's token bucket are dropped with an error frame.
+    Outbound messages are queued (at most CHAT_MAX_QUEUED, oldest dropped
+    first) and flushed as one {'type': 'batch'} frame every CHAT_FLUSH_MS;
+    with CHAT_FLUSH_MS = 0 each message is sent on its own as before.
+    """
+
     async def connect(self):
-        await self.channel_layer.group_add('chat', self.channel_name)
+        kwargs = self.scope['url_route']['kwargs']
+        kind = kwargs.get('kind', LOBBY)
+        pk = kwargs.get('pk')
+        self.group_name = None
+        self.bucket = TokenBucket(settings.CHAT_RATE_PER_SECOND, settings.CHAT_RATE_BURST)
+        self.pending = deque()
+        self.flush_task = None
+        if kind != LOBBY and (kind not in ROOM_MODELS or not await room_exists(kind, pk)):
+            await self.close(code=4404)
+            return
+        self.group_name = room_group(kind, pk)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        metrics.incr('connections')
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard('chat', self.channel_name)
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+            metrics.incr('disconnections')
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+        metrics.queue_changed(-len(self.pending))
+        self.pending.clear()
+
+    async def reject(self, reason, error):
+        metrics.incr(f'dropped_{reason}')
+        await self.send(text_data=json.dumps({'type': 'error', 'error': error}))
+
+    async def receive(self, text_data=None, bytes_data=None):
+        metrics.incr('received')
+        if text_data is None:
+            return await self.reject('invalid', 'Send chat messages as JSON text.')
+        if len(text_data.encode('utf-8')) > settings.CHAT_MAX_FRAME_BYTES:
+            return await self.reject('oversize', 'Message too large.')
+        if not self.bucket.consume():
+            return await self.reject('rate_limited', 'Slow down: too many messages.')
+        try:
+            data = json.loads(text_data)
+            # Older clients send the body as 'text'
+            message = data.get('message', data.get('text', ''))
+        except (ValueError, AttributeError):
+            return await self.reject('invalid', 'Malformed message.')
 
-    async def receive(self, text_data):
-        data = json.loads(text_data)
+        metrics.incr('published')
         await self.channel_layer.group_send(
-            'chat',
-            {'type': 'chat.message', 'username': data['username'], 'message': data['message']}
+            self.group_name,
+            {'type': 'chat.message', 'username': data.get('username', ''), 'message': message}
         )
 
     async def chat_message(self, event):
-        await self.send(text_data=json.dumps({
-            'username': event['username'],
-            'message': event['message']
-        }))
\ No newline at end of file
+        payload = {'username': event['username'], 'message': event['message']}
+        if settings.CHAT_FLUSH_MS <= 0:
+            metrics.incr('frames_sent')
+            metrics.incr('messages_sent')
+            await self.send(text_data=json.dumps(payload))
+            return
+
+        if len(self.pending) >= settings.CHAT_MAX_QUEUED:
+            # A slow reader loses its oldest messages, not the room
+            self.pending.popleft()
+            metrics.queue_changed(-1)
+            metrics.incr('dropped_overflow')
+        self.pending.append(payload)
+        metrics.queue_changed(1)
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(settings.CHAT_FLUSH_MS / 1000)
+        self.flush_task = None
+        batch = list(self.pending)
+        self.pending.clear()
+        metrics.queue_changed(-len(batch))
+        if batch:
+            metrics.incr('frames_sent')
+            metrics.incr('messages_sent', len(batch))
+            await self.send(text_data=json.dumps({'type': 'batch', 'messages': batch}))
+
+
+@database_sync_to_async
+def get_group_test(pk):
+    return GroupTest.objects.filter(pk=pk).first()
+
+
+class GroupTestProgressConsumer(AsyncWebsocketConsumer):
+    """
+    Read-only feed of one group test: the start signal, a countdown clock
+    and batched submission progress (see exams/progress.py).  Replaces
+    polling group-test/<pk>/ until the test starts.
+    """
+
+    async def connect(self):
+        self.hub = None
+        group_test = await get_group_test(self.scope['url_route']['kwargs']['pk'])
+        if group_test is None:
+            await self.close(code=4404)
+            return
+        await self.accept()
+        self.hub = await ProgressHub.subscribe(group_test, self)
+
+    async def disconnect(self, close_code):
+        if self.hub is not None:
+            await self.hub.unsubscribe(self)
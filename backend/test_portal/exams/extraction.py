@@ -0,0 +1,163 @@
+# exams/extraction.py
+"""
+Text extraction for uploaded documents.  PDF pages are split across a
+process pool when one is given, and page text is streamed to the caller in
+order.  Extracted pages are memoized by the SHA-256 of the file content, so
+re-uploading the same past paper skips extraction entirely.
+"""
+import hashlib
+import io
+
+import PyPDF2
+from django.conf import settings
+from django.core.cache import caches
+from docx import Document
+
+from .parsing import DocumentError, SUPPORTED_EXTENSIONS
+
+CHUNK_SIZE = 1024 * 1024
+CACHE_KEY_PREFIX = 'extracted-pages:v1'
+
+
+def file_digest(source):
+    """SHA-256 of a path or file object, read in chunks and rewound after."""
+    digest = hashlib.sha256()
+    if hasattr(source, 'chunks'):
+        for chunk in source.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+        source.seek(0)
+    elif hasattr(source, 'read'):
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+        source.seek(0)
+    else:
+        with open(source, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _raw_file(source):
+    # Django's UploadedFile wraps the real file object
+    return getattr(source, 'file', source)
+
+
+def _extract_pdf_range(path, start, stop):
+    """Extract pages [start, stop) of the PDF at `path` (runs in a worker)."""
+    reader = PyPDF2.PdfReader(path)
+    return [reader.pages[index].extract_text() or '' for index in range(start, stop)]
+
+
+def _iter_pdf_pages(reader, path, executor, pages_per_task):
+    total = len(reader.pages)
+    if executor is None or path is None or total <= pages_per_task:
+        for page in reader.pages:
+            yield page.extract_text() or ''
+        return
+
+    # Each worker opens the file itself, so only page text crosses the
+    # process boundary.  Futures are consumed in submission order.
+    futures = [
+        executor.submit(_extract_pdf_range, path, start, min(start + pages_per_task, total))
+        for start in range(0, total, pages_per_task)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _iter_docx_pages(source, paragraphs_per_page=200):
+    doc = Document(source)
+    paragraphs = [para.text for para in doc.paragraphs]
+    for start in range(0, len(paragraphs), paragraphs_per_page):
+        yield "\n".join(paragraphs[start:start + paragraphs_per_page])
+
+
+def _iter_text_pages(handle, lines_per_page=500):
+    text = io.TextIOWrapper(handle, encoding='utf-8')
+    try:
+        lines = []
+        for line in text:
+            lines.append(line.rstrip('\r\n'))
+            if len(lines) >= lines_per_page:
+                yield "\n".join(lines)
+                lines = []
+        if lines:
+            yield "\n".join(lines)
+    finally:
+        # Leave the underlying file open for the caller
+        text.detach()
+
+
+class ExtractedPages:
+    """
+    Iterable of page texts for a PDF, DOCX or TXT document.  `source` is a
+    path or a file object; pass a process pool as `executor` to extract PDF
+    pages in parallel (paths only).  `total` is the page count once known.
+    """
+
+    def __init__(self, source, filename, executor=None, use_cache=True):
+        filename = filename.lower()
+        if not filename.endswith(SUPPORTED_EXTENSIONS):
+            raise DocumentError("Unsupported file format. Use PDF, DOCX, or TXT")
+        self.source = source
+        self.filename = filename
+        self.executor = executor
+        self.pages_per_task = settings.PDF_PAGES_PER_TASK
+        self.cache = caches[settings.EXTRACTION_CACHE] if use_cache else None
+        self.cache_key = None
+        self.cached = None
+        self.total = None
+
+        if self.cache is not None:
+            self.cache_key = f"{CACHE_KEY_PREFIX}:{file_digest(source)}"
+            self.cached = self.cache.get(self.cache_key)
+            if self.cached is not None:
+                self.total = len(self.cached)
+
+    @property
+    def from_cache(self):
+        return self.cached is not None
+
+    def __iter__(self):
+        if self.cached is not None:
+            yield from self.cached
+            return
+
+        path = self.source if isinstance(self.source, str) else None
+        handle = open(path, 'rb') if path else _raw_file(self.source)
+        handle.seek(0)
+        kind = self.filename.rsplit('.', 1)[-1]
+        extracted = []
+        try:
+            for page in self._pages(kind, handle, path):
+                extracted.append(page)
+                yield page
+        except DocumentError:
+            raise
+        except UnicodeDecodeError as e:
+            raise DocumentError(f"Text file processing error: {str(e)}")
+        except Exception as e:
+            raise DocumentError(f"{kind.upper()} processing error: {str(e)}")
+        finally:
+            if path:
+                handle.close()
+            else:
+                handle.seek(0)
+
+        if self.cache is not None:
+            # Only complete extractions are memoized
+            self.cache.set(self.cache_key, extracted, settings.EXTRACTION_CACHE_TIMEOUT)
+
+    def _pages(self, kind, handle, path):
+        if kind == 'pdf':
+            reader = PyPDF2.PdfReader(handle)
+            self.total = len(reader.pages)
+            return _iter_pdf_pages(reader, path, self.executor, self.pages_per_task)
+        if kind == 'docx':
+            return _iter_docx_pages(handle)
+        return _iter_text_pages(handle)
+
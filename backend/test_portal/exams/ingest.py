@@ -0,0 +1,98 @@
+# exams/ingest.py
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Question, question_text_hash
+
+OPTION_MAX_LENGTH = Question._meta.get_field('option_a').max_length
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_parsed_question(parsed):
+    """Return the reason a parsed question cannot be stored, or None."""
+    if not (parsed.get('text') or '').strip():
+        return "missing question text"
+    for letter in 'ABCD':
+        option = (parsed.get(letter) or '').strip()
+        if not option:
+            return f"missing option {letter}"
+        if len(option) > OPTION_MAX_LENGTH:
+            return f"option {letter} longer than {OPTION_MAX_LENGTH} characters"
+    if (parsed.get('answer') or '').upper() not in ('A', 'B', 'C', 'D'):
+        return "answer must be one of A-D"
+    return None
+
+
+def ingest_questions(course, parsed_questions, source_file=None,
+                     uploaded_by=None, batch_size=None):
+    """
+    Store parsed questions as pending questions of `course`.
+
+    Everything runs in one atomic block with one duplicate lookup and one
+    bulk INSERT per batch, so the cost grows with the number of batches
+    rather than the number of questions.  Questions whose normalized text
+    already exists in the course (or earlier in the same upload) are
+    skipped.  Returns inserted, duplicate and rejected counts.
+    """
+    batch_size = batch_size or settings.QUESTION_UPLOAD_BATCH_SIZE
+    report = {'inserted': 0, 'duplicates': 0, 'rejected': 0, 'errors': []}
+    seen = set()
+
+    with transaction.atomic():
+        for index, chunk in enumerate(_chunks(parsed_questions, batch_size)):
+            candidates = []
+            for offset, parsed in enumerate(chunk):
+                error = validate_parsed_question(parsed)
+                if error:
+                    report['rejected'] += 1
+                    report['errors'].append({
+                        'index': index * batch_size + offset,
+                        'line': parsed.get('line'),
+                        'error': error,
+                    })
+                    continue
+                candidates.append((question_text_hash(parsed['text']), parsed))
+
+            existing = set(
+                Question.objects.filter(
+                    course=course,
+                    text_hash__in={text_hash for text_hash, _ in candidates},
+                ).values_list('text_hash', flat=True)
+            )
+
+            rows = []
+            for text_hash, parsed in candidates:
+                if text_hash in existing or text_hash in seen:
+                    report['duplicates'] += 1
+                    continue
+                seen.add(text_hash)
+                rows.append(Question(
+                    course=course,
+                    question_text=parsed['text'].strip(),
+                    option_a=parsed['A'].strip(),
+                    option_b=parsed['B'].strip(),
+                    option_c=parsed['C'].strip(),
+                    option_d=parsed['D'].strip(),
+                    correct_option=parsed['answer'].upper(),
+                    source_file=source_file,
+                    status='pending',
+                    uploaded_by=uploaded_by,
+                    text_hash=text_hash,
+                ))
+
+            Question.objects.bulk_create(rows)
+            report['inserted'] += len(rows)
+
+    # Uploaded questions start as pending, so approved-id pools are
+    # unaffected until an admin approves them (which fires the signals).
+    return report
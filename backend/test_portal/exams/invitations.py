@@ -0,0 +1,75 @@
+# exams/invitations.py
+"""
+Group test invitees.  Each invited address is a GroupTestInvitee row, so
+"which group tests am I invited to?" reads the (email, ends_at) and
+(user, ends_at) indexes instead of substring-matching every
+GroupTest.invitees value.
+"""
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import GroupTestInvitee
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def invite(group_test, emails):
+    """
+    Record the invitees of a group test, linking registered users by
+    email.  Returns the distinct normalized addresses.
+    """
+    addresses = list(dict.fromkeys(
+        normalize_email(e) for e in emails if normalize_email(e)
+    ))
+    users = dict(
+        User.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=addresses)
+        .order_by('-id')
+        .values_list('email_lower', 'id')
+    )
+    ends_at = group_test.ends_at
+    GroupTestInvitee.objects.bulk_create(
+        (
+            GroupTestInvitee(
+                group_test=group_test,
+                email=email,
+                user_id=users.get(email),
+                ends_at=ends_at,
+            )
+            for email in addresses
+        ),
+        ignore_conflicts=True
+    )
+    return addresses
+
+
+def _for_user(user):
+    lookup = Q(user=user)
+    email = normalize_email(user.email)
+    if email:
+        lookup |= Q(email=email)
+    return GroupTestInvitee.objects.filter(lookup)
+
+
+def current_for(user, now=None):
+    """The user's invitations to group tests that have not ended yet."""
+    now = now or timezone.now()
+    return _for_user(user).filter(ends_at__gt=now)
+
+
+def mark_joined(group_test, user):
+    """Flag the user's invitation as joined and link it to the account."""
+    _for_user(user).filter(group_test=group_test, status='invited').update(
+        status='joined', user=user
+    )
+
+
+def reschedule(group_test):
+    """Copy a changed start time or duration onto the invitee rows."""
+    GroupTestInvitee.objects.filter(group_test=group_test).exclude(
+        ends_at=group_test.ends_at
+    ).update(ends_at=group_test.ends_at)
@@ -0,0 +1,149 @@
+# exams/jobs.py
+"""
+Database-backed job queue.  Views enqueue BackgroundJob rows and return
+right away; `manage.py run_jobs` claims them and runs the registered
+handler, handing CPU-bound steps to a process pool.
+
+A claim is a lease of JOB_LEASE_SECONDS from started_at.  A job still
+running past it lost its worker and is claimed again, up to
+JOB_MAX_ATTEMPTS claims; then it fails and its uploaded file is deleted.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+# Uploaded files waiting for a worker.  Workers must share this directory
+# with the web processes.
+upload_storage = FileSystemStorage(location=settings.JOB_UPLOAD_DIR)
+
+
+def job_handler(kind):
+    """Register `func(job, context)` as the handler for jobs of `kind`."""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+class JobContext:
+    """What a handler gets besides its job: the process pool and progress."""
+
+    def __init__(self, job, executor):
+        self.job = job
+        self.executor = executor
+
+    def run_in_pool(self, func, *args):
+        """Run a picklable, database-free function in the process pool."""
+        if self.executor is None:
+            return func(*args)
+        return self.executor.submit(func, *args).result()
+
+    def report_progress(self, progress):
+        progress = max(0, min(100, int(progress)))
+        self.job.progress = progress
+        BackgroundJob.objects.filter(
+            pk=self.job.pk, status='running', started_at=self.job.started_at
+        ).update(progress=progress)
+
+
+def enqueue(kind, payload, user=None):
+    if kind not in HANDLERS:
+        raise ValueError(f"No handler registered for job kind '{kind}'")
+    return BackgroundJob.objects.create(kind=kind, payload=payload, created_by=user)
+
+
+def claim_next():
+    """
+    Atomically claim the oldest queued job, or running job whose lease ran
+    out, and return it.  The conditional UPDATE makes concurrent workers
+    race safely on any database.
+    """
+    while True:
+        now = timezone.now()
+        expired = Q(status='running', started_at__lt=now - timedelta(seconds=settings.JOB_LEASE_SECONDS))
+        job = BackgroundJob.objects.filter(Q(status='queued') | expired).order_by('created_at', 'id').first()
+        if job is None:
+            return None
+        if job.status == 'running' and job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            abandon(job)
+            continue
+        claimed = BackgroundJob.objects.filter(
+            pk=job.pk, status=job.status, started_at=job.started_at
+        ).update(status='running', started_at=now, attempts=F('attempts') + 1)
+        if claimed:
+            if job.status == 'running':
+                logger.warning("Job %s lost its worker; running it again", job.pk)
+            job.status = 'running'
+            job.started_at = now
+            job.attempts += 1
+            return job
+
+
+def abandon(job):
+    """Fail a job whose workers kept dying, and drop its uploaded file."""
+    failed = BackgroundJob.objects.filter(
+        pk=job.pk, status='running', started_at=job.started_at
+    ).update(
+        status='failed',
+        error=f"Worker lost {job.attempts} times; giving up",
+        finished_at=timezone.now(),
+    )
+    if failed:
+        logger.error("Job %s abandoned after %s attempts", job.pk, job.attempts)
+        if job.payload.get('stored_name'):
+            upload_storage.delete(job.payload['stored_name'])
+
+
+def run_job(job, executor=None):
+    handler = HANDLERS.get(job.kind)
+    context = JobContext(job, executor)
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for job kind '{job.kind}'")
+        job.result = handler(job, context)
+        job.status = 'done'
+        job.progress = 100
+    except Exception as e:
+        logger.exception("Job %s failed", job.pk)
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    # Only while this worker still holds the lease; past it the job may
+    # have been claimed again, and the newer run's outcome stands
+    saved = BackgroundJob.objects.filter(
+        pk=job.pk, status='running', started_at=job.started_at
+    ).update(
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        progress=job.progress,
+        finished_at=job.finished_at,
+    )
+    if not saved:
+        logger.warning("Job %s finished after losing its lease; outcome dropped", job.pk)
+    return job
+
+
+def run_worker(executor=None, once=False, poll_interval=1.0):
+    """Claim and run jobs until the queue is empty (once) or forever."""
+    while True:
+        close_old_connections()
+        job = claim_next()
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        run_job(job, executor)
@@ -0,0 +1,139 @@
+# exams/leaderboard.py
+"""
+Materialized leaderboard.  Every scored TestSession has one
+LeaderboardEntry, written when the session is scored, so reading the top N
+is an index range scan of N rows instead of sorting the whole session table.
+Deleting sessions does not adjust the per-user aggregates; run
+`manage.py rebuild_leaderboard` after bulk clean-ups.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import ranking
+from .models import LeaderboardEntry, TestSession
+
+ORDERING = ('-score_percentage', 'id')
+MAX_LIMIT = 100
+WINDOWS = ('day', 'week', 'all')
+
+
+def period_fields(finished_at):
+    """
+    The day and week (from Monday) a session finished in, in the project
+    time zone.  Day and week boards select on these by equality, so each
+    is one index range read.
+    """
+    if finished_at is None:
+        return {'day': None, 'week_start': None}
+    day = timezone.localtime(finished_at).date()
+    return {'day': day, 'week_start': day - timedelta(days=day.weekday())}
+
+
+def _entry_fields(session):
+    return {
+        'user_id': session.user_id,
+        'course_id': session.course_id,
+        'username': session.user.username,
+        'course_name': session.course.name,
+        'score': session.score,
+        'question_count': session.question_count,
+        'score_percentage': session.score * 100.0 / session.question_count,
+        'finished_at': session.end_time,
+        **period_fields(session.end_time),
+    }
+
+
+def is_rankable(session):
+    return session.score is not None and session.question_count > 0
+
+
+def record_session(session):
+    """
+    Insert or refresh the leaderboard entry of a scored session and move
+    the user's score aggregate by the difference, so resubmitting a session
+    is not counted twice.  The session row is locked first, so concurrent
+    submissions of one session read the previous totals in turn.
+    """
+    with transaction.atomic():
+        TestSession.objects.select_for_update().only('id').get(pk=session.pk)
+        previous = LeaderboardEntry.objects.filter(
+            session_id=session.id
+        ).values_list('score', 'question_count').first() or (0, 0)
+
+        entry = None
+        if is_rankable(session):
+            entry, _ = LeaderboardEntry.objects.update_or_create(
+                session_id=session.id, defaults=_entry_fields(session)
+            )
+            current = (session.score, session.question_count)
+        else:
+            LeaderboardEntry.objects.filter(session_id=session.id).delete()
+            current = (0, 0)
+
+        ranking.apply_delta(
+            session.user_id, current[0] - previous[0], current[1] - previous[1]
+        )
+    return entry
+
+
+def top(limit=10, course_id=None, window='all'):
+    """Return the best `limit` entries, globally or for one course."""
+    return entries(course_id, window).order_by(*ORDERING)[:min(limit, MAX_LIMIT)]
+
+
+def window_filter(window, now=None):
+    """
+    Lookup selecting the current board of a window: today's or this week's
+    entries, or every entry for all-time.
+    """
+    if window not in WINDOWS:
+        raise ValueError(f"window must be one of {', '.join(WINDOWS)}")
+    if window == 'all':
+        return {}
+    current = period_fields(now or timezone.now())
+    if window == 'day':
+        return {'day': current['day']}
+    return {'week_start': current['week_start']}
+
+
+def entries(course_id=None, window='all', now=None):
+    """Entries of one board, unordered; callers order and slice by index."""
+    queryset = LeaderboardEntry.objects.filter(**window_filter(window, now))
+    if course_id is not None:
+        queryset = queryset.filter(course_id=course_id)
+    return queryset
+
+
+def serialize_entry(entry):
+    """The payload LeaderboardAPIView has always returned, per row."""
+    return {
+        'id': entry.session_id,
+        'user': {'username': entry.username},
+        'course': {'id': entry.course_id, 'name': entry.course_name},
+        'score': entry.score,
+        'question_count': entry.question_count,
+        'score_percentage': entry.score_percentage,
+    }
+
+
+def rebuild(batch_size=2000):
+    """Recreate every entry from the scored sessions; returns the count."""
+    LeaderboardEntry.objects.all().delete()
+    sessions = TestSession.objects.filter(
+        score__isnull=False, question_count__gt=0
+    ).select_related('user', 'course').order_by('id')
+
+    created = 0
+    batch = []
+    for session in sessions.iterator(chunk_size=batch_size):
+        batch.append(LeaderboardEntry(session_id=session.id, **_entry_fields(session)))
+        if len(batch) >= batch_size:
+            LeaderboardEntry.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        LeaderboardEntry.objects.bulk_create(batch)
+        created += len(batch)
+    return created
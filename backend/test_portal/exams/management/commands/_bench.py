@@ -0,0 +1,50 @@
+# Shared helpers for the benchmark management commands.
+import time
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Run the block inside a transaction that is always rolled back."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+
+class QueryCounter:
+    """Counts queries issued on the default connection while installed."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def timed(fn, repeat=5):
+    """
+    Call `fn` `repeat` times and return (best seconds, queries per call).
+    """
+    best = None
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    return best, counter.count / max(repeat, 1)
+
+
+def parse_sizes(value):
+    return [int(v) for v in value.split(',') if v.strip()]
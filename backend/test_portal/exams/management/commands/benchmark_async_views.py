@@ -0,0 +1,129 @@
+import asyncio
+import json
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from exams import async_views, papers
+from exams.models import Course, GroupTest, Question, TestSession, question_text_hash
+from exams.views import GroupTestDetailAPIView, StartTestAPIView
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync DRF views with exams/async_views.py under concurrent "
+        "load on one event loop, dispatched the way Django's ASGI handler does "
+        "(sync views through the single thread-sensitive executor).  Rows are "
+        "committed and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--questions', type=int, default=40)
+
+    def handle(self, *args, **options):
+        course, group_test, users = self.populate(options)
+        try:
+            asyncio.run(self.compare(course, group_test, users, options))
+        finally:
+            TestSession.objects.filter(user__in=users).delete()
+            group_test.delete()
+            User.objects.filter(pk__in=[u.pk for u in users]).delete()
+            course.delete()
+
+    async def compare(self, course, group_test, users, options):
+        factory = AsyncRequestFactory()
+        tokens = [str(RefreshToken.for_user(u).access_token) for u in users]
+        start_body = json.dumps({
+            'course_id': course.id,
+            'question_count': options['questions'],
+            'duration': 1800,
+        })
+
+        def detail_request(i):
+            return factory.get(
+                f'/api/group-test/{group_test.pk}/',
+                headers={'Authorization': f'Bearer {tokens[i % len(tokens)]}'},
+            )
+
+        def start_request(i):
+            return factory.post(
+                '/api/start-test/', start_body, content_type='application/json',
+                headers={'Authorization': f'Bearer {tokens[i % len(tokens)]}'},
+            )
+
+        sync_detail = GroupTestDetailAPIView.as_view()
+        sync_start = StartTestAPIView.as_view()
+        cases = [
+            ('group-test detail', 'sync', lambda i: sync_to_async(sync_detail)(detail_request(i), pk=group_test.pk)),
+            ('group-test detail', 'async', lambda i: async_views.group_test_detail(detail_request(i), pk=group_test.pk)),
+            ('start-test', 'sync', lambda i: sync_to_async(sync_start)(start_request(i))),
+            ('start-test', 'async', lambda i: async_views.start_test(start_request(i))),
+        ]
+        for endpoint, label, call in cases:
+            seconds, latencies, failures = await self.load(
+                call, options['requests'], options['concurrency']
+            )
+            latencies.sort()
+            self.stdout.write(
+                f"{endpoint:<18} {label:<5} {options['requests'] / seconds:>8.0f} req/s  "
+                f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms  "
+                f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms  "
+                f"({failures} failed)"
+            )
+
+    async def load(self, call, total, concurrency):
+        queue = iter(range(total))
+        latencies = []
+        failures = 0
+
+        async def worker():
+            nonlocal failures
+            for i in queue:
+                sent = time.perf_counter()
+                response = await call(i)
+                latencies.append(time.perf_counter() - sent)
+                if response.status_code >= 400:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies, failures
+
+    def populate(self, options):
+        stamp = int(time.time())
+        course = Course.objects.create(name=f"Async bench course {stamp}")
+        Question.objects.bulk_create(
+            Question(
+                course=course,
+                question_text=f"Async bench question {i}",
+                text_hash=question_text_hash(f"Async bench question {i}"),
+                option_a='A', option_b='B', option_c='C', option_d='D',
+                correct_option='A',
+                status='approved',
+            )
+            for i in range(options['questions'] * 10)
+        )
+        users = User.objects.bulk_create(
+            User(username=f"async-bench-{stamp}-{i}") for i in range(options['concurrency'])
+        )
+        group_test = GroupTest.objects.create(
+            name=f"Async bench {stamp}",
+            course=course,
+            question_count=options['questions'],
+            duration_minutes=30,
+            created_by=users[0],
+            invitees='',
+            scheduled_start=timezone.now() - timedelta(minutes=1),
+        )
+        # Everyone has joined already: the detail runs measure reconnects
+        for user in users:
+            papers.join(group_test, user)
+        return course, group_test, users
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from exams.consumers import room_group
+from ._bench import parse_sizes
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure chat fan-out through the configured channel layer: every "
+        "socket in one global group (the old ChatConsumer) against per-room "
+        "groups of --room-size sockets.  Sockets are simulated as layer "
+        "channels; a message counts as delivered once its receiver reads it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sockets', default='1000,5000,10000')
+        parser.add_argument('--room-size', type=int, default=50)
+        parser.add_argument(
+            '--messages', type=int, default=50,
+            help="Messages sent per layout; keep below the layer capacity.",
+        )
+        parser.add_argument(
+            '--backend',
+            help="Dotted path of a layer class to use instead of CHANNEL_LAYERS, "
+                 "e.g. channels.layers.InMemoryChannelLayer.",
+        )
+
+    def handle(self, *args, **options):
+        if options['backend']:
+            layer = import_string(options['backend'])(capacity=settings.CHANNEL_LAYER_CAPACITY)
+        else:
+            layer = get_channel_layer()
+        self.stdout.write(f"Channel layer: {type(layer).__module__}.{type(layer).__name__}")
+        for sockets in parse_sizes(options['sockets']):
+            rooms = max(1, sockets // options['room_size'])
+            for label, room_count in (('global group', 1), (f'{rooms} rooms', rooms)):
+                sent, delivered, seconds = asyncio.run(
+                    self.run(layer, sockets, room_count, options['messages'])
+                )
+                self.stdout.write(
+                    f"{sockets:>6} sockets, {label:<13} {sent / seconds:>10.0f} msg/s "
+                    f"{delivered / seconds:>12.0f} deliveries/s ({delivered} delivered)"
+                )
+
+    async def run(self, layer, sockets, room_count, messages):
+        if hasattr(layer, 'flush'):
+            await layer.flush()
+        groups = [
+            room_group('lobby') if room_count == 1 else room_group('course', pk)
+            for pk in range(room_count)
+        ]
+        members = [[] for _ in groups]
+        for index in range(sockets):
+            channel = await layer.new_channel()
+            members[index % room_count].append(channel)
+            await layer.group_add(groups[index % room_count], channel)
+
+        expected = {}
+        started = time.perf_counter()
+        for number in range(messages):
+            room = number % room_count
+            await layer.group_send(
+                groups[room],
+                {'type': 'chat.message', 'username': 'bench', 'message': f'message {number}'}
+            )
+            for channel in members[room]:
+                expected[channel] = expected.get(channel, 0) + 1
+
+        delivered = 0
+        for channel, count in expected.items():
+            for _ in range(count):
+                await layer.receive(channel)
+                delivered += 1
+        seconds = time.perf_counter() - started
+
+        for group, channels in zip(groups, members):
+            for channel in channels:
+                await layer.group_discard(group, channel)
+        return messages, delivered, seconds
@@ -0,0 +1,106 @@
+import random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.utils import timezone
+
+from exams import leaderboard
+from exams.models import Course, LeaderboardEntry, TestSession
+from ._bench import rolled_back, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the on-the-fly leaderboard query with the materialized "
+        "leaderboard.  Rows are created inside a rolled-back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--courses', type=int, default=20)
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        top = options['top']
+        with rolled_back():
+            self.stdout.write("Creating rows...")
+            courses = self.populate(options)
+
+            def legacy():
+                sessions = TestSession.objects.annotate(
+                    score_percentage=ExpressionWrapper(
+                        F('score') * 100.0 / F('question_count'),
+                        output_field=FloatField()
+                    )
+                ).filter(question_count__gt=0).order_by('-score_percentage')[:top]
+                [(s.user.username, s.course.name) for s in sessions]
+
+            def materialized():
+                [leaderboard.serialize_entry(e) for e in leaderboard.top(top)]
+
+            def materialized_course():
+                [
+                    leaderboard.serialize_entry(e)
+                    for e in leaderboard.top(top, course_id=courses[0].id)
+                ]
+
+            def materialized_course_week():
+                [
+                    leaderboard.serialize_entry(e)
+                    for e in leaderboard.top(top, course_id=courses[0].id, window='week')
+                ]
+
+            for label, fn in (
+                ('legacy global', legacy),
+                ('materialized global', materialized),
+                ('materialized course', materialized_course),
+                ('materialized course wk', materialized_course_week),
+            ):
+                seconds, queries = timed(fn, options['repeat'])
+                self.stdout.write(
+                    f"{label:<22} {seconds * 1000:>9.2f} ms {queries:>5.0f} queries"
+                )
+
+    def populate(self, options):
+        rng = random.Random(0)
+        users = User.objects.bulk_create(
+            User(username=f"bench-leaderboard-{i}") for i in range(options['users'])
+        )
+        courses = Course.objects.bulk_create(
+            Course(name=f"Bench course {i}") for i in range(options['courses'])
+        )
+        now = timezone.now()
+        remaining = options['sessions']
+        while remaining > 0:
+            size = min(remaining, 5000)
+            sessions = TestSession.objects.bulk_create(
+                TestSession(
+                    user=rng.choice(users),
+                    course=rng.choice(courses),
+                    question_count=40,
+                    duration=1800,
+                    score=rng.randint(0, 40),
+                    end_time=now,
+                )
+                for _ in range(size)
+            )
+            LeaderboardEntry.objects.bulk_create(
+                LeaderboardEntry(
+                    session=s,
+                    user=s.user,
+                    course=s.course,
+                    username=s.user.username,
+                    course_name=s.course.name,
+                    score=s.score,
+                    question_count=s.question_count,
+                    score_percentage=s.score * 100.0 / s.question_count,
+                    finished_at=s.end_time,
+                    **leaderboard.period_fields(s.end_time),
+                )
+                for s in sessions
+            )
+            remaining -= size
+        return courses
@@ -0,0 +1,80 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from exams import blob_cache
+from exams.models import Course, Material
+from exams.serializers import MaterialSerializer
+from exams.storage_backends import GoogleCloudMediaStorage
+from ._bench import rolled_back
+
+
+class Command(BaseCommand):
+    help = (
+        "List materials the way MaterialSearchView does, plus an exists() "
+        "check per row, and count the HTTP requests made to the bucket.  The "
+        "cache is filled the way an upload fills it.  Rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--materials', type=int, default=100)
+        parser.add_argument('--listings', type=int, default=3)
+        parser.add_argument(
+            '--signed', action='store_true',
+            help="Serve signed URLs; needs credentials that can sign.",
+        )
+
+    def handle(self, *args, **options):
+        storage = Material._meta.get_field('file').storage
+        if not isinstance(storage, GoogleCloudMediaStorage):
+            raise CommandError("MATERIAL_STORAGE is not GoogleCloudMediaStorage.")
+        session = storage.client._http
+        requests = []
+        original = session.request
+
+        def counting(method, url, *args, **kwargs):
+            requests.append((method, url))
+            return original(method, url, *args, **kwargs)
+
+        session.request = counting
+        blob_cache.metadata.clear()
+        blob_cache.signed_urls.clear()
+        try:
+            with rolled_back(), override_settings(GCS_SIGNED_URLS=options['signed']):
+                materials = self.populate(options['materials'])
+                for listing in range(1, options['listings'] + 1):
+                    del requests[:]
+                    started = time.perf_counter()
+                    MaterialSerializer(materials, many=True).data
+                    for material in materials:
+                        storage.exists(material.file.name)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"listing {listing}: {len(materials)} materials, "
+                        f"{len(requests)} storage requests, {elapsed * 1000:.1f} ms"
+                    )
+        finally:
+            session.request = original
+        self.stdout.write(
+            f"metadata cache hits {blob_cache.metadata.hits}, misses {blob_cache.metadata.misses}; "
+            f"signed URL cache hits {blob_cache.signed_urls.hits}, misses {blob_cache.signed_urls.misses}"
+        )
+
+    def populate(self, count):
+        user = User.objects.create(username='benchmark-material-listing')
+        course = Course.objects.create(name='Benchmark listing course')
+        materials = Material.objects.bulk_create(
+            Material(
+                course=course,
+                name=f'Lecture {i}',
+                file=f'materials/benchmark-listing/{i}.pdf',
+                uploaded_by=user,
+            )
+            for i in range(count)
+        )
+        for material in materials:
+            # What storage._save / the upload finalizer record
+            blob_cache.remember(material.file.name, size=1024, content_type='application/pdf')
+        return materials
@@ -0,0 +1,103 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from exams import search
+from exams.models import Course, Material
+from ._bench import rolled_back, timed
+
+VOCABULARY = (
+    'reservoir drilling petroleum production geology seismic porosity '
+    'permeability well logging completion refining thermodynamics fluid '
+    'mechanics pipeline corrosion offshore economics safety simulation '
+    'stratigraphy sedimentology geophysics hydraulics enhanced recovery '
+    'lecture notes tutorial past questions solutions handout slides lab '
+    'manual assignment revision summary chapter introduction advanced'
+).split()
+QUERIES = [
+    'reservoir', 'drilling fluid', 'past questions', 'petroleum economics',
+    'res', 'geoph', 'well logging lab', 'corrosion offshore pipeline',
+    'nothingmatches', 'petroleum 101',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the old icontains search with each material search backend "
+        "available on this database.  Rows are created inside a transaction "
+        "that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--materials', type=int, default=100000)
+        parser.add_argument('--courses', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            started = time.perf_counter()
+            self.populate(options['materials'], options['courses'])
+            self.stdout.write(
+                f"{options['materials']} materials created in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+            backends = {'icontains': None}
+            if connection.vendor == 'postgresql':
+                backends['postgres'] = search.PostgresSearchBackend()
+            if search.FTS_TABLE in connection.introspection.table_names():
+                backends['fts5'] = search.SqliteFtsSearchBackend()
+            backends['in-process'] = memory = search.InvertedIndexSearchBackend()
+
+            started = time.perf_counter()
+            memory.search('warm up', 1)
+            self.stdout.write(f"in-process index built in {time.perf_counter() - started:.1f}s")
+
+            # Hits: every match for icontains, the first 20 for the backends
+            self.stdout.write(f"{'query':<28}" + ''.join(f"{name:>19}" for name in backends))
+            for query in QUERIES:
+                row = f"{query:<28}"
+                for backend in backends.values():
+                    if backend is None:
+                        seconds, _ = timed(lambda: self.legacy(query), options['repeat'])
+                        hits = len(self.legacy(query))
+                    else:
+                        seconds, _ = timed(lambda: backend.search(query, 20), options['repeat'])
+                        hits = len(backend.search(query, 20))
+                    row += f"{seconds * 1000:>9.1f} ms {hits:>6}"
+                self.stdout.write(row)
+
+    def legacy(self, query):
+        # MaterialSearchView before the index returned every match
+        return list(Material.objects.filter(
+            Q(name__icontains=query) |
+            Q(tags__icontains=query) |
+            Q(course__name__icontains=query)
+        ).values_list('id', flat=True))
+
+    def populate(self, count, course_count):
+        rng = random.Random(20)
+        user = User.objects.create(username='benchmark-material-search')
+        courses = Course.objects.bulk_create(
+            Course(name=f"PET {100 + i} {rng.choice(VOCABULARY).title()}")
+            for i in range(course_count)
+        )
+        batch = []
+        for i in range(count):
+            course = rng.choice(courses)
+            tags = ', '.join(rng.sample(VOCABULARY, 3))
+            batch.append(Material(
+                course=course,
+                name=' '.join(rng.sample(VOCABULARY, 4)).title() + f' {i}',
+                tags=tags,
+                search_text=search.search_text(tags, course.name),
+                file=f'materials/benchmark-{i}.pdf',
+                uploaded_by=user,
+            ))
+            if len(batch) == 5000:
+                Material.objects.bulk_create(batch)
+                batch = []
+        Material.objects.bulk_create(batch)
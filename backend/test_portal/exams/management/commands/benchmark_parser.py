@@ -0,0 +1,93 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from exams.parsing import MultichoiceParser
+from ._bench import parse_sizes
+
+# The regex UploadPassQuestionsView used before the line-oriented parser,
+# kept here only as the benchmark baseline.
+LEGACY_PATTERN = re.compile(r"""
+    (\d+[\.\)]?)\s*                # Question number (e.g., 1. or 1)
+    (.*?)\s*                       # Question text (non-greedy)
+    a[\.\)]?\s*(.*?)\s*            # Option A
+    b[\.\)]?\s*(.*?)\s*            # Option B
+    c[\.\)]?\s*(.*?)\s*            # Option C
+    d[\.\)]?\s*(.*?)\s*            # Option D
+    (?:answer|ans|correct|corr)    # Answer label
+    [:\s]+([a-dA-D])               # The answer letter
+""", re.DOTALL | re.IGNORECASE | re.VERBOSE)
+
+WORDS = (
+    'reservoir pressure porosity permeability viscosity drilling mud '
+    'casing formation fluid gradient wellbore density saturation flow'
+).split()
+
+
+def synthetic_document(count, malformed_every=50, seed=0):
+    """Build a past-paper style document with `count` questions."""
+    rng = random.Random(seed)
+    lines = ['DEPARTMENT OF PETROLEUM ENGINEERING', 'PAST QUESTIONS', '']
+    for number in range(1, count + 1):
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 18)))
+        lines.append(f"{number}. {text.capitalize()}?")
+        options = [
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+            for _ in range(4)
+        ]
+        if number % 7 == 0:
+            lines.append(f"a) {options[0]}   b) {options[1]}")
+            lines.append(f"c) {options[2]}   d) {options[3]}")
+        else:
+            for letter, option in zip('abcd', options):
+                lines.append(f"{letter}. {option}")
+        if malformed_every and number % malformed_every == 0:
+            continue  # drop the answer line
+        lines.append(f"Answer: {rng.choice('ABCD')}")
+        lines.append('')
+    return '\n'.join(lines)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the legacy DOTALL regex with the streaming multiple-choice "
+        "parser on synthetic documents."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000')
+        parser.add_argument('--malformed-every', type=int, default=50)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'questions':>10} {'chars':>10} {'regex ms':>9} {'regex found':>12} "
+            f"{'stream ms':>10} {'stream found':>13} {'malformed':>10}"
+        )
+        for size in parse_sizes(options['sizes']):
+            text = synthetic_document(size, options['malformed_every'])
+
+            started = time.perf_counter()
+            regex_found = len(LEGACY_PATTERN.findall(text))
+            regex_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            parser = MultichoiceParser()
+            # Feed page-sized chunks the way PDF extraction delivers them
+            pages = (
+                '\n'.join(chunk)
+                for chunk in _page_chunks(text.split('\n'), 60)
+            )
+            stream_found = sum(1 for _ in parser.parse(pages))
+            stream_s = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{size:>10} {len(text):>10} {regex_s * 1000:>9.1f} {regex_found:>12} "
+                f"{stream_s * 1000:>10.1f} {stream_found:>13} {len(parser.errors):>10}"
+            )
+
+
+def _page_chunks(lines, size):
+    for start in range(0, len(lines), size):
+        yield lines[start:start + size]
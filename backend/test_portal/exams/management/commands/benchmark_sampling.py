@@ -0,0 +1,76 @@
+import random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from exams import question_pool
+from exams.models import Course, Question
+from exams.sampling import sample_questions
+from ._bench import parse_sizes, rolled_back, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare loading the whole question bank against id-pool sampling "
+        "(cold and warm pool) for several bank sizes.  All rows are created "
+        "inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,50000')
+        parser.add_argument('--count', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        count = options['count']
+        repeat = options['repeat']
+        self.stdout.write(
+            f"{'bank':>8} {'legacy ms':>10} {'legacy q':>9} "
+            f"{'cold ms':>8} {'cold q':>7} {'warm ms':>8} {'warm q':>7}"
+        )
+        for size in parse_sizes(options['sizes']):
+            with rolled_back():
+                course = self.build_bank(size)
+
+                def legacy():
+                    random.sample(list(course.questions.all()), count)
+
+                def cold():
+                    question_pool.invalidate(course.id)
+                    sample_questions(course, count)
+
+                def warm():
+                    sample_questions(course, count)
+
+                legacy_s, legacy_q = timed(legacy, repeat)
+                cold_s, cold_q = timed(cold, repeat)
+                warm_s, warm_q = timed(warm, repeat)
+                question_pool.invalidate(course.id)
+            self.stdout.write(
+                f"{size:>8} {legacy_s * 1000:>10.1f} {legacy_q:>9.0f} "
+                f"{cold_s * 1000:>8.1f} {cold_q:>7.0f} "
+                f"{warm_s * 1000:>8.1f} {warm_q:>7.0f}"
+            )
+
+    def build_bank(self, size):
+        user = User.objects.create(username='benchmark-sampling')
+        course = Course.objects.create(name='Benchmark course')
+        filler = 'lorem ipsum dolor sit amet ' * 8
+        Question.objects.bulk_create(
+            (
+                Question(
+                    course=course,
+                    question_text=f"{i}. {filler}",
+                    option_a=filler[:60],
+                    option_b=filler[:60],
+                    option_c=filler[:60],
+                    option_d=filler[:60],
+                    correct_option='A',
+                    status='approved',
+                    uploaded_by=user,
+                )
+                for i in range(size)
+            ),
+            batch_size=1000,
+        )
+        return course
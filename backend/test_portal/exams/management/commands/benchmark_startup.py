@@ -0,0 +1,48 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+SETUP = 'import django; django.setup()'
+CASES = [
+    ('django.setup()', SETUP),
+    ('setup + check', SETUP + "; from django.core.management import call_command; call_command('check', verbosity=0)"),
+    ('setup + storage client', SETUP + "; from exams.models import Material; Material._meta.get_field('file').storage.bucket"),
+]
+LOADED = SETUP + "; import sys; print(int('google.cloud.storage' in sys.modules))"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time fresh interpreter startups with this project's settings: plain "
+        "django.setup(), a system check, and building the storage client."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=7)
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), env.get('PYTHONPATH')]))
+        for label, code in CASES:
+            samples = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                result = subprocess.run([sys.executable, '-c', code], env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                samples.append(time.perf_counter() - started)
+                if result.returncode:
+                    break
+            if result.returncode:
+                self.stdout.write(f"{label:<24} failed (are GCS credentials configured?)")
+                continue
+            self.stdout.write(
+                f"{label:<24} median {statistics.median(samples) * 1000:7.0f} ms  "
+                f"min {min(samples) * 1000:7.0f} ms"
+            )
+        loaded = subprocess.run([sys.executable, '-c', LOADED], env=env,
+                                capture_output=True, text=True).stdout.strip()
+        self.stdout.write(f"google.cloud.storage imported by setup: {'yes' if loaded == '1' else 'no'}")
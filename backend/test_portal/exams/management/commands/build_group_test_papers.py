@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from exams.models import GroupTest
+from exams.papers import build_papers
+from exams.sampling import NotEnoughQuestions
+
+
+class Command(BaseCommand):
+    help = (
+        "Build and cache the question papers of group tests starting within "
+        "the next --ahead-minutes (or already running).  Safe to run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead-minutes', type=int, default=60)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        upcoming = GroupTest.objects.filter(
+            scheduled_start__lte=now + timedelta(minutes=options['ahead_minutes']),
+            # Older tests still build lazily on the next join
+            scheduled_start__gte=now - timedelta(days=1),
+        ).order_by('scheduled_start')
+
+        built = 0
+        for group_test in upcoming:
+            try:
+                build_papers(group_test)
+            except NotEnoughQuestions as e:
+                self.stderr.write(f"{group_test.name} (#{group_test.id}): {e}")
+                continue
+            built += 1
+        self.stdout.write(self.style.SUCCESS(f"Built papers for {built} group tests"))
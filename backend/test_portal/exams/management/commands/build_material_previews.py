@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from exams import jobs
+from exams.models import Material
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue `material_preview` jobs for materials uploaded before previews "
+        "existed: one per blob still pending, plus one per material with no blob."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help="Queue at most this many jobs.")
+
+    def handle(self, *args, **options):
+        material_ids = []
+        seen_blobs = set()
+        rows = (
+            Material.objects.exclude(file='')
+            .exclude(blob__preview_status__in=['ready', 'unsupported', 'failed'])
+            .order_by('id')
+            .values_list('id', 'blob_id')
+        )
+        for material_id, blob_id in rows.iterator(chunk_size=2000):
+            if blob_id is not None:
+                if blob_id in seen_blobs:
+                    continue
+                seen_blobs.add(blob_id)
+            material_ids.append(material_id)
+            if options['limit'] and len(material_ids) >= options['limit']:
+                break
+
+        for material_id in material_ids:
+            jobs.enqueue('material_preview', {'material_id': material_id})
+        self.stdout.write(f"{len(material_ids)} preview jobs queued")
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from exams import blobs
+from exams.models import Material
+
+
+class Command(BaseCommand):
+    help = (
+        "Hash materials stored before content addressing and point copies "
+        "of the same file at one StoredBlob, deleting the redundant objects."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help="Stop after this many materials.")
+
+    def handle(self, *args, **options):
+        pending = Material.objects.filter(blob__isnull=True).exclude(file='').order_by('id')
+        if options['limit']:
+            pending = pending[:options['limit']]
+
+        adopted = duplicates = failed = freed = 0
+        for material in pending.iterator(chunk_size=200):
+            try:
+                saved = blobs.adopt(material)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Material {material.pk} ({material.file.name}): {e}")
+                continue
+            adopted += 1
+            if saved:
+                duplicates += 1
+                freed += saved
+
+        self.stdout.write(
+            f"{adopted} materials content-addressed, {duplicates} duplicates merged, "
+            f"{freed / 1024 / 1024:.1f} MiB freed, {failed} failed"
+        )
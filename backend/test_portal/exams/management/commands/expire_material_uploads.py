@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from exams import uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Abort resumable material uploads left open past their expiry and "
+        "delete their partial objects, then drop old finished upload rows.  "
+        "Run it periodically, e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-days', type=int, default=settings.MATERIAL_UPLOAD_RETENTION_DAYS,
+            help="Keep complete and aborted upload rows this many days.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = uploads.expire(now)
+        purged = uploads.purge(now - timedelta(days=options['keep_days']))
+        self.stdout.write(f"{expired} expired uploads aborted, {purged} old upload rows deleted")
@@ -0,0 +1,112 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from exams.models import Course, GroupTest, Question, TestSession, question_text_hash
+from ._bench import QueryCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate concurrent joins of one started group test through "
+        "GroupTestDetailAPIView, then a second wave of reconnects, and count "
+        "the queries and sessions each wave produces.  Rows are committed so "
+        "worker threads can see them and are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--questions', type=int, default=40)
+        parser.add_argument('--bank', type=int, default=500)
+        parser.add_argument(
+            '--yes', action='store_true',
+            help="Run with DEBUG off; rows are committed to the configured database.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['yes']:
+            raise CommandError(
+                "This commits users, questions and sessions to the configured "
+                "database; run with DEBUG on or pass --yes."
+            )
+        course, group_test, users = self.populate(options)
+        try:
+            # The test client's Host is `testserver`
+            with override_settings(ALLOWED_HOSTS=['*']):
+                for label in ('first join', 'reconnect'):
+                    self.wave(label, group_test, users, options['threads'])
+            sessions = TestSession.objects.filter(group_test=group_test).count()
+            self.stdout.write(f"sessions for the group test: {sessions} (users: {len(users)})")
+        finally:
+            TestSession.objects.filter(user__in=users).delete()
+            group_test.delete()
+            User.objects.filter(pk__in=[u.pk for u in users]).delete()
+            course.delete()
+
+    def wave(self, label, group_test, users, threads):
+        url = f'/api/group-test/{group_test.pk}/'
+        counters = []
+        lock = threading.Lock()
+        before = TestSession.objects.filter(group_test=group_test).count()
+
+        def join(user):
+            counter = QueryCounter()
+            client = APIClient()
+            client.force_authenticate(user)
+            with connection.execute_wrapper(counter):
+                response = client.get(url)
+            with lock:
+                counters.append(counter.count)
+            return response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            codes = list(pool.map(join, users))
+        elapsed = time.perf_counter() - started
+
+        created = TestSession.objects.filter(group_test=group_test).count() - before
+        failures = sum(1 for code in codes if code != 200)
+        self.stdout.write(
+            f"{label:<11} {len(users)} joins in {elapsed:.2f}s: "
+            f"{sum(counters)} queries ({sum(counters) / len(users):.1f}/join, "
+            f"max {max(counters)}), {created} sessions created, {failures} failed"
+        )
+
+    def populate(self, options):
+        stamp = int(time.time())
+        course = Course.objects.create(name=f"Loadtest course {stamp}")
+        Question.objects.bulk_create(
+            Question(
+                course=course,
+                question_text=f"Loadtest question {i}",
+                text_hash=question_text_hash(f"Loadtest question {i}"),
+                option_a='A', option_b='B', option_c='C', option_d='D',
+                correct_option='A',
+                status='approved',
+            )
+            for i in range(options['bank'])
+        )
+        users = User.objects.bulk_create(
+            User(username=f"loadtest-{stamp}-{i}") for i in range(options['users'])
+        )
+        creator = users[0]
+        group_test = GroupTest.objects.create(
+            name=f"Loadtest {stamp}",
+            course=course,
+            question_count=options['questions'],
+            duration_minutes=30,
+            created_by=creator,
+            invitees='',
+            scheduled_start=timezone.now() - timedelta(minutes=1),
+        )
+        return course, group_test, users
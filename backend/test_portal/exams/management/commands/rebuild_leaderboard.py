@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from exams import leaderboard, ranking
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the materialized leaderboard and the per-user score "
+        "aggregates from all scored test sessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = leaderboard.rebuild(batch_size=options['batch_size'])
+            users = ranking.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {created} leaderboard entries and {users} user aggregates"
+        ))
@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from exams.jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs.  Each worker thread claims one job at a "
+        "time; CPU-bound steps go to a shared process pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.JOB_WORKER_PROCESSES,
+            help="Size of the process pool (0 runs everything in-process).",
+        )
+        parser.add_argument(
+            '--threads', type=int, default=settings.JOB_WORKER_THREADS,
+            help="Number of jobs run concurrently.",
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Exit when the queue is empty instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        executor = None
+        if options['processes'] > 0:
+            executor = ProcessPoolExecutor(max_workers=options['processes'])
+
+        def work():
+            try:
+                run_worker(
+                    executor,
+                    once=options['once'],
+                    poll_interval=options['poll_interval'],
+                )
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=work, daemon=True)
+            for _ in range(max(1, options['threads']))
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers")
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from exams.outbox import run_sender
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued outbox emails in batches over one reused connection, "
+        "retrying failures with exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=5.0)
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Exit when nothing is due instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sent, failed = run_sender(
+                batch_size=options['batch_size'],
+                once=options['once'],
+                poll_interval=options['poll_interval'],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping sender")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} emails, {failed} failed attempts"))
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:15
+
+import hashlib
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_text_hash(apps, schema_editor):
+    Question = apps.get_model('exams', 'Question')
+    batch = []
+    for question in Question.objects.only('id', 'question_text').iterator(chunk_size=2000):
+        normalized = re.sub(r'\s+', ' ', question.question_text or '').strip().lower()
+        question.text_hash = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+        batch.append(question)
+        if len(batch) >= 2000:
+            Question.objects.bulk_update(batch, ['text_hash'])
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, ['text_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0010_course_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='text_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['course', 'text_hash'], name='question_course_hash_idx'),
+        ),
+        migrations.RunPython(backfill_text_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_leaderboard(apps, schema_editor):
+    TestSession = apps.get_model('exams', 'TestSession')
+    LeaderboardEntry = apps.get_model('exams', 'LeaderboardEntry')
+    sessions = TestSession.objects.filter(
+        score__isnull=False, question_count__gt=0
+    ).select_related('user', 'course')
+    batch = []
+    for session in sessions.iterator(chunk_size=2000):
+        batch.append(LeaderboardEntry(
+            session_id=session.id,
+            user_id=session.user_id,
+            course_id=session.course_id,
+            username=session.user.username,
+            course_name=session.course.name,
+            score=session.score,
+            question_count=session.question_count,
+            score_percentage=session.score * 100.0 / session.question_count,
+            finished_at=session.end_time,
+        ))
+        if len(batch) >= 2000:
+            LeaderboardEntry.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        LeaderboardEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0012_backgroundjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150)),
+                ('course_name', models.CharField(max_length=255)),
+                ('score', models.PositiveIntegerField()),
+                ('question_count', models.PositiveIntegerField()),
+                ('score_percentage', models.FloatField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exams.course')),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entry', to='exams.testsession')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score_percentage', 'id'], name='leaderboard_global_idx'), models.Index(fields=['course', '-score_percentage', 'id'], name='leaderboard_course_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_leaderboard, migrations.RunPython.noop),
+    ]
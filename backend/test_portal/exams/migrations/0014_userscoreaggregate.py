@@ -0,0 +1,52 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_aggregates(apps, schema_editor):
+    TestSession = apps.get_model('exams', 'TestSession')
+    UserScoreAggregate = apps.get_model('exams', 'UserScoreAggregate')
+    totals = TestSession.objects.filter(
+        score__isnull=False, question_count__gt=0
+    ).values('user_id').annotate(
+        total_score=Sum('score'), total_questions=Sum('question_count')
+    ).order_by()
+    UserScoreAggregate.objects.bulk_create(
+        (
+            UserScoreAggregate(
+                user_id=row['user_id'],
+                total_score=row['total_score'],
+                total_questions=row['total_questions'],
+                average=row['total_score'] * 100.0 / row['total_questions'],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('exams', '0013_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserScoreAggregate',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_aggregate', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_score', models.PositiveIntegerField(default=0)),
+                ('total_questions', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-average', 'user'], name='user_score_average_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0014_userscoreaggregate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['finished_at', '-score_percentage', 'id'], name='leaderboard_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['course', 'finished_at', '-score_percentage', 'id'], name='leaderboard_course_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testsession',
+            index=models.Index(fields=['course', 'end_time', 'score'], name='session_course_end_score_idx'),
+        ),
+    ]
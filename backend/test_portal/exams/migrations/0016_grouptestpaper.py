@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0015_leaderboard_window_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupTestPaper',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variant', models.PositiveSmallIntegerField()),
+                ('question_ids', models.JSONField()),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('group_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='papers', to='exams.grouptest')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('group_test', 'variant'), name='unique_group_test_paper_variant')],
+            },
+        ),
+    ]
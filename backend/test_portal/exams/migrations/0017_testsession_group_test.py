@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0016_grouptestpaper'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testsession',
+            name='group_test',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions', to='exams.grouptest'),
+        ),
+        migrations.AddField(
+            model_name='testsession',
+            name='paper',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='exams.grouptestpaper'),
+        ),
+        migrations.AddConstraint(
+            model_name='testsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('group_test__isnull', False)), fields=('group_test', 'user'), name='unique_group_test_session'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:28
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def split_invitees(apps, schema_editor):
+    GroupTest = apps.get_model('exams', 'GroupTest')
+    GroupTestInvitee = apps.get_model('exams', 'GroupTestInvitee')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    users = {}
+    for user_id, email in User.objects.exclude(email='').values_list('id', 'email').order_by('-id'):
+        # The oldest account wins when several share an address
+        users[email.strip().lower()] = user_id
+
+    batch = []
+    for group_test in GroupTest.objects.order_by('id').iterator(chunk_size=500):
+        ends_at = group_test.scheduled_start + timedelta(minutes=group_test.duration_minutes)
+        emails = dict.fromkeys(
+            e.strip().lower() for e in group_test.invitees.split(',') if e.strip()
+        )
+        batch.extend(
+            GroupTestInvitee(
+                group_test_id=group_test.id,
+                email=email,
+                user_id=users.get(email),
+                ends_at=ends_at,
+            )
+            for email in emails
+        )
+        if len(batch) >= 2000:
+            GroupTestInvitee.objects.bulk_create(batch)
+            batch = []
+    GroupTestInvitee.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0018_outboxemail'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupTestInvitee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('status', models.CharField(choices=[('invited', 'Invited'), ('joined', 'Joined')], default='invited', max_length=20)),
+                ('ends_at', models.DateTimeField()),
+                ('invited_at', models.DateTimeField(auto_now_add=True)),
+                ('group_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invitations', to='exams.grouptest')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='group_test_invitations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['email', 'ends_at'], name='invitee_email_ends_idx'), models.Index(fields=['user', 'ends_at'], name='invitee_user_ends_idx')],
+                'constraints': [models.UniqueConstraint(fields=('group_test', 'email'), name='unique_group_test_invitee')],
+            },
+        ),
+        migrations.RunPython(split_invitees, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:50
+
+from django.db import migrations, models
+
+# Same expression as exams.search.PG_DOCUMENT, so the planner uses the index
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(\"exams_material\".\"name\", '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(\"exams_material\".\"search_text\", '')), 'B')"
+)
+
+POSTGRES_FORWARD = [
+    f'CREATE INDEX material_search_gin ON "exams_material" USING GIN (({PG_DOCUMENT}))',
+]
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS material_search_gin',
+]
+
+# External-content FTS5 table over name and search_text, kept current by
+# triggers; prefix indexes make search-as-you-type cheap.
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE exams_material_fts USING fts5(
+        name, search_text,
+        content='exams_material', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER exams_material_fts_insert AFTER INSERT ON exams_material BEGIN
+        INSERT INTO exams_material_fts(rowid, name, search_text)
+        VALUES (new.id, new.name, new.search_text);
+    END""",
+    """CREATE TRIGGER exams_material_fts_delete AFTER DELETE ON exams_material BEGIN
+        INSERT INTO exams_material_fts(exams_material_fts, rowid, name, search_text)
+        VALUES ('delete', old.id, old.name, old.search_text);
+    END""",
+    """CREATE TRIGGER exams_material_fts_update AFTER UPDATE OF name, search_text ON exams_material BEGIN
+        INSERT INTO exams_material_fts(exams_material_fts, rowid, name, search_text)
+        VALUES ('delete', old.id, old.name, old.search_text);
+        INSERT INTO exams_material_fts(rowid, name, search_text)
+        VALUES (new.id, new.name, new.search_text);
+    END""",
+    "INSERT INTO exams_material_fts(exams_material_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS exams_material_fts_insert',
+    'DROP TRIGGER IF EXISTS exams_material_fts_delete',
+    'DROP TRIGGER IF EXISTS exams_material_fts_update',
+    'DROP TABLE IF EXISTS exams_material_fts',
+]
+
+
+def fill_search_text(apps, schema_editor):
+    Material = apps.get_model('exams', 'Material')
+    batch = []
+    for material in Material.objects.select_related('course').order_by('id').iterator(chunk_size=2000):
+        material.search_text = f'{material.tags} {material.course.name}'.strip()
+        batch.append(material)
+        if len(batch) >= 2000:
+            Material.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Material.objects.bulk_update(batch, ['search_text'])
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        statements = {'postgresql': postgres, 'sqlite': sqlite}.get(connection.vendor, [])
+        if connection.vendor == 'sqlite' and not sqlite_has_fts5(connection):
+            # exams.search falls back to its in-process index
+            statements = []
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0019_grouptestinvitee'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='material',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:55
+
+import exams.storage_backends
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0021_materialupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='material',
+            name='file',
+            field=models.FileField(storage=exams.storage_backends.material_storage, upload_to='materials/'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0023_storedblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedblob',
+            name='preview_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('unsupported', 'Unsupported'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='storedblob',
+            name='preview_text',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='storedblob',
+            name='thumbnail',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:16
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_period_keys(apps, schema_editor):
+    # Same as exams.leaderboard.period_fields
+    LeaderboardEntry = apps.get_model('exams', 'LeaderboardEntry')
+    entries = LeaderboardEntry.objects.filter(finished_at__isnull=False).only('id', 'finished_at')
+    batch = []
+    for entry in entries.order_by('id').iterator(chunk_size=2000):
+        entry.day = timezone.localtime(entry.finished_at).date()
+        entry.week_start = entry.day - timedelta(days=entry.day.weekday())
+        batch.append(entry)
+        if len(batch) >= 2000:
+            LeaderboardEntry.objects.bulk_update(batch, ['day', 'week_start'])
+            batch = []
+    LeaderboardEntry.objects.bulk_update(batch, ['day', 'week_start'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0025_backgroundjob_attempts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='leaderboard_window_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='leaderboard_course_window_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testsession',
+            name='session_course_end_score_idx',
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='day',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='week_start',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_period_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['day', '-score_percentage', 'id'], name='leaderboard_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['course', 'day', '-score_percentage', 'id'], name='leaderboard_course_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['week_start', '-score_percentage', 'id'], name='leaderboard_week_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['course', 'week_start', '-score_percentage', 'id'], name='leaderboard_course_week_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0026_leaderboard_period_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='storedblob',
+            name='preview_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('rendering', 'Rendering'), ('ready', 'Ready'), ('unsupported', 'Unsupported'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:12
+
+from django.db import migrations
+
+# Same expression as exams.search.PG_PREVIEW, so the planner uses the index
+PG_PREVIEW = "to_tsvector('simple', coalesce(\"exams_storedblob\".\"preview_text\", ''))"
+
+POSTGRES_FORWARD = [
+    f'CREATE INDEX storedblob_preview_gin ON "exams_storedblob" USING GIN (({PG_PREVIEW}))',
+]
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS storedblob_preview_gin',
+]
+
+# Preview text gets its own FTS5 table, so its length doesn't count
+# against name and tag matches in bm25.
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE exams_storedblob_fts USING fts5(
+        preview_text,
+        content='exams_storedblob', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER exams_storedblob_fts_insert AFTER INSERT ON exams_storedblob BEGIN
+        INSERT INTO exams_storedblob_fts(rowid, preview_text) VALUES (new.id, new.preview_text);
+    END""",
+    """CREATE TRIGGER exams_storedblob_fts_delete AFTER DELETE ON exams_storedblob BEGIN
+        INSERT INTO exams_storedblob_fts(exams_storedblob_fts, rowid, preview_text)
+        VALUES ('delete', old.id, old.preview_text);
+    END""",
+    """CREATE TRIGGER exams_storedblob_fts_update AFTER UPDATE OF preview_text ON exams_storedblob BEGIN
+        INSERT INTO exams_storedblob_fts(exams_storedblob_fts, rowid, preview_text)
+        VALUES ('delete', old.id, old.preview_text);
+        INSERT INTO exams_storedblob_fts(rowid, preview_text) VALUES (new.id, new.preview_text);
+    END""",
+    "INSERT INTO exams_storedblob_fts(exams_storedblob_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS exams_storedblob_fts_insert',
+    'DROP TRIGGER IF EXISTS exams_storedblob_fts_delete',
+    'DROP TRIGGER IF EXISTS exams_storedblob_fts_update',
+    'DROP TABLE IF EXISTS exams_storedblob_fts',
+]
+
+
+def drop_preview_text(apps, schema_editor):
+    """search_text held the preview text too until now; back to tags and course."""
+    Material = apps.get_model('exams', 'Material')
+    batch = []
+    for material in Material.objects.select_related('course').order_by('id').iterator(chunk_size=2000):
+        material.search_text = f'{material.tags} {material.course.name}'.strip()
+        batch.append(material)
+        if len(batch) >= 2000:
+            Material.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Material.objects.bulk_update(batch, ['search_text'])
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        statements = {'postgresql': postgres, 'sqlite': sqlite}.get(connection.vendor, [])
+        if connection.vendor == 'sqlite' and not sqlite_has_fts5(connection):
+            # exams.search falls back to its in-process index
+            statements = []
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0027_storedblob_preview_rendering'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_preview_text, migrations.RunPython.noop),
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
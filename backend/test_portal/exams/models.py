@@ -1,9 +1,24 @@
+import hashlib
+import re
+import uuid
+from datetime import timedelta
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 # from .storage_backends import GoogleCloudMediaStorage
 from django.conf import settings
 
 
+def normalize_question_text(text):
+    """Lower-case and collapse whitespace so trivially different copies match."""
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+def question_text_hash(text):
+    return hashlib.sha1(normalize_question_text(text).encode('utf-8')).hexdigest()
+
+
 
 
 class Course(models.Model):
@@ -43,10 +58,18 @@ class Question(models.Model):
         null=True,
         blank=True
     )
-    
-    def __str__(self):
-        return self.question_text[:50]
-    
+    # SHA-1 of the normalized question text, used to skip duplicate uploads
+    text_hash = models.CharField(max_length=40, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'text_hash'], name='question_course_hash_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.text_hash = question_text_hash(self.question_text)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.question_text[:50]
 
@@ -59,7 +82,23 @@ class TestSession(models.Model):
     end_time = models.DateTimeField(null=True, blank=True)
     duration = models.PositiveIntegerField()  # in seconds
     score = models.PositiveIntegerField(null=True, blank=True)
-    
+    # Set for group test sessions: one session per (group test, user)
+    group_test = models.ForeignKey(
+        'GroupTest', null=True, blank=True, on_delete=models.SET_NULL, related_name='sessions'
+    )
+    paper = models.ForeignKey(
+        'GroupTestPaper', null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['group_test', 'user'],
+                condition=models.Q(group_test__isnull=False),
+                name='unique_group_test_session',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.course.name}"
 
@@ -74,20 +113,284 @@ class GroupTest(models.Model):
     scheduled_start = models.DateTimeField()
     def __str__(self):
         return self.name
-from .storage_backends import GoogleCloudMediaStorage
+
+    @property
+    def ends_at(self):
+        return self.scheduled_start + timedelta(minutes=self.duration_minutes)
+
+
+class GroupTestPaper(models.Model):
+    """
+    One pre-sampled variant of a group test's question paper.  `payload`
+    holds the question dicts exactly as sent to participants, so a join is
+    a cached read plus a session insert (see exams/papers.py).
+    """
+    group_test = models.ForeignKey(GroupTest, on_delete=models.CASCADE, related_name='papers')
+    variant = models.PositiveSmallIntegerField()
+    question_ids = models.JSONField()
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group_test', 'variant'], name='unique_group_test_paper_variant'),
+        ]
+
+    def __str__(self):
+        return f"{self.group_test} (variant {self.variant})"
+
+
+class GroupTestInvitee(models.Model):
+    """
+    One invited address of a group test (exams/invitations.py).  `ends_at`
+    is copied from the group test so "my upcoming and active group tests"
+    is a range read on (email, ends_at).
+    """
+    STATUS_CHOICES = [
+        ('invited', 'Invited'),
+        ('joined', 'Joined'),
+    ]
+
+    group_test = models.ForeignKey(GroupTest, on_delete=models.CASCADE, related_name='invitations')
+    email = models.EmailField()  # lower-cased
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='group_test_invitations'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='invited')
+    ends_at = models.DateTimeField()
+    invited_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group_test', 'email'], name='unique_group_test_invitee'),
+        ]
+        indexes = [
+            models.Index(fields=['email', 'ends_at'], name='invitee_email_ends_idx'),
+            models.Index(fields=['user', 'ends_at'], name='invitee_user_ends_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.email} - {self.group_test} ({self.status})"
+from .storage_backends import material_storage
 from django.conf import settings
 
+class StoredBlob(models.Model):
+    """
+    One object in the material bucket, addressed by the SHA-256 of its
+    content and shared by every Material with the same bytes.  ref_count
+    is kept by exams/signals.py; the object is deleted when it drops to 0.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=500, unique=True)
+    size = models.BigIntegerField()
+    content_type = models.CharField(max_length=255, blank=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Derivatives made by the `material_preview` job (exams/previews.py)
+    PREVIEW_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('rendering', 'Rendering'),
+        ('ready', 'Ready'),
+        ('unsupported', 'Unsupported'),
+        ('failed', 'Failed'),
+    ]
+    preview_status = models.CharField(max_length=20, choices=PREVIEW_STATUS_CHOICES, default='pending')
+    preview_text = models.TextField(blank=True)
+    thumbnail = models.CharField(max_length=500, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
 class Material(models.Model):
     course = models.ForeignKey('Course', on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     tags = models.CharField(max_length=255, blank=True)
+    # Tags and course name for exams/search.py; kept in step by signals
+    search_text = models.TextField(blank=True, default='', editable=False)
     file = models.FileField(
         upload_to='materials/',
-        storage=GoogleCloudMediaStorage()
+        storage=material_storage
     )
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Set once the file is content-addressed (see exams/blobs.py)
+    blob = models.ForeignKey(
+        StoredBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='materials'
+    )
 
     @property
     def file_url(self):
-        return self.file.url if self.file else ''
\ No newline at end of file
+        return self.file.url if self.file else ''
+
+
+class MaterialUpload(models.Model):
+    """
+    A resumable upload session (see exams/uploads.py).  The client streams
+    chunks straight to the bucket; the Material row is only created when
+    the client reports the upload complete and the object checks out.
+    """
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('complete', 'Complete'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='material_uploads')
+    course = models.ForeignKey('Course', on_delete=models.CASCADE)
+    name = models.CharField(max_length=255)
+    tags = models.CharField(max_length=255, blank=True)
+    object_name = models.CharField(max_length=500, unique=True)
+    content_type = models.CharField(max_length=255, blank=True)
+    size = models.BigIntegerField()
+    # Bytes accepted so far by the local target; GCS tracks its own
+    received = models.BigIntegerField(default=0)
+    session_url = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    material = models.OneToOneField(
+        Material, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.object_name} ({self.status})"
+
+class BackgroundJob(models.Model):
+    """A unit of work queued in the database and run by `manage.py run_jobs`."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    attempts = models.PositiveSmallIntegerField(default=0)  # claims so far
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Materialized leaderboard row for a scored TestSession, maintained by
+    exams/leaderboard.py.  User and course names are copied in so the top N
+    is one index range read with no joins.
+    """
+    session = models.OneToOneField(
+        TestSession,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entry'
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    username = models.CharField(max_length=150)
+    course_name = models.CharField(max_length=255)
+    score = models.PositiveIntegerField()
+    question_count = models.PositiveIntegerField()
+    score_percentage = models.FloatField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Period keys of finished_at (see leaderboard.period_fields)
+    day = models.DateField(null=True, blank=True)
+    week_start = models.DateField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score_percentage', 'id'], name='leaderboard_global_idx'),
+            models.Index(fields=['course', '-score_percentage', 'id'], name='leaderboard_course_idx'),
+            # Day and week boards are equality on a period key, then score order
+            models.Index(fields=['day', '-score_percentage', 'id'], name='leaderboard_day_idx'),
+            models.Index(fields=['course', 'day', '-score_percentage', 'id'], name='leaderboard_course_day_idx'),
+            models.Index(fields=['week_start', '-score_percentage', 'id'], name='leaderboard_week_idx'),
+            models.Index(
+                fields=['course', 'week_start', '-score_percentage', 'id'],
+                name='leaderboard_course_week_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.username} - {self.course_name}: {self.score_percentage:.1f}%"
+
+
+class UserScoreAggregate(models.Model):
+    """Running totals over a user's scored sessions, maintained on submission."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_aggregate'
+    )
+    total_score = models.PositiveIntegerField(default=0)
+    total_questions = models.PositiveIntegerField(default=0)
+    average = models.FloatField(default=0)  # percent
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-average', 'user'], name='user_score_average_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.average:.1f}%"
+
+
+class OutboxEmail(models.Model):
+    """
+    One outgoing email per recipient, delivered by `manage.py send_outbox`
+    (see exams/outbox.py).  Rows are leased by pushing `next_attempt_at`
+    forward, so a crashed sender's rows become due again on their own.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    group_test = models.ForeignKey(
+        GroupTest,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='outbox_emails'
+    )
+    recipient = models.EmailField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.recipient} ({self.status})"
@@ -0,0 +1,26 @@
+# exams/notifications.py
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import send_mail
+
+
+def notify_admins_of_upload(user, course, count):
+    """Tell staff users that `count` uploaded questions await approval."""
+    admin_emails = User.objects.filter(
+        is_staff=True
+    ).values_list('email', flat=True)
+
+    if admin_emails and count > 0:
+        subject = f"New Questions Pending Approval for {course.name}"
+        message = f"User {user.username} uploaded {count} questions for course: {course.name}. Please review them in the admin panel."
+
+        try:
+            send_mail(
+                subject,
+                message,
+                settings.EMAIL_HOST_USER,
+                admin_emails,
+                fail_silently=True
+            )
+        except Exception as e:
+            print(f"Failed to send email notification: {str(e)}")
@@ -0,0 +1,170 @@
+# exams/outbox.py
+"""
+Email outbox.  Views queue one OutboxEmail row per recipient and return;
+`manage.py send_outbox` delivers due rows in batches over one reused
+connection of the configured EMAIL_BACKEND, retrying failures with
+exponential backoff and recording the outcome per recipient.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import GroupTest, OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+INVITE_CACHE_KEY = 'group-test-invite:{}'
+RENDERERS = {}
+
+
+def renderer(kind):
+    """Register `func(group_test)` -> (subject, text, html) for `kind`."""
+    def decorator(func):
+        RENDERERS[kind] = func
+        return func
+    return decorator
+
+
+@renderer('group_test_invite')
+def render_group_test_invite(group_test):
+    """Render the invitation once per group test and cache it."""
+    key = INVITE_CACHE_KEY.format(group_test.id)
+    rendered = cache.get(key)
+    if rendered is None:
+        context = {
+            'test_name': group_test.name,
+            'course': group_test.course.name,
+            'inviter': group_test.created_by.username,
+            'question_count': group_test.question_count,
+            'duration': group_test.duration_minutes,
+            'scheduled_start': group_test.scheduled_start,
+            'domain': settings.FRONTEND_DOMAIN,
+            'test_id': group_test.id
+        }
+        html_message = render_to_string('email/group_test_invite.html', context)
+        rendered = (
+            f"Invitation to Group Test: {group_test.name}",
+            strip_tags(html_message),
+            html_message,
+        )
+        cache.set(key, rendered, settings.OUTBOX_RENDER_CACHE_SECONDS)
+    return rendered
+
+
+def queue_group_test_invites(group_test, emails):
+    """Queue one invitation per distinct address; returns the rows."""
+    recipients = list(dict.fromkeys(e.strip() for e in emails if e and e.strip()))
+    return OutboxEmail.objects.bulk_create(
+        OutboxEmail(kind='group_test_invite', group_test=group_test, recipient=email)
+        for email in recipients
+    )
+
+
+def retry_delay(attempts):
+    """Backoff before attempt `attempts + 1`: base, 2x base, 4x base, ..."""
+    return settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+
+
+def claim_due(batch_size):
+    """
+    Lease up to `batch_size` due rows by moving their next attempt past the
+    lease period.  Rows locked by another sender are skipped.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if rows:
+            OutboxEmail.objects.filter(pk__in=[row.pk for row in rows]).update(
+                next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            )
+    return rows
+
+
+def _render(row, rendered):
+    # Rendered content is shared by every row of the same group test
+    key = (row.kind, row.group_test_id)
+    if key not in rendered:
+        render = RENDERERS[row.kind]
+        group_test = GroupTest.objects.select_related('course', 'created_by').get(
+            pk=row.group_test_id
+        )
+        rendered[key] = render(group_test)
+    return rendered[key]
+
+
+def deliver(rows, connection):
+    """
+    Send each row over `connection` and record its outcome.  Returns
+    (sent, failed) counts; failed rows are rescheduled or given up on.
+    """
+    rendered = {}
+    sent = failed = 0
+    for row in rows:
+        try:
+            # Open explicitly: send_messages() closes connections it had to
+            # open itself.  A no-op while the connection is up.
+            connection.open()
+            subject, text, html = _render(row, rendered)
+            message = EmailMultiAlternatives(
+                subject, text, settings.EMAIL_HOST_USER, [row.recipient],
+                connection=connection
+            )
+            message.attach_alternative(html, 'text/html')
+            message.send()
+        except Exception as e:
+            logger.warning("Outbox email %s to %s failed: %s", row.pk, row.recipient, e)
+            # Drop a possibly broken connection; it reopens on the next send
+            connection.close()
+            row.attempts += 1
+            row.last_error = str(e)
+            if row.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                row.status = 'failed'
+            else:
+                row.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(row.attempts))
+            row.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+            failed += 1
+            continue
+
+        row.attempts += 1
+        row.status = 'sent'
+        row.sent_at = timezone.now()
+        row.save(update_fields=['attempts', 'status', 'sent_at'])
+        sent += 1
+    return sent, failed
+
+
+def run_sender(batch_size=None, once=False, poll_interval=5.0):
+    """
+    Deliver due rows until none are left (once) or forever.  One email
+    connection is kept open while there is work and closed when idle.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    connection = get_connection()
+    totals = [0, 0]
+    try:
+        while True:
+            close_old_connections()
+            rows = claim_due(batch_size)
+            if not rows:
+                connection.close()
+                if once:
+                    return tuple(totals)
+                time.sleep(poll_interval)
+                continue
+            sent, failed = deliver(rows, connection)
+            totals[0] += sent
+            totals[1] += failed
+    finally:
+        connection.close()
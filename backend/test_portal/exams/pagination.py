@@ -0,0 +1,93 @@
+# exams/pagination.py
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class OptionalPageNumberPagination(PageNumberPagination):
+    """
+    Page-number pagination that only kicks in when the client asks for it
+    with ?page= or ?page_size=, so existing list consumers keep working.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        params = request.query_params
+        if self.page_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().get_page_size(request)
+
+
+class ScoreKeysetPagination(BasePagination):
+    """
+    Keyset pagination over (-score_percentage, id).  The cursor carries the
+    last row's key, so every page is `WHERE key after cursor LIMIT n` on an
+    index and deep pages cost the same as the first one (no OFFSET).
+    """
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = 0
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            percentage, last_id, position = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(score_percentage__lt=percentage) |
+                Q(score_percentage=percentage, id__gt=last_id)
+            )
+
+        rows = list(queryset.order_by('-score_percentage', 'id')[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.start_position = position + 1
+        self.next_cursor = None
+        if self.has_next:
+            last = rows[-1]
+            self.next_cursor = self.encode_cursor(
+                last.score_percentage, last.id, position + len(rows)
+            )
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, percentage, last_id, position):
+        raw = json.dumps([percentage, last_id, position]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            percentage, last_id, position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return float(percentage), int(last_id), int(position)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound("Invalid cursor.")
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        })
@@ -0,0 +1,171 @@
+# exams/papers.py
+"""
+Pre-built question papers for group tests.  Papers (settings.
+GROUP_TEST_PAPER_VARIANTS shuffled variants per test) are sampled ahead of
+`scheduled_start` by a background job or `manage.py build_group_test_papers`,
+and built lazily on first join otherwise.  Their serialized payload is kept
+in the cache, so a first join is one cached read plus the session inserts,
+and every later join (refreshes, reconnects) is one indexed lookup.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import invitations, progress
+from .models import GroupTestPaper, TestSession
+from .sampling import sample_questions
+
+CACHE_KEY = 'group-test-paper:{}:{}'
+
+
+def question_payload(question):
+    """The fields participants see; the correct option is never sent."""
+    return {
+        'id': question.id,
+        'question_text': question.question_text,
+        'option_a': question.option_a,
+        'option_b': question.option_b,
+        'option_c': question.option_c,
+        'option_d': question.option_d,
+    }
+
+
+def variant_count():
+    return max(1, settings.GROUP_TEST_PAPER_VARIANTS)
+
+
+def variant_for(user_id):
+    return user_id % variant_count()
+
+
+def _cache_timeout(group_test):
+    # Keep papers cached until well after the test has finished
+    remaining = (group_test.ends_at - timezone.now()).total_seconds()
+    return int(max(remaining, 0)) + settings.GROUP_TEST_PAPER_CACHE_GRACE
+
+
+def _cached(paper):
+    return {
+        'paper_id': paper.id,
+        'variant': paper.variant,
+        'question_ids': paper.question_ids,
+        'questions': paper.payload,
+    }
+
+
+def build_paper(group_test, variant):
+    """
+    Sample and store one variant, or return the stored one if another
+    process got there first.  Raises NotEnoughQuestions.
+    """
+    existing = GroupTestPaper.objects.filter(group_test=group_test, variant=variant).first()
+    if existing is not None:
+        return existing
+
+    chosen = sample_questions(group_test.course_id, group_test.question_count)
+    try:
+        with transaction.atomic():
+            return GroupTestPaper.objects.create(
+                group_test=group_test,
+                variant=variant,
+                question_ids=[q.id for q in chosen],
+                payload=[question_payload(q) for q in chosen],
+            )
+    except IntegrityError:
+        return GroupTestPaper.objects.get(group_test=group_test, variant=variant)
+
+
+def build_papers(group_test):
+    """Build (or load) every variant and prime the cache; returns them."""
+    papers = [build_paper(group_test, variant) for variant in range(variant_count())]
+    timeout = _cache_timeout(group_test)
+    cache.set_many(
+        {CACHE_KEY.format(group_test.id, p.variant): _cached(p) for p in papers},
+        timeout
+    )
+    return papers
+
+
+def get_paper(group_test, variant):
+    """Cached paper dict for one variant, building it on a miss."""
+    key = CACHE_KEY.format(group_test.id, variant)
+    paper = cache.get(key)
+    if paper is None:
+        paper = _cached(build_paper(group_test, variant))
+        cache.set(key, paper, _cache_timeout(group_test))
+    return paper
+
+
+def create_session(group_test, user, paper):
+    """
+    Insert the participant's session and its questions (two INSERTs).
+    Raises IntegrityError if the user already has a session for the test.
+    """
+    through = TestSession.questions.through
+    with transaction.atomic():
+        session = TestSession.objects.create(
+            user=user,
+            course_id=group_test.course_id,
+            group_test=group_test,
+            paper_id=paper['paper_id'],
+            duration=group_test.duration_minutes * 60,
+            question_count=len(paper['question_ids'])
+        )
+        through.objects.bulk_create(
+            through(testsession_id=session.id, question_id=question_id)
+            for question_id in paper['question_ids']
+        )
+    return session
+
+
+def _paper_from_session(session_id):
+    # The session's paper is gone; rebuild its payload from the M2M rows,
+    # which are inserted in paper order.
+    through = TestSession.questions.through
+    links = through.objects.filter(
+        testsession_id=session_id
+    ).select_related('question').order_by('id')
+    questions = [question_payload(link.question) for link in links]
+    return {
+        'paper_id': None,
+        'variant': None,
+        'question_ids': [q['id'] for q in questions],
+        'questions': questions,
+    }
+
+
+def existing_session(group_test, user):
+    """(session id, paper) of the user's session in the test, or None."""
+    row = TestSession.objects.filter(
+        group_test=group_test, user=user
+    ).values_list('id', 'paper__variant').first()
+    if row is None:
+        return None
+    session_id, variant = row
+    if variant is None:
+        return session_id, _paper_from_session(session_id)
+    return session_id, get_paper(group_test, variant)
+
+
+def join(group_test, user):
+    """
+    Return (session id, paper) for the user, creating the session on the
+    first join only.  The unique (group test, user) constraint settles
+    concurrent first joins: the loser returns the winner's session.
+    """
+    joined = existing_session(group_test, user)
+    if joined is not None:
+        return joined
+
+    paper = get_paper(group_test, variant_for(user.id))
+    try:
+        session = create_session(group_test, user, paper)
+    except IntegrityError:
+        joined = existing_session(group_test, user)
+        if joined is None:
+            raise
+        return joined
+    invitations.mark_joined(group_test, user)
+    progress.notify_changed(group_test.id)
+    return session.id, paper
@@ -0,0 +1,174 @@
+# exams/parsing.py
+# Question parsing.  Nothing here touches the database, so these functions
+# can run inside a worker process pool.  Text extraction lives in
+# exams/extraction.py.
+import re
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+
+class DocumentError(Exception):
+    """Raised when an uploaded document cannot be read or parsed."""
+
+
+# "12. Text", "12) Text" or "12 Text", but not "3.5 km" continuing a line
+QUESTION_LINE = re.compile(r'^\s*(\d+)(?:\s*[.):](?:\s+|$)|\s+(?=[^\W\d_]))(.*)$')
+OPTION_MARKER = re.compile(r'(?:^|\s)\(?([a-dA-D])\s*[.)]\s*')
+ANSWER_LINE = re.compile(
+    r'^\s*(?:correct\s+answer|answer|ans|correct|corr)\b\s*[:.\-]?\s*\(?([a-dA-D])\b',
+    re.IGNORECASE
+)
+LETTERS = 'ABCD'
+
+
+class MultichoiceParser:
+    """
+    Line-oriented state machine for numbered multiple-choice questions::
+
+        1. Question text (may continue on following lines)
+        a) option   b) option     <- one or several options per line,
+        c) option                    or after the question text itself
+        c) option
+        d) option
+        Answer: B
+
+    Every line is looked at once, so the cost is linear in the document
+    size.  Blocks that do not complete are recorded in `errors` with the
+    line they start on instead of being dropped silently.
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.found = 0
+        self.line_number = 0
+        self._block = None
+
+    def parse(self, pages):
+        """Yield questions from an iterable of page (or chunk) strings."""
+        for page in pages:
+            for line in page.splitlines():
+                question = self.feed(line)
+                if question is not None:
+                    yield question
+        self.close()
+
+    def feed(self, line):
+        """Consume one line; return a question when one is completed."""
+        self.line_number += 1
+        stripped = line.strip()
+        if not stripped:
+            return None
+
+        answer = ANSWER_LINE.match(stripped)
+        if answer:
+            return self._finish(answer.group(1).upper())
+
+        question = QUESTION_LINE.match(stripped)
+        if question:
+            self._abandon("question has no answer line")
+            text = question.group(2)
+            inline = self._inline_options(text)
+            self._block = {
+                'line': self.line_number,
+                'text': [text[:inline]],
+                'options': {},
+                'current': None,
+            }
+            if inline is not None:
+                self._feed_options(text[inline:].strip())
+            return None
+
+        if self._block is None:
+            return None
+
+        if self._feed_options(stripped):
+            return None
+
+        # Continuation of the question text or of the last option
+        current = self._block['current']
+        if current is None:
+            self._block['text'].append(stripped)
+        else:
+            self._block['options'][current].append(stripped)
+        return None
+
+    def close(self):
+        self._abandon("document ended before the answer line")
+
+    def _feed_options(self, line):
+        """Split a line starting with an option marker into its options."""
+        block = self._block
+        first = OPTION_MARKER.match(line)
+        if first is None:
+            return False
+
+        expected = len(block['options'])
+        if expected == len(LETTERS) or first.group(1).upper() != LETTERS[expected]:
+            if block['current'] is not None:
+                # e.g. "b. ..." inside the text of an option
+                return False
+            self._abandon(
+                f"options out of order (expected A, got {first.group(1).upper()})"
+            )
+            return True
+
+        starts = self._option_starts(line, first, expected)
+        for marker, following in zip(starts, starts[1:] + [None]):
+            end = following.start() if following else len(line)
+            letter = marker.group(1).upper()
+            block['options'][letter] = [line[marker.end():end].strip()]
+            block['current'] = letter
+        return True
+
+    def _inline_options(self, text):
+        """
+        Where options begin on the question line, or None.  It takes an A
+        and a B marker of the same case, so the "A." in "... of plan A.
+        Then (a) x (b) y" stays question text.
+        """
+        for marker in OPTION_MARKER.finditer(text):
+            if marker.group(1).upper() != LETTERS[0]:
+                continue
+            starts = self._option_starts(text, marker, 0)
+            if len(starts) > 1 and starts[1].group(1).islower() == marker.group(1).islower():
+                return marker.start()
+        return None
+
+    @staticmethod
+    def _option_starts(line, first, expected):
+        # Later markers only count when they carry the next letter, so
+        # "a) Plan A. Then" stays a single option.
+        starts = [first]
+        for marker in OPTION_MARKER.finditer(line, first.end()):
+            following = expected + len(starts)
+            if following < len(LETTERS) and marker.group(1).upper() == LETTERS[following]:
+                starts.append(marker)
+        return starts
+
+    def _finish(self, answer):
+        block = self._block
+        if block is None:
+            return None
+        self._block = None
+        missing = [letter for letter in LETTERS if letter not in block['options']]
+        if missing:
+            self._record(block, f"missing option {', '.join(missing)}")
+            return None
+        self.found += 1
+        question = {
+            'line': block['line'],
+            'text': ' '.join(part for part in block['text'] if part).strip(),
+            'answer': answer,
+        }
+        for letter in LETTERS:
+            question[letter] = ' '.join(block['options'][letter]).strip()
+        return question
+
+    def _abandon(self, reason):
+        if self._block is not None:
+            self._record(self._block, reason)
+            self._block = None
+
+    def _record(self, block, reason):
+        self.errors.append({'line': block['line'], 'error': reason})
+
@@ -0,0 +1,218 @@
+# exams/previews.py
+"""
+Previews of material files, so search results can show something before
+anyone downloads the file: a first-page thumbnail and the first
+MATERIAL_PREVIEW_TEXT_BYTES of text.  They are made once per StoredBlob
+by the `material_preview` job, the rendering in the worker's process
+pool; the thumbnail is stored next to the blob as `<blob>.thumb.jpg` and
+the text is searched too, see exams/search.py.
+
+PyPDF2 can't rasterize pages, so a PDF thumbnail is the largest image
+embedded in its first page (scans and slide exports are mostly one page
+image) and a DOCX thumbnail its first image.  Without one, a card with
+the start of the text is drawn instead.
+"""
+import io
+import os
+import tempfile
+import textwrap
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from . import search
+from .blobs import storage
+from .models import Material, StoredBlob
+
+CACHE_KEY = 'material-preview:{}'
+PREVIEWABLE = ('.pdf', '.docx', '.txt')
+
+
+def _clip(text, limit):
+    # Cut on a UTF-8 boundary
+    return text.encode('utf-8')[:limit].decode('utf-8', 'ignore')
+
+
+def _pdf(path, limit):
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(path)
+    parts, length = [], 0
+    for page in reader.pages:
+        text = page.extract_text() or ''
+        parts.append(text)
+        length += len(text.encode('utf-8'))
+        if length >= limit:
+            break
+    image = None
+    if reader.pages:
+        try:
+            images = reader.pages[0].images
+            if images:
+                image = max(images, key=lambda i: len(i.data)).data
+        except Exception:
+            # Unsupported image filters are common; fall back to a text card
+            image = None
+    return '\n'.join(parts), image
+
+
+def _docx(path, limit):
+    from docx import Document
+
+    doc = Document(path)
+    parts, length = [], 0
+    for paragraph in doc.paragraphs:
+        parts.append(paragraph.text)
+        length += len(paragraph.text.encode('utf-8'))
+        if length >= limit:
+            break
+    image = None
+    for shape in doc.inline_shapes:
+        rel_id = shape._inline.graphic.graphicData.pic.blipFill.blip.embed
+        image = doc.part.related_parts[rel_id].blob
+        break
+    return '\n'.join(parts), image
+
+
+def _txt(path, limit):
+    with open(path, 'rb') as f:
+        return f.read(limit).decode('utf-8', 'ignore'), None
+
+
+def _text_card(text, size):
+    from PIL import Image, ImageDraw
+
+    width, height = size, int(size * 1.3)
+    card = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(card)
+    lines = []
+    for paragraph in text.splitlines():
+        lines.extend(textwrap.wrap(paragraph, width=max(10, width // 7)) or [''])
+    y = 8
+    for line in lines:
+        if y > height - 16:
+            break
+        draw.text((8, y), line, fill='black')
+        y += 12
+    return card
+
+
+def render(path, filename, text_limit, thumbnail_size):
+    """
+    (text, JPEG thumbnail bytes) for a file on local disk.  Database-free
+    and picklable, for JobContext.run_in_pool.
+    """
+    from PIL import Image
+
+    ext = os.path.splitext(filename)[1].lower()
+    extract = {'.pdf': _pdf, '.docx': _docx, '.txt': _txt}[ext]
+    text, image_bytes = extract(path, text_limit)
+    text = _clip(text.strip(), text_limit)
+
+    thumbnail = None
+    if image_bytes:
+        try:
+            thumbnail = Image.open(io.BytesIO(image_bytes))
+            thumbnail.load()
+        except Exception:
+            thumbnail = None
+    if thumbnail is None:
+        thumbnail = _text_card(text, thumbnail_size)
+    thumbnail = thumbnail.convert('RGB')
+    thumbnail.thumbnail((thumbnail_size, thumbnail_size))
+    out = io.BytesIO()
+    thumbnail.save(out, 'JPEG', quality=80, optimize=True)
+    return text, out.getvalue()
+
+
+def thumbnail_name(blob_name):
+    return f'{blob_name}.thumb.jpg'
+
+
+def needs_preview(material):
+    return material.blob_id is None or material.blob.preview_status == 'pending'
+
+
+def claim(blob, reclaim=False):
+    """
+    Take the blob's previews for this job, so two materials sharing a new
+    blob don't both render it.  A retried job (reclaim) may take them over
+    from a worker that died mid-render.
+    """
+    statuses = ['pending', 'rendering'] if reclaim else ['pending']
+    claimed = StoredBlob.objects.filter(
+        pk=blob.pk, preview_status__in=statuses
+    ).update(preview_status='rendering')
+    if claimed:
+        blob.preview_status = 'rendering'
+    return bool(claimed)
+
+
+def generate(blob, run_in_pool, reclaim=False):
+    """
+    Make and store the blob's previews; the status records the outcome.
+    Returns False, doing nothing, if another job holds the blob.
+    """
+    if not claim(blob, reclaim):
+        return False
+    ext = os.path.splitext(blob.name)[1].lower()
+    if ext not in PREVIEWABLE:
+        blob.preview_status = 'unsupported'
+        blob.save(update_fields=['preview_status'])
+        return True
+
+    try:
+        with tempfile.NamedTemporaryFile(suffix=ext) as local:
+            with storage().open(blob.name, 'rb') as remote:
+                for chunk in iter(lambda: remote.read(1024 * 1024), b''):
+                    local.write(chunk)
+            local.flush()
+            text, image = run_in_pool(
+                render, local.name, blob.name,
+                settings.MATERIAL_PREVIEW_TEXT_BYTES, settings.MATERIAL_THUMBNAIL_SIZE,
+            )
+    except Exception:
+        # Don't leave the blob claimed
+        blob.preview_status = 'failed'
+        blob.save(update_fields=['preview_status'])
+        raise
+
+    if blob.thumbnail:
+        # Regenerating: free the name rather than get a suffixed copy
+        storage().delete(blob.thumbnail)
+    thumbnail = ContentFile(image)
+    thumbnail.content_type = 'image/jpeg'
+    blob.thumbnail = storage().save(thumbnail_name(blob.name), thumbnail)
+    blob.preview_text = text
+    blob.preview_status = 'ready'
+    blob.save(update_fields=['thumbnail', 'preview_text', 'preview_status'])
+    cache.delete(CACHE_KEY.format(blob.pk))
+    return True
+
+
+def reindex_materials(blob):
+    """Let search see the blob's preview text under each of its materials."""
+    material_ids = list(Material.objects.filter(blob=blob).values_list('id', flat=True))
+    transaction.on_commit(lambda: search.reindex(material_ids))
+
+
+def payload(blob):
+    """
+    What the preview endpoint returns.  The text comes from cache, so the
+    caller can load the blob with preview_text deferred; the thumbnail URL
+    is built per request (signed URLs are cached by exams/blob_cache.py).
+    """
+    if blob.preview_status != 'ready':
+        return {'status': blob.preview_status, 'text': '', 'thumbnail_url': ''}
+    key = CACHE_KEY.format(blob.pk)
+    text = cache.get(key)
+    if text is None:
+        text = StoredBlob.objects.filter(pk=blob.pk).values_list('preview_text', flat=True).first() or ''
+        cache.set(key, text, settings.MATERIAL_PREVIEW_CACHE_SECONDS)
+    return {
+        'status': 'ready',
+        'text': text,
+        'thumbnail_url': storage().url(blob.thumbnail) if blob.thumbnail else '',
+    }
@@ -0,0 +1,191 @@
+# exams/progress.py
+"""
+Live group test progress over WebSockets.  Each process keeps one
+ProgressHub per group test with connected sockets: it pushes the start
+signal at `scheduled_start`, a countdown clock, and submission counts with
+the score distribution.  Joins and submissions only mark the aggregate
+dirty through the channel layer; the hub recomputes it at most every
+GROUP_TEST_PROGRESS_BATCH_MS and sends one frame to all its sockets.
+"""
+import asyncio
+import json
+import logging
+import time
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, IntegerField, Q
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from .models import TestSession
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = 10  # score distribution in 10% steps; 100% goes in the top one
+HUBS = {}
+
+
+def progress_group(group_test_id):
+    return f'group-test.{group_test_id}.progress'
+
+
+def notify_changed(group_test_id):
+    """Tell every process's hub that a session joined or was submitted."""
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    try:
+        async_to_sync(layer.group_send)(
+            progress_group(group_test_id), {'type': 'progress.changed'}
+        )
+    except Exception:
+        # Hubs also refresh on a timer; never fail the request over this
+        logger.exception("Could not publish progress for group test %s", group_test_id)
+
+
+async def anotify_changed(group_test_id):
+    """notify_changed for async callers."""
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    try:
+        await layer.group_send(progress_group(group_test_id), {'type': 'progress.changed'})
+    except Exception:
+        logger.exception("Could not publish progress for group test %s", group_test_id)
+
+
+def progress_snapshot(group_test_id):
+    """Joined and submitted counts plus the score distribution (2 queries)."""
+    sessions = TestSession.objects.filter(group_test_id=group_test_id)
+    submitted = Q(end_time__isnull=False)
+    totals = sessions.aggregate(
+        joined=Count('id'),
+        submitted=Count('id', filter=submitted),
+    )
+    rows = sessions.filter(submitted, score__isnull=False, question_count__gt=0).annotate(
+        bucket=Least(
+            F('score') * BUCKETS / F('question_count'),
+            BUCKETS - 1,
+            output_field=IntegerField(),
+        )
+    ).values('bucket').annotate(count=Count('id')).order_by()
+    distribution = [0] * BUCKETS
+    for row in rows:
+        distribution[row['bucket']] = row['count']
+    return {
+        'joined': totals['joined'],
+        'submitted': totals['submitted'],
+        'distribution': distribution,
+    }
+
+
+def clock(group_test, now=None):
+    """Phase of the test and whole seconds to its start and end."""
+    now = now or timezone.now()
+    if now < group_test.scheduled_start:
+        phase = 'waiting'
+    elif now < group_test.ends_at:
+        phase = 'running'
+    else:
+        phase = 'ended'
+    return {
+        'phase': phase,
+        'server_time': now,
+        'seconds_to_start': max(0, int((group_test.scheduled_start - now).total_seconds())),
+        'seconds_remaining': max(0, int((group_test.ends_at - now).total_seconds())),
+    }
+
+
+class ProgressHub:
+    """Fan-out of one group test's progress to this process's sockets."""
+
+    def __init__(self, group_test):
+        self.group_test = group_test
+        self.sockets = set()
+        self.snapshot = None
+        self.dirty = True
+        self.started = timezone.now() >= group_test.scheduled_start
+        self.tasks = []
+
+    @classmethod
+    async def subscribe(cls, group_test, consumer):
+        hub = HUBS.get(group_test.id)
+        if hub is None:
+            hub = HUBS[group_test.id] = cls(group_test)
+            hub.tasks = [
+                asyncio.ensure_future(hub._listen()),
+                asyncio.ensure_future(hub._run()),
+            ]
+        hub.sockets.add(consumer)
+        state = {'type': 'state', **clock(group_test)}
+        if hub.snapshot is not None:
+            state['progress'] = hub.snapshot
+        await consumer.send(text_data=json.dumps(state, cls=DjangoJSONEncoder))
+        return hub
+
+    async def unsubscribe(self, consumer):
+        self.sockets.discard(consumer)
+        if not self.sockets and HUBS.get(self.group_test.id) is self:
+            del HUBS[self.group_test.id]
+            for task in self.tasks:
+                task.cancel()
+
+    async def broadcast(self, payload):
+        # Encode once, send the same frame to every socket
+        text = json.dumps(payload, cls=DjangoJSONEncoder)
+        await asyncio.gather(
+            *(socket.send(text_data=text) for socket in list(self.sockets)),
+            return_exceptions=True
+        )
+
+    async def _listen(self):
+        layer = get_channel_layer()
+        if layer is None:
+            return
+        channel = await layer.new_channel()
+        group = progress_group(self.group_test.id)
+        await layer.group_add(group, channel)
+        try:
+            while True:
+                message = await layer.receive(channel)
+                if message.get('type') == 'progress.changed':
+                    self.dirty = True
+        finally:
+            await layer.group_discard(group, channel)
+
+    async def _run(self):
+        batch = settings.GROUP_TEST_PROGRESS_BATCH_MS / 1000
+        refresh_every = settings.GROUP_TEST_PROGRESS_REFRESH_SECONDS
+        clock_every = settings.GROUP_TEST_PROGRESS_CLOCK_SECONDS
+        next_refresh = next_clock = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if not self.started and timezone.now() >= self.group_test.scheduled_start:
+                self.started = True
+                await self.broadcast({'type': 'start', **clock(self.group_test)})
+
+            # Without a shared layer, changes made by other processes are
+            # only picked up by the periodic refresh.
+            if self.dirty or now >= next_refresh:
+                self.dirty = False
+                next_refresh = now + refresh_every
+                snapshot = await database_sync_to_async(progress_snapshot)(self.group_test.id)
+                if snapshot != self.snapshot:
+                    self.snapshot = snapshot
+                    await self.broadcast({'type': 'progress', **snapshot})
+
+            if now >= next_clock:
+                next_clock = now + clock_every
+                current = clock(self.group_test)
+                if current['phase'] != 'ended':
+                    await self.broadcast({'type': 'clock', **current})
+
+            delay = batch
+            if not self.started:
+                to_start = (self.group_test.scheduled_start - timezone.now()).total_seconds()
+                delay = max(0, min(delay, to_start))
+            await asyncio.sleep(delay)
@@ -0,0 +1,146 @@
+# exams/question_pool.py
+"""
+Per-course pool of approved question ids, stored as a compact array('q')
+with a version counter.  Question writes invalidate it through
+exams/signals.py; bulk writes that skip signals must call invalidate().
+The backend comes from settings.QUESTION_POOL_BACKEND.
+"""
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from .models import Question
+
+ID_TYPECODE = 'q'
+
+
+class LocalMemoryPoolBackend:
+    """
+    Pools kept in this process only.  Invalidation reaches only the
+    process that wrote, so pools also expire after
+    QUESTION_POOL_LOCAL_TIMEOUT seconds to bound how stale other workers
+    get; use CachePoolBackend when running several.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._versions = {}
+        self.clock = clock
+        self.timeout = getattr(settings, 'QUESTION_POOL_LOCAL_TIMEOUT', 60)
+
+    def get(self, course_id):
+        """Return (version, pool) where pool is None on a miss."""
+        with self._lock:
+            version = self._versions.get(course_id, 1)
+            entry = self._pools.get(course_id)
+            if entry is not None and entry[0] == version and entry[2] > self.clock():
+                return version, entry[1]
+            return version, None
+
+    def set(self, course_id, version, pool):
+        with self._lock:
+            # Only keep the pool if no invalidation happened while it was built.
+            if self._versions.get(course_id, 1) == version:
+                self._pools[course_id] = (version, pool, self.clock() + self.timeout)
+
+    def invalidate(self, course_id):
+        with self._lock:
+            self._versions[course_id] = self._versions.get(course_id, 1) + 1
+            self._pools.pop(course_id, None)
+
+
+class CachePoolBackend:
+    """
+    Pools kept in a shared Django cache (settings.QUESTION_POOL_CACHE).
+    Pointing that alias at LocMemCache gives a local stand-in for Redis.
+    """
+
+    key_prefix = 'question_pool'
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'QUESTION_POOL_CACHE', 'default')]
+        self.timeout = getattr(settings, 'QUESTION_POOL_TIMEOUT', 3600)
+
+    def _version_key(self, course_id):
+        return f'{self.key_prefix}:{course_id}:version'
+
+    def _pool_key(self, course_id, version):
+        return f'{self.key_prefix}:{course_id}:{version}'
+
+    def _version(self, course_id):
+        key = self._version_key(course_id)
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, 1, timeout=None)
+            version = self.cache.get(key, 1)
+        return version
+
+    def get(self, course_id):
+        version = self._version(course_id)
+        raw = self.cache.get(self._pool_key(course_id, version))
+        if raw is None:
+            return version, None
+        pool = array(ID_TYPECODE)
+        pool.frombytes(raw)
+        return version, pool
+
+    def set(self, course_id, version, pool):
+        # Pools are written under their version, so a pool built before an
+        # invalidation lands on a key nobody reads any more.
+        self.cache.set(
+            self._pool_key(course_id, version), pool.tobytes(), self.timeout
+        )
+
+    def invalidate(self, course_id):
+        key = self._version_key(course_id)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # Version key was evicted; a timestamp cannot collide with the
+            # version readers last saw.
+            self.cache.set(key, time.time_ns(), timeout=None)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(
+                    settings,
+                    'QUESTION_POOL_BACKEND',
+                    'exams.question_pool.LocalMemoryPoolBackend',
+                )
+                _backend = import_string(path)()
+    return _backend
+
+
+def load_pool(course_id):
+    """Read the approved ids of a course straight from the database."""
+    ids = Question.objects.filter(
+        course_id=course_id, status='approved'
+    ).order_by().values_list('id', flat=True)
+    return array(ID_TYPECODE, ids)
+
+
+def get_pool(course_id):
+    """Return the cached approved-id pool of a course, building it on a miss."""
+    backend = get_backend()
+    version, pool = backend.get(course_id)
+    if pool is None:
+        pool = load_pool(course_id)
+        backend.set(course_id, version, pool)
+    return pool
+
+
+def invalidate(course_id):
+    get_backend().invalidate(course_id)
@@ -0,0 +1,85 @@
+# exams/ranking.py
+"""
+Per-user score aggregates and rank lookups.  Totals are updated with a
+delta whenever a session is scored (see leaderboard.record_session), and a
+user's rank is one COUNT over the (average, user) index instead of ranking
+every user on each dashboard load.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, FloatField, Q, Sum, When
+from django.db.models.functions import Cast
+
+from .models import LeaderboardEntry, UserScoreAggregate
+
+RANK_CACHE_KEY = 'user-rank:{}'
+
+
+def apply_delta(user_id, score_delta, questions_delta):
+    """Add a scored session's contribution (or a correction) to the totals."""
+    if not score_delta and not questions_delta:
+        return
+    UserScoreAggregate.objects.get_or_create(user_id=user_id)
+    new_score = F('total_score') + score_delta
+    new_questions = F('total_questions') + questions_delta
+    # One UPDATE: the right-hand sides all see the old column values.
+    UserScoreAggregate.objects.filter(user_id=user_id).update(
+        total_score=new_score,
+        total_questions=new_questions,
+        average=Case(
+            When(
+                Q(total_questions__gt=-questions_delta),
+                then=Cast(new_score, FloatField()) * 100.0 / new_questions,
+            ),
+            default=0.0,
+            output_field=FloatField(),
+        ),
+    )
+    cache.delete(RANK_CACHE_KEY.format(user_id))
+
+
+def compute_rank(user_id):
+    """
+    1 + the number of users with a better average (ties broken by user id,
+    as the old full ranking did).  None when the user has no scored tests.
+    """
+    aggregate = UserScoreAggregate.objects.filter(
+        user_id=user_id, total_questions__gt=0
+    ).values_list('average', flat=True).first()
+    if aggregate is None:
+        return None
+    ahead = UserScoreAggregate.objects.filter(
+        Q(average__gt=aggregate) | Q(average=aggregate, user_id__lt=user_id),
+        total_questions__gt=0,
+    ).count()
+    return ahead + 1
+
+
+def user_rank(user_id):
+    """Rank of a user, cached for at most settings.USER_RANK_CACHE_SECONDS."""
+    key = RANK_CACHE_KEY.format(user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached['rank']
+    rank = compute_rank(user_id)
+    cache.set(key, {'rank': rank}, settings.USER_RANK_CACHE_SECONDS)
+    return rank
+
+
+def rebuild(batch_size=2000):
+    """Recreate every aggregate from the leaderboard entries."""
+    UserScoreAggregate.objects.all().delete()
+    totals = LeaderboardEntry.objects.values('user_id').annotate(
+        total_score=Sum('score'), total_questions=Sum('question_count')
+    ).order_by()
+    rows = [
+        UserScoreAggregate(
+            user_id=row['user_id'],
+            total_score=row['total_score'],
+            total_questions=row['total_questions'],
+            average=row['total_score'] * 100.0 / row['total_questions'],
+        )
+        for row in totals.iterator()
+    ]
+    UserScoreAggregate.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
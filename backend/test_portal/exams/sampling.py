@@ -0,0 +1,85 @@
+# exams/sampling.py
+import random
+
+from asgiref.sync import sync_to_async
+
+from .models import Question
+from .question_pool import get_pool, invalidate
+
+# Samples drawn before giving up when the pool keeps returning stale ids
+SAMPLE_ATTEMPTS = 2
+
+
+class NotEnoughQuestions(Exception):
+    """Raised when a course bank holds fewer questions than requested."""
+
+    def __init__(self, available, requested):
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Course has {available} questions, {requested} requested."
+        )
+
+
+def course_question_ids(course):
+    """
+    Return the approved question ids of the course from the cached pool.
+    Only primary keys are ever read, never the question text or options.
+    """
+    return get_pool(getattr(course, 'pk', course))
+
+
+def sample_ids(pool, count, rng=random):
+    """
+    Pick `count` distinct ids uniformly at random from `pool` in O(count).
+    `random.sample` gives every subset of size `count` the same probability.
+    """
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    if count > len(pool):
+        raise NotEnoughQuestions(len(pool), count)
+    return rng.sample(pool, count)
+
+
+def approved_questions():
+    return Question.objects.filter(status='approved')
+
+
+def hydrate_questions(ids):
+    """
+    Load only the chosen rows with one primary-key lookup, returned in the
+    same order as `ids` so the sampled order is preserved.  Ids deleted or
+    unapproved since the pool was built are left out; see sample_questions.
+    """
+    by_id = approved_questions().in_bulk(ids)
+    return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def sample_questions(course, count, rng=random):
+    """
+    Return `count` uniformly sampled approved `Question` objects for the
+    course: a pick from the cached id pool plus one fetch by primary key.
+    A pool holding stale ids is rebuilt and sampled again rather than
+    returning a short test; NotEnoughQuestions if it still comes up short.
+    """
+    course_id = getattr(course, 'pk', course)
+    for _ in range(SAMPLE_ATTEMPTS):
+        chosen = sample_ids(get_pool(course_id), count, rng=rng)
+        questions = hydrate_questions(chosen)
+        if len(questions) == count:
+            return questions
+        invalidate(course_id)
+    raise NotEnoughQuestions(len(questions), count)
+
+
+async def asample_questions(course, count, rng=random):
+    """sample_questions for async views; the pool is read in a thread."""
+    course_id = getattr(course, 'pk', course)
+    for _ in range(SAMPLE_ATTEMPTS):
+        chosen = sample_ids(await sync_to_async(get_pool)(course_id), count, rng=rng)
+        by_id = await approved_questions().ain_bulk(chosen)
+        questions = [by_id[pk] for pk in chosen if pk in by_id]
+        if len(questions) == count:
+            return questions
+        await sync_to_async(invalidate)(course_id)
+    raise NotEnoughQuestions(len(questions), count)
@@ -0,0 +1,60 @@
+# exams/scoring.py
+from django.db import transaction
+from django.utils import timezone
+
+from . import leaderboard
+
+
+def answer_key(session):
+    """
+    Return (question id, correct option) pairs for the session in one query.
+    Only those two columns are read; question text and options stay in the DB.
+    """
+    return session.questions.order_by().values_list('id', 'correct_option')
+
+
+def score_answers(key, answers):
+    """Score `answers` ({question id: letter}) against `key` in one pass."""
+    answers = answers or {}
+    score = 0
+    for question_id, correct_option in key:
+        # Compare upper-case to avoid case mismatches
+        if str(answers.get(str(question_id), '')).upper() == correct_option.upper():
+            score += 1
+    return score
+
+
+def score_session(session, answers):
+    """
+    Score a session, stamp its end time, save only those columns and update
+    its leaderboard entry in the same transaction.
+    """
+    return record_score(session, score_answers(answer_key(session), answers))
+
+
+def record_score(session, score):
+    """The write half of score_session, for callers that scored already."""
+    session.score = score
+    session.end_time = timezone.now()
+    with transaction.atomic():
+        session.save(update_fields=['score', 'end_time'])
+        leaderboard.record_session(session)
+    return session
+
+
+def session_result(session):
+    """Compact result payload for a scored session, without questions."""
+    percentage = (
+        session.score * 100.0 / session.question_count
+        if session.question_count else 0.0
+    )
+    return {
+        'id': session.id,
+        'course': session.course_id,
+        'score': session.score,
+        'question_count': session.question_count,
+        'score_percentage': percentage,
+        'start_time': session.start_time,
+        'end_time': session.end_time,
+        'duration': session.duration,
+    }
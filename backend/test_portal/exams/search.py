@@ -0,0 +1,363 @@
+# exams/search.py
+"""
+Ranked material search.  Each material keeps `search_text` (its tags and
+course name, kept in step by exams/signals.py) next to its name; the
+backend indexes both.  Preview text (exams/previews.py) is indexed
+separately, per StoredBlob, so its length doesn't weigh on the ranking of
+names and tags:
+
+* PostgresSearchBackend: full-text over GIN expression indexes
+  (migrations 0020 and 0028), ranked with ts_rank.
+* SqliteFtsSearchBackend: FTS5 tables kept current by triggers
+  (migrations 0020 and 0028; restored after every migrate, see
+  ensure_fts_triggers), ranked with bm25.
+* InvertedIndexSearchBackend: an in-process index built from the table,
+  for databases without either; fine for a single worker.
+
+Every word of the query must match, in the name and search_text or else
+in the preview text; the last one also matches as a prefix once it is
+MATERIAL_SEARCH_MIN_PREFIX characters long, so the same query serves
+search-as-you-type.  Results come in tiers, whatever their score: the
+name alone matches every word, then name and search_text do, then only
+the preview does.  bm25 normalizes by document length, so a weight
+can't promise that.  Within a tier the backend's score decides and ties
+go to the newest.
+"""
+import bisect
+import heapq
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from .models import Material
+
+WORD_RE = re.compile(r'\w+')
+NAME_WEIGHT = 10.0
+
+# Must match the expression of the GIN index in migration 0020
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(\"exams_material\".\"name\", '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(\"exams_material\".\"search_text\", '')), 'B')"
+)
+# Must match the expression of the GIN index in migration 0028
+PG_PREVIEW = "to_tsvector('simple', coalesce(\"exams_storedblob\".\"preview_text\", ''))"
+# Whether the name alone matches the query (Postgres, unindexed)
+PG_NAME = "to_tsvector('simple', coalesce(\"exams_material\".\"name\", ''))"
+FTS_TABLE = 'exams_material_fts'
+PREVIEW_FTS_TABLE = 'exams_storedblob_fts'
+# Same triggers as migrations 0020 and 0028: name -> (FTS table, SQL)
+FTS_TRIGGERS = {
+    'exams_material_fts_insert': (FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS exams_material_fts_insert AFTER INSERT ON exams_material BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, search_text)
+            VALUES (new.id, new.name, new.search_text);
+        END"""),
+    'exams_material_fts_delete': (FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS exams_material_fts_delete AFTER DELETE ON exams_material BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, search_text)
+            VALUES ('delete', old.id, old.name, old.search_text);
+        END"""),
+    'exams_material_fts_update': (FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS exams_material_fts_update
+        AFTER UPDATE OF name, search_text ON exams_material BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, search_text)
+            VALUES ('delete', old.id, old.name, old.search_text);
+            INSERT INTO {FTS_TABLE}(rowid, name, search_text)
+            VALUES (new.id, new.name, new.search_text);
+        END"""),
+    'exams_storedblob_fts_insert': (PREVIEW_FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS exams_storedblob_fts_insert AFTER INSERT ON exams_storedblob BEGIN
+            INSERT INTO {PREVIEW_FTS_TABLE}(rowid, preview_text) VALUES (new.id, new.preview_text);
+        END"""),
+    'exams_storedblob_fts_delete': (PREVIEW_FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS exams_storedblob_fts_delete AFTER DELETE ON exams_storedblob BEGIN
+            INSERT INTO {PREVIEW_FTS_TABLE}({PREVIEW_FTS_TABLE}, rowid, preview_text)
+            VALUES ('delete', old.id, old.preview_text);
+        END"""),
+    'exams_storedblob_fts_update': (PREVIEW_FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS exams_storedblob_fts_update
+        AFTER UPDATE OF preview_text ON exams_storedblob BEGIN
+            INSERT INTO {PREVIEW_FTS_TABLE}({PREVIEW_FTS_TABLE}, rowid, preview_text)
+            VALUES ('delete', old.id, old.preview_text);
+            INSERT INTO {PREVIEW_FTS_TABLE}(rowid, preview_text) VALUES (new.id, new.preview_text);
+        END"""),
+}
+
+
+def words(text):
+    return WORD_RE.findall((text or '').lower())
+
+
+def search_text(tags, course_name):
+    """What a material is found by besides its name and preview."""
+    return ' '.join(part for part in (tags, course_name) if part)
+
+
+def parse_query(query):
+    """Split a query into (whole words, trailing prefix or None)."""
+    terms = words(query)
+    if not terms:
+        return [], None
+    *whole, last = terms
+    if len(last) >= settings.MATERIAL_SEARCH_MIN_PREFIX:
+        return whole, last
+    return terms, None
+
+
+class PostgresSearchBackend:
+
+    def search(self, query, limit):
+        whole, prefix = parse_query(query)
+        if not whole and prefix is None:
+            return []
+        # Words are \w+ only, so they are safe inside a tsquery
+        tsquery = ' & '.join(whole + ([f'{prefix}:*'] if prefix else []))
+        sql = (
+            f'SELECT id FROM ('
+            f'SELECT "exams_material"."id" AS id, '
+            f"CASE WHEN {PG_NAME} @@ to_tsquery('simple', %(q)s) THEN 2 ELSE 1 END AS tier, "
+            f"ts_rank({PG_DOCUMENT}, to_tsquery('simple', %(q)s)) AS score "
+            f'FROM "exams_material" '
+            f"WHERE {PG_DOCUMENT} @@ to_tsquery('simple', %(q)s) "
+            f'UNION ALL '
+            f'SELECT "exams_material"."id", 0, '
+            f"ts_rank({PG_PREVIEW}, to_tsquery('simple', %(q)s)) "
+            f'FROM "exams_material" '
+            f'JOIN "exams_storedblob" ON "exams_storedblob"."id" = "exams_material"."blob_id" '
+            f"WHERE {PG_PREVIEW} @@ to_tsquery('simple', %(q)s) "
+            f"AND NOT {PG_DOCUMENT} @@ to_tsquery('simple', %(q)s)"
+            f') AS hits ORDER BY tier DESC, score DESC, id DESC LIMIT %(limit)s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'q': tsquery, 'limit': limit})
+            return [row[0] for row in cursor.fetchall()]
+
+    def index(self, material_ids):
+        pass
+
+    def remove(self, material_ids):
+        pass
+
+
+class SqliteFtsSearchBackend:
+
+    def search(self, query, limit):
+        whole, prefix = parse_query(query)
+        if not whole and prefix is None:
+            return []
+        match = ' '.join([f'"{w}"' for w in whole] + ([f'"{prefix}"*'] if prefix else []))
+        matching = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        sql = (
+            f'SELECT id FROM ('
+            f'SELECT rowid AS id, rowid IN ({matching}) AS tier, '
+            f'bm25({FTS_TABLE}, {NAME_WEIGHT}, 1.0) AS score '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'UNION ALL '
+            f'SELECT m.id, -1, p.score FROM exams_material m JOIN ('
+            f'SELECT rowid AS blob_id, bm25({PREVIEW_FTS_TABLE}) AS score '
+            f'FROM {PREVIEW_FTS_TABLE} WHERE {PREVIEW_FTS_TABLE} MATCH %s'
+            f') p ON p.blob_id = m.blob_id '
+            f'WHERE m.id NOT IN ({matching})'
+            f') ORDER BY tier DESC, score, id DESC LIMIT %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [f'name : ({match})', match, match, match, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+    def index(self, material_ids):
+        pass
+
+    def remove(self, material_ids):
+        pass
+
+
+class _Postings:
+    """word -> {document id: weight}, plus the sorted vocabulary for prefixes."""
+
+    def __init__(self):
+        self.words = defaultdict(dict)
+        self.documents = {}
+        self.vocabulary = []
+
+    def add(self, doc_id, weights):
+        self.documents[doc_id] = weights
+        for word, weight in weights.items():
+            self.words[word][doc_id] = weight
+
+    def discard(self, doc_id):
+        for word in self.documents.pop(doc_id, ()):
+            postings = self.words.get(word)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.words[word]
+
+    def sort(self):
+        self.vocabulary = sorted(self.words)
+
+    def _prefixed(self, prefix):
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(prefix):
+                break
+            yield word
+
+    def match(self, whole, prefix):
+        """{id: (score, lightest word weight)} of documents with every word."""
+        candidates = [self.words.get(w, {}) for w in whole]
+        if prefix is not None:
+            merged = {}
+            for word in self._prefixed(prefix):
+                for doc_id, weight in self.words[word].items():
+                    merged[doc_id] = max(weight, merged.get(doc_id, 0))
+            candidates.append(merged)
+        # Intersect starting from the rarest word
+        candidates.sort(key=len)
+        hits = {i: (w, w) for i, w in candidates[0].items()}
+        for postings in candidates[1:]:
+            hits = {
+                i: (score + postings[i], min(lightest, postings[i]))
+                for i, (score, lightest) in hits.items() if i in postings
+            }
+            if not hits:
+                break
+        return hits
+
+
+class InvertedIndexSearchBackend:
+    """
+    Postings for names and search_text, and separately for preview text,
+    both keyed by material id.  Built from the table on first use and
+    updated through index()/remove() by exams/signals.py and
+    exams/previews.py, so it only sees this process's writes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._materials = None
+        self._previews = None
+
+    def _rows(self, queryset):
+        return queryset.order_by().values_list('id', 'name', 'search_text', 'blob__preview_text')
+
+    def _load(self):
+        self._materials, self._previews = _Postings(), _Postings()
+        for row in self._rows(Material.objects.all()).iterator(chunk_size=2000):
+            self._add(*row)
+        self._materials.sort()
+        self._previews.sort()
+
+    def _add(self, material_id, name, text, preview_text):
+        weights = dict.fromkeys(words(text), 1.0)
+        weights.update(dict.fromkeys(words(name), NAME_WEIGHT))
+        self._materials.add(material_id, weights)
+        if preview_text:
+            self._previews.add(material_id, dict.fromkeys(words(preview_text), 1.0))
+
+    def _discard(self, material_id):
+        self._materials.discard(material_id)
+        self._previews.discard(material_id)
+
+    def search(self, query, limit):
+        whole, prefix = parse_query(query)
+        if not whole and prefix is None:
+            return []
+        with self._lock:
+            if self._materials is None:
+                self._load()
+            hits = self._materials.match(whole, prefix)
+            previewed = self._previews.match(whole, prefix)
+        # A word found in the name weighs NAME_WEIGHT, so the name matched
+        # every word if the lightest one does
+        ranked = [
+            (2 if lightest >= NAME_WEIGHT else 1, score, material_id)
+            for material_id, (score, lightest) in hits.items()
+        ]
+        ranked.extend(
+            (0, score, material_id)
+            for material_id, (score, _) in previewed.items() if material_id not in hits
+        )
+        return [material_id for _, _, material_id in heapq.nlargest(limit, ranked)]
+
+    def index(self, material_ids):
+        rows = list(self._rows(Material.objects.filter(id__in=material_ids)))
+        with self._lock:
+            if self._materials is None:
+                return
+            for row in rows:
+                self._discard(row[0])
+                self._add(*row)
+            self._materials.sort()
+            self._previews.sort()
+
+    def remove(self, material_ids):
+        with self._lock:
+            if self._materials is None:
+                return
+            for material_id in material_ids:
+                self._discard(material_id)
+            self._materials.sort()
+            self._previews.sort()
+
+
+def ensure_fts_triggers(connection):
+    """
+    Recreate any missing FTS trigger and rebuild its index.  SQLite can't
+    alter most columns in place, so Django rebuilds the table for such
+    migrations and the triggers go with the old one; exams/signals.py
+    calls this after every migrate.  Returns the names recreated.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+    tables = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        present = {row[0] for row in cursor.fetchall()}
+        missing = [
+            name for name, (table, _) in FTS_TRIGGERS.items()
+            if table in tables and name not in present
+        ]
+        for name in missing:
+            cursor.execute(FTS_TRIGGERS[name][1])
+        for table in {FTS_TRIGGERS[name][0] for name in missing}:
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+    return missing
+
+
+def default_backend_path():
+    if connection.vendor == 'postgresql':
+        return 'exams.search.PostgresSearchBackend'
+    if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        return 'exams.search.SqliteFtsSearchBackend'
+    return 'exams.search.InvertedIndexSearchBackend'
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = settings.MATERIAL_SEARCH_BACKEND or default_backend_path()
+                _backend = import_string(path)()
+    return _backend
+
+
+def search(query, limit=None):
+    """Ids of the materials matching `query`, best first."""
+    return get_backend().search(query, limit or settings.MATERIAL_SEARCH_MAX_RESULTS)
+
+
+def reindex(material_ids):
+    get_backend().index(material_ids)
+
+
+def remove(material_ids):
+    get_backend().remove(material_ids)
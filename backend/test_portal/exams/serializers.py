@@ -1,28 +1,52 @@
+from django.db import transaction
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Course, Question, TestSession,GroupTest
-from google.cloud import storage
+from .models import Course, Question, TestSession,GroupTest, BackgroundJob, MaterialUpload
 import uuid
 from django.conf import settings
 
 from .models import Material
+from . import blobs
 class MaterialSerializer(serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    preview = serializers.SerializerMethodField()
     
     class Meta:
         model = Material
-        fields = ['id', 'name', 'tags', 'file', 'file_url', 'course', 'uploaded_by', 'uploaded_at']
-        read_only_fields = ['uploaded_by', 'uploaded_at', 'file_url']
+        fields = [
+            'id', 'name', 'tags', 'file', 'file_url', 'thumbnail_url', 'preview',
+            'course', 'uploaded_by', 'uploaded_at',
+        ]
+        read_only_fields = ['uploaded_by', 'uploaded_at', 'file_url', 'thumbnail_url', 'preview']
         extra_kwargs = {
             'file': {'write_only': True},
         }
     
     def get_file_url(self, obj):
         return obj.file_url
+
+    # Previews (exams/previews.py); select_related('blob') when listing
+    def get_thumbnail_url(self, obj):
+        if obj.blob_id is None or not obj.blob.thumbnail:
+            return ''
+        return obj.file.storage.url(obj.blob.thumbnail)
+
+    def get_preview(self, obj):
+        if obj.blob_id is None:
+            return ''
+        return obj.blob.preview_text[:settings.MATERIAL_PREVIEW_SNIPPET_CHARS]
     
     def create(self, validated_data):
         # The user is now handled in the view, so we don't need to pop it here
         uploaded_file = validated_data.pop('file')
+        upload_hash = validated_data.pop('upload_hash', None)
+
+        if upload_hash is not None:
+            # Content-addressed: a file already in the bucket isn't sent again
+            with transaction.atomic():
+                blob = blobs.store(uploaded_file, *upload_hash)
+                return Material.objects.create(blob=blob, file=blob.name, **validated_data)
         
         # Create material instance without file first
         material = Material.objects.create(**validated_data)
@@ -68,6 +92,24 @@ class TestSessionSerializer(serializers.ModelSerializer):
     class Meta: model = TestSession; fields = ['id','user','course','questions','start_time','end_time','score','duration','question_count']
 
 
+class TestSessionSummarySerializer(serializers.ModelSerializer):
+    """History row without questions; fetch test-session/<id>/ to drill down."""
+    course_name = serializers.CharField(source='course.name', read_only=True)
+    score_percentage = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TestSession
+        fields = [
+            'id', 'course', 'course_name', 'score', 'question_count',
+            'score_percentage', 'start_time', 'end_time', 'duration',
+        ]
+
+    def get_score_percentage(self, obj):
+        if obj.score is None or not obj.question_count:
+            return None
+        return obj.score * 100.0 / obj.question_count
+
+
 class BulkQuestionSerializer(serializers.Serializer):
     file = serializers.FileField()
     course_id = serializers.IntegerField()
@@ -83,3 +125,40 @@ class QuestionStatusSerializer(serializers.ModelSerializer):
         model = Question
         fields = ['id', 'status', 'question_text']
         read_only_fields = ['id', 'question_text']
+
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BackgroundJob
+        fields = [
+            'id', 'kind', 'status', 'progress', 'result', 'error',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+
+class MaterialUploadStartSerializer(serializers.Serializer):
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
+    name = serializers.CharField(max_length=255)
+    tags = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    content_type = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    # Lets the upload be skipped when the same file is already stored
+    sha256 = serializers.RegexField(r'^[0-9a-f]{64}$', required=False)
+
+
+class MaterialUploadSerializer(serializers.ModelSerializer):
+    upload_url = serializers.CharField(source='session_url', read_only=True)
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = MaterialUpload
+        fields = [
+            'id', 'status', 'name', 'size', 'received', 'upload_url',
+            'chunk_size', 'material', 'expires_at',
+        ]
+        read_only_fields = fields
+
+    def get_chunk_size(self, obj):
+        return settings.MATERIAL_UPLOAD_CHUNK_BYTES
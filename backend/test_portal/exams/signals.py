@@ -0,0 +1,134 @@
+# exams/signals.py
+from django.db import connections, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Trim
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from django.contrib.auth.models import User
+
+from . import blobs, invitations, jobs, previews, question_pool, search
+from .models import Course, GroupTest, LeaderboardEntry, Material, Question
+
+
+def _invalidate_on_commit(*course_ids):
+    # Invalidate after commit so no reader rebuilds a pool from rows that
+    # are about to change.
+    for course_id in {c for c in course_ids if c is not None}:
+        transaction.on_commit(
+            lambda course_id=course_id: question_pool.invalidate(course_id)
+        )
+
+
+@receiver(pre_save, sender=Question)
+def remember_previous_course(sender, instance, raw=False, **kwargs):
+    instance._previous_course_id = None
+    if instance.pk and not raw:
+        instance._previous_course_id = Question.objects.filter(
+            pk=instance.pk
+        ).values_list('course_id', flat=True).first()
+
+
+@receiver(post_save, sender=Question)
+def invalidate_pool_on_save(sender, instance, **kwargs):
+    _invalidate_on_commit(
+        instance.course_id, getattr(instance, '_previous_course_id', None)
+    )
+
+
+@receiver(post_delete, sender=Question)
+def invalidate_pool_on_delete(sender, instance, **kwargs):
+    _invalidate_on_commit(instance.course_id)
+
+
+# Leaderboard entries copy these names; keep them in step on rename.
+@receiver(post_save, sender=Course)
+def refresh_leaderboard_course_name(sender, instance, created=False, raw=False, **kwargs):
+    if not created and not raw:
+        LeaderboardEntry.objects.filter(course_id=instance.pk).exclude(
+            course_name=instance.name
+        ).update(course_name=instance.name)
+
+
+@receiver(post_save, sender=User)
+def refresh_leaderboard_username(sender, instance, created=False, raw=False, **kwargs):
+    if not created and not raw:
+        LeaderboardEntry.objects.filter(user_id=instance.pk).exclude(
+            username=instance.username
+        ).update(username=instance.username)
+
+
+# Invitee rows copy the end time for the "my group tests" index.
+@receiver(post_save, sender=GroupTest)
+def refresh_invitee_end_time(sender, instance, created=False, raw=False, **kwargs):
+    if not created and not raw:
+        invitations.reschedule(instance)
+
+
+# Materials are found by their course name too; see exams/search.py.
+@receiver(pre_save, sender=Material)
+def fill_material_search_text(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.search_text = search.search_text(instance.tags, instance.course.name)
+
+
+@receiver(post_save, sender=Material)
+def reindex_material(sender, instance, **kwargs):
+    transaction.on_commit(lambda: search.reindex([instance.pk]))
+
+
+@receiver(post_delete, sender=Material)
+def unindex_material(sender, instance, **kwargs):
+    transaction.on_commit(lambda: search.remove([instance.pk]))
+
+
+@receiver(post_save, sender=Course)
+def refresh_material_search_text(sender, instance, created=False, raw=False, **kwargs):
+    if created or raw:
+        return
+    materials = Material.objects.filter(course_id=instance.pk)
+    materials.update(search_text=Trim(Concat('tags', Value(' '), Value(instance.name))))
+    material_ids = list(materials.values_list('id', flat=True))
+    transaction.on_commit(lambda: search.reindex(material_ids))
+
+
+@receiver(post_migrate)
+def restore_material_search_triggers(sender, using='default', **kwargs):
+    if sender.name == 'exams':
+        search.ensure_fts_triggers(connections[using])
+
+
+# StoredBlob.ref_count counts the materials pointing at each blob.
+@receiver(pre_save, sender=Material)
+def remember_previous_blob(sender, instance, raw=False, **kwargs):
+    instance._previous_blob_id = None
+    if instance.pk and not raw:
+        instance._previous_blob_id = Material.objects.filter(
+            pk=instance.pk
+        ).values_list('blob_id', flat=True).first()
+
+
+@receiver(post_save, sender=Material)
+def count_blob_reference(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_blob_id', None)
+    if raw or instance.blob_id == previous:
+        return
+    if instance.blob_id is not None:
+        blobs.acquire(instance.blob_id)
+    if previous is not None:
+        blobs.release(previous)
+
+
+@receiver(post_delete, sender=Material)
+def release_blob_reference(sender, instance, **kwargs):
+    if instance.blob_id is not None:
+        blobs.release(instance.blob_id)
+
+
+# Thumbnails and preview text are made in the background; see exams/previews.py.
+@receiver(post_save, sender=Material)
+def queue_material_preview(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and previews.needs_preview(instance):
+        transaction.on_commit(lambda: jobs.enqueue(
+            'material_preview', {'material_id': instance.pk}, user=instance.uploaded_by
+        ))
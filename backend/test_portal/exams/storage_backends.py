@@ -1,24 +1,86 @@
 # storage_backends.py
 # exams/storage_backends.py
+"""
+Where material files live.  Material.file asks material_storage() for the
+backend named by settings.MATERIAL_STORAGE:
+
+* GoogleCloudMediaStorage keeps them in settings.GS_BUCKET_NAME.  The
+  google-cloud libraries, the service-account key and the client are only
+  loaded on first use, and one client with a pooled HTTP session is shared
+  by the whole process.
+  Blob metadata and signed URLs are cached per blob (exams/blob_cache.py).
+* LocalMediaStorage keeps them under settings.LOCAL_BUCKET_ROOT, for tests
+  and development without credentials.
+"""
+import threading
+from datetime import timedelta
+
 from django.conf import settings
-from google.cloud import storage
-from django.core.files.storage import Storage
+from django.core.files.storage import FileSystemStorage, Storage
 from django.utils.deconstruct import deconstructible
-from google.oauth2 import service_account
-from google.api_core.exceptions import NotFound
-import os
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from . import blob_cache
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def http_session(credentials):
+    """Authorized requests session with a connection pool sized by settings."""
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.adapters import HTTPAdapter
+
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(
+        pool_connections=settings.GCS_HTTP_POOL_SIZE,
+        pool_maxsize=settings.GCS_HTTP_POOL_SIZE,
+        max_retries=settings.GCS_HTTP_RETRIES,
+    )
+    session.mount('https://', adapter)
+    return session
+
+
+def get_client():
+    """The process-wide storage.Client, built on first call."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google.auth.credentials import with_scopes_if_required
+                from google.cloud import storage
+                from google.oauth2 import service_account
+
+                creds_path = settings.GOOGLE_APPLICATION_CREDENTIALS
+                credentials = with_scopes_if_required(
+                    service_account.Credentials.from_service_account_file(creds_path),
+                    storage.Client.SCOPE,
+                )
+                _client = storage.Client(
+                    project=settings.GS_PROJECT_ID,
+                    credentials=credentials,
+                    _http=http_session(credentials),
+                )
+    return _client
+
 
 @deconstructible
 class GoogleCloudMediaStorage(Storage):
-    def __init__(self):
-        creds_path = settings.GOOGLE_APPLICATION_CREDENTIALS
-        credentials = service_account.Credentials.from_service_account_file(creds_path)
-        self.client = storage.Client(credentials=credentials)
-        self.bucket = self.client.bucket(settings.GS_BUCKET_NAME)
-    
+    def __init__(self, bucket_name=None):
+        self.bucket_name = bucket_name or settings.GS_BUCKET_NAME
+
+    @cached_property
+    def client(self):
+        return get_client()
+
+    @cached_property
+    def bucket(self):
+        return self.client.bucket(self.bucket_name)
+
     def _save(self, name, content):
         blob = self.bucket.blob(name)
-        
+
         # Disable ACLs and use IAM policies
         blob.upload_from_file(
             content,
@@ -27,14 +89,71 @@ class GoogleCloudMediaStorage(Storage):
             predefined_acl=None,
             if_generation_match=None
         )
+        blob_cache.remember(name, size=blob.size or content.size, content_type=blob.content_type)
         return name
-    
+
+    def _open(self, name, mode='rb'):
+        return self.bucket.blob(name).open(mode)
+
+    def metadata(self, name):
+        """{'exists', 'size', 'content_type'} of a blob, from cache when possible."""
+        meta = blob_cache.metadata.get(name)
+        if meta is None:
+            blob = self.bucket.get_blob(name)
+            if blob is None:
+                blob_cache.remember(name, exists=False)
+            else:
+                blob_cache.remember_blob(blob)
+            meta = blob_cache.metadata.get(name)
+        return meta
+
     def exists(self, name):
+        return self.metadata(name)['exists']
+
+    def delete(self, name):
+        from google.api_core.exceptions import NotFound
+
         try:
-            return self.bucket.blob(name).exists()
+            self.bucket.blob(name).delete()
         except NotFound:
-            return False
-    
+            pass
+        blob_cache.forget(name)
+
+    def size(self, name):
+        return self.metadata(name)['size'] or 0
+
     def url(self, name):
+        if settings.GCS_SIGNED_URLS:
+            return self.signed_url(name)
         # Direct public URL format
-        return f"https://storage.googleapis.com/{self.bucket.name}/{name}"
\ No newline at end of file
+        return f"https://storage.googleapis.com/{self.bucket_name}/{name}"
+
+    def signed_url(self, name):
+        """A V4 signed GET URL, reused until it is close to expiring."""
+        url = blob_cache.signed_urls.get(name)
+        if url is None:
+            lifetime = settings.GCS_SIGNED_URL_SECONDS
+            url = self.bucket.blob(name).generate_signed_url(
+                version='v4', expiration=timedelta(seconds=lifetime), method='GET'
+            )
+            blob_cache.signed_urls.set(
+                name, url, lifetime - settings.GCS_SIGNED_URL_REFRESH_SECONDS
+            )
+        return url
+
+
+@deconstructible
+class LocalMediaStorage(FileSystemStorage):
+    """The bucket as a directory; see LocalUploadTarget in exams/uploads.py."""
+
+    def __init__(self, location=None, base_url=None, **kwargs):
+        super().__init__(
+            location=location or settings.LOCAL_BUCKET_ROOT,
+            base_url=base_url or settings.LOCAL_BUCKET_URL,
+            **kwargs
+        )
+
+
+def material_storage():
+    """Storage for Material.file; migrations keep this callable, not the backend."""
+    return import_string(settings.MATERIAL_STORAGE)()
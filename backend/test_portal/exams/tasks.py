@@ -0,0 +1,100 @@
+# exams/tasks.py
+# Handlers for BackgroundJob kinds; see exams/jobs.py.
+from django.contrib.auth.models import User
+
+from . import blobs, previews
+
+from .extraction import ExtractedPages
+from .ingest import ingest_questions
+from .jobs import job_handler, upload_storage
+from .models import Course, GroupTest, Material
+from .notifications import notify_admins_of_upload
+from .papers import build_papers
+from .parsing import DocumentError, MultichoiceParser
+
+
+@job_handler('parse_questions')
+def parse_questions(job, context):
+    """Extract, parse and ingest an uploaded past-question document."""
+    payload = job.payload
+    course = Course.objects.get(pk=payload['course_id'])
+    user = User.objects.filter(pk=payload.get('user_id')).first()
+    path = upload_storage.path(payload['stored_name'])
+
+    try:
+        pages = ExtractedPages(path, payload['filename'], executor=context.executor)
+        context.report_progress(5)
+
+        # PDF pages are extracted in the process pool and streamed, in
+        # order, through the parser.  Questions are collected before the
+        # ingest transaction opens so progress updates stay visible.
+        parser = MultichoiceParser()
+        questions = list(parser.parse(_tracked(pages, context)))
+        if not parser.found:
+            raise DocumentError("No valid questions found in the document")
+
+        report = ingest_questions(
+            course,
+            questions,
+            source_file=payload['filename'],
+            uploaded_by=user
+        )
+    finally:
+        upload_storage.delete(payload['stored_name'])
+
+    if user is not None:
+        notify_admins_of_upload(user, course, report['inserted'])
+
+    return {
+        'course': course.name,
+        'filename': payload['filename'],
+        'parsed': parser.found,
+        'malformed': parser.errors,
+        'pages': pages.total,
+        'extraction_cached': pages.from_cache,
+        **report,
+    }
+
+
+@job_handler('build_group_test_papers')
+def build_group_test_papers(job, context):
+    """Sample and cache the question papers of a scheduled group test."""
+    group_test = GroupTest.objects.get(pk=job.payload['group_test_id'])
+    papers = build_papers(group_test)
+    return {'group_test': group_test.id, 'variants': len(papers)}
+
+
+def _tracked(pages, context, every=10):
+    """Yield pages while reporting extraction progress between 5 and 95%."""
+    for number, page in enumerate(pages, 1):
+        if pages.total and (number % every == 0 or number == pages.total):
+            context.report_progress(5 + 90 * number / pages.total)
+        yield page
+
+
+@job_handler('material_preview')
+@job_handler('adopt_material_blob')  # queued before previews existed
+def material_preview(job, context):
+    """
+    Content-address a new material if needed, then make its blob's
+    thumbnail and preview text and put the text into search.
+    """
+    material = Material.objects.filter(pk=job.payload['material_id']).first()
+    if material is None:
+        return {'material': job.payload['material_id'], 'deleted': True}
+    freed = blobs.adopt(material)
+    material.refresh_from_db(fields=['blob'])
+    blob = material.blob
+    context.report_progress(30)
+    if blob.preview_status in ('pending', 'rendering'):
+        # A retry may take over a render its dead worker left claimed
+        previews.generate(blob, context.run_in_pool, reclaim=job.attempts > 1)
+    previews.reindex_materials(blob)
+    return {
+        'material': material.id,
+        'blob': blob.id,
+        'deduplicated': freed > 0,
+        'bytes_freed': freed,
+        'preview': blob.preview_status,
+        'preview_chars': len(blob.preview_text),
+    }
@@ -1,3 +1,155 @@
-from django.test import TestCase
+import hashlib
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import jobs, scoring, search
+from .parsing import MultichoiceParser
+from .models import BackgroundJob, Course, Material, StoredBlob, TestSession, UserScoreAggregate
+
+LONG_TEXT = ' '.join(f'topic{i}' for i in range(1500))
+# As much preview text as MATERIAL_PREVIEW_TEXT_BYTES keeps, mentioning the word
+LONG_PREVIEW = f'okad {LONG_TEXT}'[:8192]
+
+
+class MaterialSearchRankingTests(TestCase):
+    """Name matches come first in every backend, however long the row."""
+
+    backends = (search.SqliteFtsSearchBackend, search.InvertedIndexSearchBackend)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='ranking')
+        cls.course = Course.objects.create(name='Petroleum engineering')
+
+    def material(self, name, tags='', long_row=False, preview_text=''):
+        blob = None
+        if preview_text:
+            blob = StoredBlob.objects.create(
+                sha256=hashlib.sha256(name.encode()).hexdigest(), name=f'blobs/{name}', size=1,
+                preview_status='ready', preview_text=preview_text,
+            )
+        material = Material.objects.create(
+            course=self.course, name=name, tags=tags, file='materials/x.pdf', uploaded_by=self.user, blob=blob
+        )
+        if long_row:
+            # A long row is what bm25's length normalization penalizes
+            Material.objects.filter(pk=material.pk).update(search_text=LONG_TEXT)
+        return material
+
+    def test_name_match_outranks_tag_match_on_a_longer_row(self):
+        named = [self.material(f'okad {i}', long_row=True) for i in range(2)]
+        tagged = [self.material('pet407', 'okad'), self.material('pet 407', 'okad')]
+        for backend in self.backends:
+            with self.subTest(backend=backend.__name__):
+                ids = backend().search('okad', 10)
+                self.assertEqual(set(ids[:2]), {m.pk for m in named})
+                self.assertEqual(set(ids[2:]), {m.pk for m in tagged})
+
+    def test_name_tier_needs_every_word_in_the_name(self):
+        partly = self.material('okad notes', 'reservoir')
+        fully = self.material('okad reservoir', long_row=True)
+        for backend in self.backends:
+            with self.subTest(backend=backend.__name__):
+                self.assertEqual(backend().search('okad reservoir', 10), [fully.pk, partly.pk])
+
+    def test_long_preview_does_not_outweigh_name_match(self):
+        named = self.material('okad field study', preview_text=LONG_PREVIEW)
+        tagged = self.material('pet407', 'okad')
+        for backend in self.backends:
+            with self.subTest(backend=backend.__name__):
+                self.assertEqual(backend().search('okad', 10), [named.pk, tagged.pk])
+
+    def test_preview_only_match_comes_last(self):
+        previewed = self.material('lecture 3', preview_text='okad okad okad')
+        tagged = self.material('pet407', 'okad')
+        for backend in self.backends:
+            with self.subTest(backend=backend.__name__):
+                self.assertEqual(backend().search('okad', 10), [tagged.pk, previewed.pk])
+                self.assertEqual(backend().search('oka', 10), [tagged.pk, previewed.pk])
+
+
+class MultichoiceParserTests(SimpleTestCase):
+
+    def parse(self, text):
+        parser = MultichoiceParser()
+        return list(parser.parse([text])), parser.errors
+
+    def test_number_without_punctuation_starts_a_question(self):
+        questions, errors = self.parse(
+            "12 What is porosity?\na) Void ratio\nb) Pore fraction\nc) Density\nd) Flow\nAnswer: B"
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual([(q['text'], q['B'], q['answer']) for q in questions],
+                         [('What is porosity?', 'Pore fraction', 'B')])
+
+    def test_options_on_the_question_line(self):
+        questions, errors = self.parse(
+            "1. Unit of permeability? a) Darcy b) Pascal c) Newton d) Joule\nAnswer: A\n"
+            "2) Which is of plan A. Then what? (a) One (b) Two\n(c) Three (d) Four\nAns: D"
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            [(q['text'], q['A'], q['D'], q['answer']) for q in questions],
+            [('Unit of permeability?', 'Darcy', 'Joule', 'A'),
+             ('Which is of plan A. Then what?', 'One', 'Four', 'D')],
+        )
+
+    def test_decimal_continuation_line_does_not_start_a_question(self):
+        questions, errors = self.parse(
+            "4. A well is drilled to a depth of\n3.5 km. What is the pressure?\n"
+            "a) 35 MPa\nb) 3.5 MPa\nc) 350 MPa\nd) 0.35 MPa\nAnswer: A"
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual([q['text'] for q in questions],
+                         ['A well is drilled to a depth of 3.5 km. What is the pressure?'])
+
+
+class UploadPassQuestionsJobTests(TestCase):
+
+    def test_upload_rejects_unsupported_question_type_before_queueing(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username='uploader'))
+        course = Course.objects.create(name='Drilling')
+        response = client.post(reverse('upload-pass-questions-job'), {
+            'file': SimpleUploadedFile('q.txt', b'1. Q\na) 1\nb) 2\nc) 3\nd) 4\nAnswer: A'),
+            'course_id': course.pk,
+            'question_type': 'theory',
+        }, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(BackgroundJob.objects.exists())
+
+
+class BackgroundJobTests(TestCase):
+
+    def test_result_is_dropped_once_the_lease_is_lost(self):
+        jobs.job_handler('test_lease')(lambda job, context: {'run': 'old'})
+        self.addCleanup(jobs.HANDLERS.pop, 'test_lease')
+        BackgroundJob.objects.create(kind='test_lease', payload={})
+        job = jobs.claim_next()
+        # Another worker claimed it again after the lease ran out
+        BackgroundJob.objects.filter(pk=job.pk).update(started_at=timezone.now() + timedelta(seconds=1))
+
+        jobs.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), ('running', None))
+
+
+class LeaderboardRecordTests(TestCase):
+
+    def test_resubmitting_a_session_moves_the_totals_once(self):
+        user = User.objects.create(username='scorer')
+        session = TestSession.objects.create(
+            user=user, course=Course.objects.create(name='Geology'), question_count=10, duration=600
+        )
+        scoring.record_score(session, 6)
+        scoring.record_score(TestSession.objects.get(pk=session.pk), 8)
+
+        totals = UserScoreAggregate.objects.get(user=user)
+        self.assertEqual((totals.total_score, totals.total_questions), (8, 10))
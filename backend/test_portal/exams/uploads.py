@@ -0,0 +1,287 @@
+# exams/uploads.py
+"""
+Resumable material uploads that never pass through a web worker.
+
+1. start() records a MaterialUpload and asks the target for an upload URL:
+   a GCS resumable session, or the local chunk endpoint.
+2. The client PUTs chunks to that URL with `Content-Range: bytes a-b/size`.
+   Both targets answer 308 with the `Range` received so far until the
+   last byte arrives, so one client loop serves both.
+3. complete() checks the object's size in the bucket and only then
+   creates the Material pointing at it.
+
+Uploads still open at expires_at are aborted, and whatever they stored
+deleted, by expire() (`manage.py expire_material_uploads`).  The target
+comes from settings.MATERIAL_UPLOAD_TARGET.
+"""
+import re
+import shutil
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.utils.text import get_valid_filename
+
+from . import blob_cache, blobs
+from .models import Material, MaterialUpload
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+COPY_BUFFER = 64 * 1024
+
+
+class UploadError(Exception):
+    """The request can't be applied to the upload; the message is for the client."""
+
+
+class OutOfOrder(UploadError):
+    """A chunk that doesn't start where the upload left off."""
+
+    def __init__(self, received):
+        super().__init__(f'Expected the chunk starting at byte {received}.')
+        self.received = received
+
+
+class GcsUploadTarget:
+    """Chunks go to a GCS resumable session; the browser talks to GCS directly."""
+
+    @property
+    def bucket(self):
+        return Material._meta.get_field('file').storage.bucket
+
+    def start(self, upload, request):
+        blob = self.bucket.blob(upload.object_name)
+        return blob.create_resumable_upload_session(
+            content_type=upload.content_type or None,
+            size=upload.size,
+            origin=request.headers.get('Origin'),
+        )
+
+    def write(self, upload, start, stream, length):
+        raise UploadError('Send chunks to the upload_url returned for this upload.')
+
+    def finalize(self, upload):
+        """Size of the stored object, or None if it isn't there."""
+        blob = self.bucket.get_blob(upload.object_name)
+        if blob is None:
+            return None
+        # Listings of the new material then need no metadata lookups
+        blob_cache.remember_blob(blob)
+        return blob.size
+
+    def abort(self, upload):
+        from requests import RequestException
+
+        if upload.session_url:
+            # Cancel the session so a client still sending can't recreate
+            # the object; GCS would otherwise keep it for a week
+            try:
+                self.bucket.client._http.delete(upload.session_url, timeout=30)
+            except RequestException:
+                pass
+        # Nothing points at the object until complete() succeeds
+        Material._meta.get_field('file').storage.delete(upload.object_name)
+
+
+class LocalUploadTarget:
+    """
+    Stand-in for the bucket under settings.LOCAL_BUCKET_ROOT.  Chunks are
+    appended to `<object>.part`, which is renamed into place on completion.
+    """
+
+    def __init__(self):
+        self.root = Path(settings.LOCAL_BUCKET_ROOT).resolve()
+
+    def path(self, object_name):
+        path = (self.root / object_name).resolve()
+        if self.root not in path.parents:
+            raise UploadError('Invalid object name.')
+        return path
+
+    def part_path(self, upload):
+        path = self.path(upload.object_name)
+        return path.with_name(path.name + '.part')
+
+    def start(self, upload, request):
+        part = self.part_path(upload)
+        part.parent.mkdir(parents=True, exist_ok=True)
+        part.touch()
+        return request.build_absolute_uri(
+            reverse('material-upload-chunk', args=[upload.pk])
+        )
+
+    def write(self, upload, start, stream, length):
+        with open(self.part_path(upload), 'r+b') as f:
+            f.seek(start)
+            remaining = length
+            while remaining:
+                block = stream.read(min(COPY_BUFFER, remaining))
+                if not block:
+                    raise UploadError('The chunk ended early.')
+                f.write(block)
+                remaining -= len(block)
+            f.truncate()
+
+    def finalize(self, upload):
+        part = self.part_path(upload)
+        final = self.path(upload.object_name)
+        if part.exists():
+            # Leave a short object as a part so the client can resume it
+            if part.stat().st_size != upload.size:
+                return part.stat().st_size
+            shutil.move(part, final)
+        return final.stat().st_size if final.exists() else None
+
+    def abort(self, upload):
+        self.part_path(upload).unlink(missing_ok=True)
+        # finalize() may have moved it into place before complete() failed
+        self.path(upload.object_name).unlink(missing_ok=True)
+
+
+_target = None
+
+
+def get_target():
+    global _target
+    if _target is None:
+        _target = import_string(settings.MATERIAL_UPLOAD_TARGET)()
+    return _target
+
+
+def object_name_for(upload_id, filename):
+    return f'materials/{upload_id}/{get_valid_filename(filename) or "upload"}'
+
+
+def start(request, course, name, tags, filename, size, content_type='', sha256=None):
+    """
+    Open an upload.  With the file's sha256, an identical file this user
+    or course already has is reused (see blobs.link) and the upload comes
+    back already complete, with no transfer.
+    """
+    if size <= 0:
+        raise UploadError('The file is empty.')
+    if size > settings.MATERIAL_UPLOAD_MAX_BYTES:
+        raise UploadError('The file is too large.')
+    upload = MaterialUpload(
+        user=request.user,
+        course=course,
+        name=name,
+        tags=tags,
+        content_type=content_type,
+        size=size,
+        expires_at=timezone.now() + timedelta(hours=settings.MATERIAL_UPLOAD_SESSION_HOURS),
+    )
+    upload.object_name = object_name_for(upload.id, filename)
+    if sha256:
+        material = blobs.link(
+            {'course': course, 'name': name, 'tags': tags, 'uploaded_by': request.user},
+            sha256, size,
+        )
+        if material is not None:
+            upload.material = material
+            upload.status = 'complete'
+            upload.received = size
+            upload.save()
+            return upload
+    upload.session_url = get_target().start(upload, request)
+    upload.save()
+    return upload
+
+
+def check_open(upload):
+    if upload.status != 'open':
+        raise UploadError(f'This upload is {upload.status}.')
+    if upload.expires_at <= timezone.now():
+        raise UploadError('This upload has expired; start a new one.')
+
+
+def parse_content_range(header, size):
+    match = CONTENT_RANGE_RE.match(header or '')
+    if match is None:
+        raise UploadError('Send a Content-Range header: bytes <first>-<last>/<size>.')
+    first, last, total = (int(g) for g in match.groups())
+    if total != size or last < first or last >= size:
+        raise UploadError('Content-Range does not fit this upload.')
+    return first, last - first + 1
+
+
+def receive_chunk(upload, content_range, stream):
+    """Store one chunk for the local target; returns the bytes received."""
+    check_open(upload)
+    first, length = parse_content_range(content_range, upload.size)
+    if length > settings.MATERIAL_UPLOAD_CHUNK_BYTES:
+        raise UploadError('The chunk is larger than chunk_size.')
+    if first != upload.received:
+        raise OutOfOrder(upload.received)
+    get_target().write(upload, first, stream, length)
+    # Only move forward if no other request got there first
+    updated = MaterialUpload.objects.filter(
+        pk=upload.pk, received=first
+    ).update(received=first + length)
+    if not updated:
+        upload.refresh_from_db(fields=['received'])
+        raise OutOfOrder(upload.received)
+    upload.received = first + length
+    return upload.received
+
+
+def complete(upload_id, user):
+    """Create the Material once the whole object is in the bucket."""
+    with transaction.atomic():
+        upload = MaterialUpload.objects.select_for_update(of=('self',)).select_related(
+            'material'
+        ).get(pk=upload_id, user=user)
+        if upload.status == 'complete':
+            return upload.material
+        check_open(upload)
+        stored = get_target().finalize(upload)
+        if stored is None:
+            raise UploadError('The file has not been uploaded yet.')
+        if stored != upload.size:
+            raise UploadError(f'Received {stored} of {upload.size} bytes.')
+        material = Material.objects.create(
+            course=upload.course,
+            name=upload.name,
+            tags=upload.tags,
+            file=upload.object_name,
+            uploaded_by=upload.user,
+        )
+        upload.material = material
+        upload.status = 'complete'
+        upload.received = stored
+        upload.save(update_fields=['material', 'status', 'received'])
+    # The bytes came straight from the client: the `material_preview` job
+    # queued for the new material hashes them and folds copies into an
+    # existing blob before making the previews.
+    return material
+
+
+def abort(upload):
+    check_open(upload)
+    get_target().abort(upload)
+    upload.status = 'aborted'
+    upload.save(update_fields=['status'])
+
+
+def expire(now=None):
+    """Abort open uploads past expires_at and delete what they stored."""
+    now = now or timezone.now()
+    target = get_target()
+    expired = 0
+    for upload in MaterialUpload.objects.filter(status='open', expires_at__lte=now).iterator():
+        # complete() refuses expired uploads, so only other expire() runs race
+        if MaterialUpload.objects.filter(pk=upload.pk, status='open').update(status='aborted'):
+            target.abort(upload)
+            expired += 1
+    return expired
+
+
+def purge(before):
+    """Delete finished and aborted upload rows created before `before`."""
+    deleted, _ = MaterialUpload.objects.filter(
+        status__in=['complete', 'aborted'], created_at__lt=before
+    ).delete()
+    return deleted
@@ -1,5 +1,6 @@
 # exams/urls.py
 
+from django.conf import settings
 from django.urls import path
 from .views import (
     CourseListAPIView,
@@ -14,8 +15,16 @@ from .views import (
     user_rank,
     GroupTestDetailAPIView
 )
-from .views import MaterialUploadView, MaterialSearchView,Material,MaterialDownloadView,UploadPassQuestionsView,QuestionApprovalView
+from .views import MaterialUploadView, MaterialSearchView, MaterialAutocompleteView,Material,MaterialDownloadView,UploadPassQuestionsView,QuestionApprovalView
+from .views import (
+    MaterialUploadSessionView,
+    MaterialUploadDetailView,
+    MaterialUploadChunkView,
+    MaterialUploadCompleteView,
+    MaterialPreviewView,
+)
 from . import views
+from . import async_views
 
 
 
@@ -24,8 +33,15 @@ urlpatterns = [
     path('users/', RegisterUserAPIView.as_view(), name='register-user'),
     # Material upload
     path('materials/upload/', MaterialUploadView.as_view(), name='material-upload'),
+    # Resumable uploads straight to the bucket (see exams/uploads.py)
+    path('materials/uploads/', MaterialUploadSessionView.as_view(), name='material-upload-session'),
+    path('materials/uploads/<uuid:pk>/', MaterialUploadDetailView.as_view(), name='material-upload-detail'),
+    path('materials/uploads/<uuid:pk>/chunk/', MaterialUploadChunkView.as_view(), name='material-upload-chunk'),
+    path('materials/uploads/<uuid:pk>/complete/', MaterialUploadCompleteView.as_view(), name='material-upload-complete'),
+    path('materials/<int:pk>/preview/', MaterialPreviewView.as_view(), name='material-preview'),
     path('materials/download/<int:pk>/', MaterialDownloadView.as_view(), name='material-download'),
     path('materials/search/', MaterialSearchView.as_view(), name='material-search'),
+    path('materials/autocomplete/', MaterialAutocompleteView.as_view(), name='material-autocomplete'),
     # Course listing
     path('courses/', CourseListAPIView.as_view(), name='course-list'),
 
@@ -41,12 +57,26 @@ urlpatterns = [
     path('test-session/<int:id>/', TestSessionDetailAPIView.as_view(), name='test-session-detail'),
     path('create-group-test/', CreateGroupTestAPIView.as_view(), name='create-group-test'),
     path('group-test/<int:pk>/', GroupTestDetailAPIView.as_view(), name='group-test-detail'),
+    path('my-group-tests/', views.MyGroupTestsAPIView.as_view(), name='my-group-tests'),
     path('leaderboard/', LeaderboardAPIView.as_view(), name='leaderboard'),
+    path('leaderboards/', views.LeaderboardPageAPIView.as_view(), name='leaderboard-pages'),
     path('user/rank/', user_rank, name='user-rank'),
     path('upload-pass-questions/', UploadPassQuestionsView.as_view(), name='upload-pass-questions'),
+    path('upload-pass-questions/jobs/', views.UploadPassQuestionsJobView.as_view(), name='upload-pass-questions-job'),
+    path('jobs/<int:pk>/', views.JobStatusAPIView.as_view(), name='job-status'),
+    path('chat/metrics/', views.ChatMetricsAPIView.as_view(), name='chat-metrics'),
     path('questions/pending/', QuestionApprovalView.as_view(), name='pending-questions'),
     path('questions/<int:question_id>/status/', QuestionApprovalView.as_view(), name='update-question-status'),
     path('user/upload-stats/', views.user_upload_stats, name='user-upload-stats'),
    
 ]
 
+# Serve the exam hot paths from the async views (exams/async_views.py).
+# Same URLs and responses; best under the ASGI server.
+if settings.ASYNC_EXAM_VIEWS:
+    _async_routes = {
+        'start-test': path('start-test/', async_views.start_test, name='start-test'),
+        'submit-test': path('submit-test/<int:session_id>/', async_views.submit_test, name='submit-test'),
+        'group-test-detail': path('group-test/<int:pk>/', async_views.group_test_detail, name='group-test-detail'),
+    }
+    urlpatterns = [_async_routes.get(p.name, p) for p in urlpatterns]
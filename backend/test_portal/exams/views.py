@@ -1,29 +1,21 @@
-import random
-import re
-import PyPDF2
-from docx import Document
-from io import BytesIO
+import os
+import uuid
 from rest_framework.permissions import IsAdminUser
 from django.utils.dateparse import parse_datetime
 from django.utils import timezone
 from django.db import IntegrityError
-from django.db import models
 from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
-from django.db.models import FloatField, F, ExpressionWrapper, Sum
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError, ParseError
 from django.db.models import Q
-from django.core.mail import send_mail
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 
-from .models import Course, Question, TestSession, GroupTest
+from .models import Course, Question, TestSession, GroupTest, BackgroundJob
 from .serializers import (
     UserSerializer,
     CourseSerializer,
@@ -31,11 +23,33 @@ from .serializers import (
     TestSessionSerializer,
     GroupTestSerializer,
     BulkQuestionSerializer,
+    BackgroundJobSerializer,
+    TestSessionSummarySerializer,
 )
+from .sampling import sample_questions, NotEnoughQuestions
+from .scoring import score_session, session_result
+from .ingest import ingest_questions
+from . import parsing
+from .parsing import DocumentError, MultichoiceParser
+from .extraction import ExtractedPages
+from .notifications import notify_admins_of_upload
+from . import jobs
+from .jobs import upload_storage
+from . import leaderboard
+from . import ranking
+from . import papers
+from . import outbox
+from . import invitations
+from . import progress
+from . import blobs
+from . import previews
+from . import search
+from . import uploads
+from .chat import metrics as chat_metrics
+from .pagination import OptionalPageNumberPagination, ScoreKeysetPagination
 from rest_framework.parsers import MultiPartParser
-from google.cloud import storage
-from .models import Material
-from .serializers import MaterialSerializer
+from .models import Material, MaterialUpload
+from .serializers import MaterialSerializer, MaterialUploadSerializer, MaterialUploadStartSerializer
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -43,11 +57,21 @@ from .models import Material
 from .serializers import MaterialSerializer
 from django.shortcuts import get_object_or_404
 
+def parse_flag(value):
+    """Interpret a boolean request flag sent as JSON or form data."""
+    if isinstance(value, str):
+        return value.strip().lower() not in ('0', 'false', 'no', 'off', '')
+    return bool(value)
+
+
 class MaterialUploadView(generics.CreateAPIView):
     serializer_class = MaterialSerializer
     permission_classes = [IsAuthenticated]
     
     def create(self, request, *args, **kwargs):
+        # Hash the file as it streams in; must come before request.FILES
+        request.upload_handlers.insert(0, blobs.HashingUploadHandler(request._request))
+
         # Ensure the file is present
         if 'file' not in request.FILES:
             return Response({"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST)
@@ -58,7 +82,10 @@ class MaterialUploadView(generics.CreateAPIView):
         
         try:
             # Save with the current user
-            material = serializer.save(uploaded_by=request.user)
+            material = serializer.save(
+                uploaded_by=request.user,
+                upload_hash=getattr(request._request, 'upload_hashes', {}).get('file'),
+            )
             
             # Close the file handle explicitly
             if hasattr(material.file, 'close'):
@@ -68,6 +95,81 @@ class MaterialUploadView(generics.CreateAPIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class MaterialUploadSessionView(APIView):
+    """
+    Start a resumable upload (see exams/uploads.py).  The client PUTs the
+    file in chunks to the returned upload_url, then POSTs to complete/.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = MaterialUploadStartSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = uploads.start(request, **serializer.validated_data)
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(MaterialUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+
+class MaterialUploadDetailView(APIView):
+    """Where an upload stands, to resume it; DELETE abandons it."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        upload = get_object_or_404(MaterialUpload, pk=pk, user=request.user)
+        return Response(MaterialUploadSerializer(upload).data)
+
+    def delete(self, request, pk):
+        upload = get_object_or_404(MaterialUpload, pk=pk, user=request.user)
+        try:
+            uploads.abort(upload)
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MaterialUploadChunkView(APIView):
+    """
+    Chunk endpoint of the local upload target, answering like a GCS
+    resumable session: 308 with the Range received until the last byte.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, pk):
+        upload = get_object_or_404(MaterialUpload, pk=pk, user=request.user)
+        try:
+            # Read the raw body as a stream; never parse it into memory
+            received = uploads.receive_chunk(
+                upload, request.headers.get('Content-Range'), request._request
+            )
+        except uploads.OutOfOrder as e:
+            response = Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+            if e.received:
+                response['Range'] = f'bytes=0-{e.received - 1}'
+            return response
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if received < upload.size:
+            response = Response(status=status.HTTP_308_PERMANENT_REDIRECT)
+            response['Range'] = f'bytes=0-{received - 1}'
+            return response
+        return Response(MaterialUploadSerializer(upload).data)
+
+
+class MaterialUploadCompleteView(APIView):
+    """Create the Material once every byte is in the bucket."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        get_object_or_404(MaterialUpload, pk=pk, user=request.user)
+        try:
+            material = uploads.complete(pk, request.user)
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(MaterialSerializer(material).data, status=status.HTTP_201_CREATED)
+
+
 class MaterialDownloadView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     queryset = Material.objects.all()
@@ -79,19 +181,61 @@ class MaterialDownloadView(generics.RetrieveAPIView):
         })
 
 class MaterialSearchView(generics.ListAPIView):
+    """
+    Materials matching ?query=, best match first (see exams/search.py).
+    ?page= / ?page_size= paginate; at most MATERIAL_SEARCH_MAX_RESULTS.
+    """
     serializer_class = MaterialSerializer
     permission_classes = [IsAuthenticated]
-    
-    def get_queryset(self):
-        query = self.request.query_params.get('query', '')
-        if not query:
-            return Material.objects.none()
-        
-        return Material.objects.filter(
-            models.Q(name__icontains=query) | 
-            models.Q(tags__icontains=query) |
-            models.Q(course__name__icontains=query)
+    pagination_class = OptionalPageNumberPagination
+
+    def list(self, request, *args, **kwargs):
+        ids = search.search(request.query_params.get('query', ''))
+        page = self.paginate_queryset(ids)
+        if page is not None:
+            ids = page
+        by_id = Material.objects.select_related('blob').in_bulk(ids)
+        serializer = self.get_serializer([by_id[i] for i in ids if i in by_id], many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+
+class MaterialPreviewView(APIView):
+    """Thumbnail URL and leading text of a material, without downloading it."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        material = get_object_or_404(
+            Material.objects.select_related('blob').defer('blob__preview_text'), pk=pk
+        )
+        if material.blob_id is None:
+            data = {'status': 'pending', 'text': '', 'thumbnail_url': ''}
+        else:
+            data = previews.payload(material.blob)
+        response = Response(data)
+        if data['status'] == 'ready':
+            # Don't let clients hold a signed thumbnail URL past its refresh
+            max_age = settings.MATERIAL_PREVIEW_CACHE_SECONDS
+            if settings.GCS_SIGNED_URLS:
+                max_age = min(max_age, settings.GCS_SIGNED_URL_REFRESH_SECONDS)
+            response['Cache-Control'] = f'private, max-age={max_age}'
+        return response
+
+
+class MaterialAutocompleteView(APIView):
+    """Names of the best few materials for a partly typed ?query=."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        ids = search.search(
+            request.query_params.get('query', ''),
+            limit=settings.MATERIAL_AUTOCOMPLETE_LIMIT,
         )
+        names = Material.objects.in_bulk(ids)
+        return Response([
+            {'id': i, 'name': names[i].name} for i in ids if i in names
+        ])
 
 # List all courses (authenticated)
 class CourseListAPIView(generics.ListAPIView):
@@ -147,14 +291,14 @@ class StartTestAPIView(APIView):
         duration  = int(request.data.get('duration', 0))
 
         course = get_object_or_404(Course, id=course_id)
-        questions = list(course.questions.all())
-        if count > len(questions):
+        try:
+            chosen = sample_questions(course, count)
+        except NotEnoughQuestions:
             return Response(
                 {'error': 'Not enough questions in this course.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        chosen = random.sample(questions, count)
         session = TestSession.objects.create(
             user=request.user,
             course=course,
@@ -171,35 +315,51 @@ class SubmitTestAPIView(APIView):
 
     def post(self, request, session_id):
         session = get_object_or_404(
-            TestSession, id=session_id, user=request.user
+            TestSession.objects.select_related('user', 'course'),
+            id=session_id,
+            user=request.user
         )
         answers = request.data.get('answers', {})
-        score = 0
-        for q in session.questions.all():
-            # Compare upper-case to avoid case mismatches
-            if str(answers.get(str(q.id), '')).upper() == q.correct_option.upper():
-                score += 1
+        score_session(session, answers)
+        if session.group_test_id:
+            progress.notify_changed(session.group_test_id)
 
-        session.score = score
-        session.end_time = timezone.now()
-        session.save()
+        # Clients that already hold the questions can skip the full echo.
+        if not parse_flag(request.data.get('include_questions', True)):
+            return Response(session_result(session), status=status.HTTP_200_OK)
 
         serializer = TestSessionSerializer(session)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 # History of tests
 class TestHistoryAPIView(generics.ListAPIView):
-    serializer_class = TestSessionSerializer
+    """
+    The user's sessions, newest first.  ?summary=1 returns lightweight rows
+    without questions; ?page= / ?page_size= paginate.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalPageNumberPagination
+
+    def is_summary(self):
+        return parse_flag(self.request.query_params.get('summary', False))
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return TestSessionSummarySerializer
+        return TestSessionSerializer
 
     def get_queryset(self):
-        return TestSession.objects.filter(
+        sessions = TestSession.objects.filter(
             user=self.request.user
         ).order_by('-start_time')
+        if self.is_summary():
+            return sessions.select_related('course')
+        # One extra query for every question of the page, not one per session
+        return sessions.prefetch_related('questions')
 
 # Retrieve a single test session
 class TestSessionDetailAPIView(generics.RetrieveAPIView):
-    queryset = TestSession.objects.all()
+    queryset = TestSession.objects.prefetch_related('questions')
     serializer_class = TestSessionSerializer
     lookup_field = 'id'
 
@@ -257,34 +417,14 @@ class CreateGroupTestAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Send invitations (no changes here)
-        if invitees_list:
-            try:
-                subject = f"Invitation to Group Test: {group_test.name}"
-                context = {
-                    'test_name': group_test.name,
-                    'course': group_test.course.name,
-                    'inviter': request.user.username,
-                    'question_count': group_test.question_count,
-                    'duration': group_test.duration_minutes,
-                    'scheduled_start': group_test.scheduled_start,
-                    'domain': settings.FRONTEND_DOMAIN,
-                    'test_id': group_test.id
-                }
-
-                html_message = render_to_string('email/group_test_invite.html', context)
-                plain_message = strip_tags(html_message)
-
-                send_mail(
-                    subject,
-                    plain_message,
-                    settings.EMAIL_HOST_USER,
-                    invitees_list,
-                    html_message=html_message,
-                    fail_silently=False
-                )
-            except Exception as e:
-                print(f"Error sending emails: {e}")
+        # Sample the question papers in the background before the start time
+        jobs.enqueue(
+            'build_group_test_papers', {'group_test_id': group_test.id}, user=request.user
+        )
+
+        # Invitations are delivered by `manage.py send_outbox`
+        emails = invitations.invite(group_test, invitees_list)
+        outbox.queue_group_test_invites(group_test, emails)
 
         serializer = GroupTestSerializer(group_test)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -299,14 +439,14 @@ from django.shortcuts import get_object_or_404
 class GroupTestDetailAPIView(APIView):
     """
     Return a single GroupTest.  If the scheduled_start has passed,
-    immediately create a TestSession for the requesting user
-    (pulling questions from the group-test’s course) and return
-    them plus a session_id.  Otherwise return basic info & empty questions.
+    return the requesting user's TestSession for it (created on the
+    first request only) with its questions plus a session_id.
+    Otherwise return basic info & empty questions.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        group_test = get_object_or_404(GroupTest, pk=pk)
+        group_test = get_object_or_404(GroupTest.objects.select_related('course'), pk=pk)
         now = timezone.now()
 
         # Always return these base fields:
@@ -323,37 +463,18 @@ class GroupTestDetailAPIView(APIView):
         }
 
         if now >= group_test.scheduled_start:
-            # Create a new TestSession (duration in seconds = minutes * 60)
-            questions_qs = list(group_test.course.questions.all())
-            if len(questions_qs) < group_test.question_count:
+            # Join once per user: later loads return the same session and
+            # its frozen questions from a pre-built paper (exams/papers.py).
+            try:
+                session_id, paper = papers.join(group_test, request.user)
+            except NotEnoughQuestions:
                 return Response(
                     {'error': 'Not enough questions in this course.'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            chosen = random.sample(questions_qs, group_test.question_count)
-            session = TestSession.objects.create(
-                user=request.user,
-                course=group_test.course,
-                duration=group_test.duration_minutes * 60,
-                question_count=group_test.question_count
-            )
-            session.questions.set(chosen)
-
-            # Build a plain list of question dicts:
-            q_list = []
-            for q in chosen:
-                q_list.append({
-                    'id': q.id,
-                    'question_text': q.question_text,
-                    'option_a': q.option_a,
-                    'option_b': q.option_b,
-                    'option_c': q.option_c,
-                    'option_d': q.option_d,
-                })
-
-            data['questions'] = q_list
-            data['session_id'] = session.id
+            data['questions'] = paper['questions']
+            data['session_id'] = session_id
         else:
             # Not started yet → no questions, no session_id
             data['questions'] = []
@@ -362,64 +483,102 @@ class GroupTestDetailAPIView(APIView):
         return Response(data)
 
 
+class MyGroupTestsAPIView(APIView):
+    """
+    Upcoming and active group tests the user is invited to, soonest
+    ending first.  Answered from the invitee (email/user, ends_at) indexes.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        now = timezone.now()
+        invites = invitations.current_for(request.user, now).select_related(
+            'group_test__course'
+        ).order_by('ends_at', 'group_test_id')
+
+        results = []
+        for invite in invites:
+            group_test = invite.group_test
+            results.append({
+                'id': group_test.id,
+                'name': group_test.name,
+                'course': {
+                    'id': group_test.course.id,
+                    'name': group_test.course.name
+                },
+                'question_count': group_test.question_count,
+                'duration_minutes': group_test.duration_minutes,
+                'scheduled_start': group_test.scheduled_start,
+                'ends_at': invite.ends_at,
+                'state': 'active' if group_test.scheduled_start <= now else 'upcoming',
+                'invitation_status': invite.status,
+            })
+        return Response(results)
+
+
 # Leaderboard View
 class LeaderboardAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        # Get top sessions with proper score calculation
-        sessions = TestSession.objects.annotate(
-            score_percentage=ExpressionWrapper(
-                F('score') * 100.0 / F('question_count'),
-                output_field=FloatField()
+        # Served from the materialized leaderboard (exams/leaderboard.py)
+        course_id = request.query_params.get('course')
+        try:
+            limit = int(request.query_params.get('limit', 10))
+            course_id = int(course_id) if course_id else None
+        except ValueError:
+            return Response(
+                {'error': 'course and limit must be integers.'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        ).filter(question_count__gt=0).order_by('-score_percentage')[:10]
-
-        # Serialize data
-        data = [{
-            'id': session.id,
-            'user': {'username': session.user.username},
-            'course': {'name': session.course.name},
-            'score': session.score,
-            'question_count': session.question_count,
-            'score_percentage': session.score_percentage
-        } for session in sessions]
 
+        window = request.query_params.get('window', 'all')
+        if window not in leaderboard.WINDOWS:
+            return Response(
+                {'error': f"window must be one of {', '.join(leaderboard.WINDOWS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = leaderboard.top(max(limit, 1), course_id=course_id, window=window)
+        data = [leaderboard.serialize_entry(entry) for entry in entries]
         return Response(data)
 
 
 
-# Fixed User Rank View
+class LeaderboardPageAPIView(generics.ListAPIView):
+    """
+    Paginated leaderboard filtered by ?course=<id> and ?window=day|week|all.
+    Pages follow ?cursor= (keyset), never OFFSET.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ScoreKeysetPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        try:
+            course_id = int(params['course']) if params.get('course') else None
+            return leaderboard.entries(course_id, params.get('window', 'all'))
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+
+    def list(self, request, *args, **kwargs):
+        paginator = self.paginator
+        page = paginator.paginate_queryset(self.get_queryset(), request, view=self)
+        data = []
+        for position, entry in enumerate(page, paginator.start_position):
+            row = leaderboard.serialize_entry(entry)
+            row['position'] = position
+            row['finished_at'] = entry.finished_at
+            data.append(row)
+        return paginator.get_paginated_response(data)
+
+
+# User Rank View
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_rank(request):
-    user = request.user
-
-    # Get all users with their average scores
-    users = User.objects.annotate(
-        total_score=Sum('testsession__score'),
-        total_questions=Sum('testsession__question_count')
-    ).filter(
-        total_questions__isnull=False,
-        total_questions__gt=0
-    ).annotate(
-        avg_score=ExpressionWrapper(
-            F('total_score') * 100.0 / F('total_questions'),
-            output_field=FloatField()
-        )
-    ).order_by('-avg_score', 'id')  # Order by score then by ID for consistency
-
-    # Convert to list to find rank
-    ranked_users = list(users.values_list('id', flat=True))
-
-    try:
-        # Find current user's position in the ranked list
-        rank = ranked_users.index(user.id) + 1
-    except ValueError:
-        # User not found in the ranked list (no tests taken)
-        rank = None
-
-    return Response({'rank': rank})
+    # One indexed COUNT over the maintained per-user aggregates
+    return Response({'rank': ranking.user_rank(request.user.id)})
 
 class QuestionApprovalView(APIView):
     permission_classes = [IsAdminUser]
@@ -466,129 +625,58 @@ class UploadPassQuestionsView(APIView):
         question_type = serializer.validated_data['question_type']
         course = get_object_or_404(Course, id=course_id)
         
-        # Extract text from file
-        text = self.extract_text(file)
-        
+        # Extract text from file page by page (cached by content hash)
+        pages = self.extract_pages(file)
+
         # Parse questions based on type
         if question_type == 'multichoice':
-            questions = self.parse_multichoice_questions(text)
+            # Pages stream through the parser straight into the batches
+            parser = MultichoiceParser()
+            questions = parser.parse(pages)
         else:
             return Response(
                 {"error": "Only multiple choice questions are currently supported"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Save questions to database
-        created_count = 0
-        for q in questions:
-            Question.objects.create(
-                course=course,
-                question_text=q['text'],
-                option_a=q['A'],
-                option_b=q['B'],
-                option_c=q['C'],
-                option_d=q['D'],
-                correct_option=q['answer'],
+
+        # Save questions to database in batches, skipping duplicates
+        try:
+            report = ingest_questions(
+                course,
+                questions,
                 source_file=file.name,
-                status='pending',
                 uploaded_by=request.user
             )
-            created_count += 1
-            
+        except DocumentError as e:
+            raise ParseError(str(e))
+        created_count = report['inserted']
+        if not parser.found:
+            raise ParseError("No valid questions found in the document")
+
         # Notify admins
         self.notify_admins(request.user, course, created_count)
-            
+
         return Response({
             "message": f"{created_count} questions uploaded for review",
             "course": course.name,
-            "filename": file.name
+            "filename": file.name,
+            "inserted": report['inserted'],
+            "duplicates": report['duplicates'],
+            "rejected": report['rejected'],
+            "errors": report['errors'],
+            "malformed": parser.errors,
         }, status=status.HTTP_201_CREATED)
 
-    def extract_text(self, file):
-        filename = file.name.lower()
-        file_content = file.read()
-        
-        # Reset file pointer for DOCX processing
-        file.seek(0)
-        
-        if filename.endswith('.pdf'):
-            try:
-                reader = PyPDF2.PdfReader(BytesIO(file_content))
-                return "\n".join([page.extract_text() for page in reader.pages])
-            except Exception as e:
-                raise ParseError(f"PDF processing error: {str(e)}")
-                
-        elif filename.endswith('.docx'):
-            try:
-                doc = Document(BytesIO(file_content))
-                return "\n".join([para.text for para in doc.paragraphs])
-            except Exception as e:
-                raise ParseError(f"DOCX processing error: {str(e)}")
-                
-        elif filename.endswith('.txt'):
-            try:
-                return file_content.decode('utf-8')
-            except Exception as e:
-                raise ParseError(f"Text file processing error: {str(e)}")
-                
-        else:
-            raise ParseError("Unsupported file format. Use PDF, DOCX, or TXT")
-
-    def parse_multichoice_questions(self, text):
-        # Improved regex pattern for multi-line, multi-choice questions
-        pattern = r"""
-            (\d+[\.\)]?)\s*                # Question number (e.g., 1. or 1)
-            (.*?)\s*                       # Question text (non-greedy)
-            a[\.\)]?\s*(.*?)\s*            # Option A
-            b[\.\)]?\s*(.*?)\s*            # Option B
-            c[\.\)]?\s*(.*?)\s*            # Option C
-            d[\.\)]?\s*(.*?)\s*            # Option D
-            (?:answer|ans|correct|corr)    # Answer label
-            [:\s]+([a-dA-D])               # The answer letter
-        """
-        matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE | re.VERBOSE)
-
-        questions = []
-        for match in matches:
-            try:
-                questions.append({
-                    'text': match[1].strip(),
-                    'A': match[2].strip(),
-                    'B': match[3].strip(),
-                    'C': match[4].strip(),
-                    'D': match[5].strip(),
-                    'answer': match[6].upper()
-                })
-            except IndexError:
-                continue
-
-        if not questions:
-            raise ParseError("No valid questions found in the document")
-
-        return questions
+    def extract_pages(self, file):
+        try:
+            return ExtractedPages(file, file.name)
+        except DocumentError as e:
+            raise ParseError(str(e))
 
     def notify_admins(self, user, course, count):
-        admin_emails = User.objects.filter(
-            is_staff=True
-        ).values_list('email', flat=True)
-        
-        if admin_emails and count > 0:
-            subject = f"New Questions Pending Approval for {course.name}"
-            message = f"User {user.username} uploaded {count} questions for course: {course.name}. Please review them in the admin panel."
-            
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    settings.EMAIL_HOST_USER,
-                    admin_emails,
-                    fail_silently=True
-                )
-            except Exception as e:
-                print(f"Failed to send email notification: {str(e)}")
+        notify_admins_of_upload(user, course, count)
 
 
-    
     def patch(self, request, question_id):
         question = get_object_or_404(Question, id=question_id)
         new_status = request.data.get('status')
@@ -609,6 +697,59 @@ class UploadPassQuestionsView(APIView):
         })
     
 
+class UploadPassQuestionsJobView(APIView):
+    """
+    Store an uploaded past-question document and queue it for parsing.
+    Returns a job id straight away; poll JobStatusAPIView for the result.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        serializer = BulkQuestionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        file = serializer.validated_data['file']
+        course = get_object_or_404(Course, id=serializer.validated_data['course_id'])
+        question_type = serializer.validated_data['question_type']
+        # Checked before anything is stored: the job only parses multichoice
+        if question_type != 'multichoice':
+            return Response(
+                {"error": "Only multiple choice questions are currently supported"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not file.name.lower().endswith(parsing.SUPPORTED_EXTENSIONS):
+            raise ParseError("Unsupported file format. Use PDF, DOCX, or TXT")
+
+        extension = os.path.splitext(file.name)[1].lower()
+        stored_name = upload_storage.save(f"{uuid.uuid4().hex}{extension}", file)
+        job = jobs.enqueue(
+            'parse_questions',
+            {
+                'stored_name': stored_name,
+                'filename': file.name,
+                'course_id': course.id,
+                'question_type': question_type,
+                'user_id': request.user.id,
+            },
+            user=request.user
+        )
+        return Response({
+            "job_id": job.id,
+            "status": job.status,
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class JobStatusAPIView(generics.RetrieveAPIView):
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return BackgroundJob.objects.all()
+        return BackgroundJob.objects.filter(created_by=self.request.user)
+
+
 # views.py
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -621,3 +762,15 @@ def user_upload_stats(request):
     return Response({
         'approved_uploads': approved_count
     })
+
+
+class ChatMetricsAPIView(APIView):
+    """
+    Chat backpressure counters of the process serving this request
+    (exams/chat.py).  Only meaningful when the ASGI server that runs the
+    chat sockets also serves HTTP, as test_portal/asgi.py does.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(chat_metrics.snapshot())
@@ -3,7 +3,7 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from django.urls import path
-from exams.consumers import ChatConsumer
+from exams.consumers import ChatConsumer, GroupTestProgressConsumer
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_portal.settings')
 
@@ -14,6 +14,8 @@ application = ProtocolTypeRouter({
     'websocket': AuthMiddlewareStack(
         URLRouter([
             path('ws/chat/', ChatConsumer.as_asgi()),
+            path('ws/chat/<str:kind>/<int:pk>/', ChatConsumer.as_asgi()),
+            path('ws/group-test/<int:pk>/progress/', GroupTestProgressConsumer.as_asgi()),
         ])
     ),
 })
@@ -145,7 +145,10 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    # Resumable material uploads
+    'content-range',
 ]
+CORS_EXPOSE_HEADERS = ['range']
 
 #
 # Static files
@@ -156,11 +159,158 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 #
 # Channels
 #
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+# Chat rooms are per course and per group test (exams/consumers.py).  With
+# REDIS_URL set, rooms fan out across processes through Redis pub/sub;
+# CHANNEL_REDIS_HOSTS (comma-separated) shards rooms over several servers.
+# Without Redis the in-process layer (exams/channel_layers.py) serves a
+# single process.
+CHANNEL_LAYER_CAPACITY = int(os.getenv('CHANNEL_LAYER_CAPACITY', 100))
+if os.getenv('REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': os.getenv(
+                'CHANNEL_LAYER_BACKEND', 'channels_redis.pubsub.RedisPubSubChannelLayer'
+            ),
+            'CONFIG': {
+                'hosts': os.getenv('CHANNEL_REDIS_HOSTS', os.getenv('REDIS_URL')).split(','),
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'exams.channel_layers.LocalChannelLayer',
+            'CONFIG': {'capacity': CHANNEL_LAYER_CAPACITY},
+        }
+    }
+
+# Route start-test, submit-test and group-test/<pk>/ to the async views in
+# exams/async_views.py; turn on when serving through test_portal.asgi
+ASYNC_EXAM_VIEWS = os.getenv('ASYNC_EXAM_VIEWS', 'false').lower() in ('1', 'true', 'yes')
+
+# Chat backpressure (exams/consumers.py): per-connection token bucket,
+# inbound frame limit, and outbound batching every CHAT_FLUSH_MS (0 = off)
+CHAT_RATE_PER_SECOND = float(os.getenv('CHAT_RATE_PER_SECOND', 2))
+CHAT_RATE_BURST = int(os.getenv('CHAT_RATE_BURST', 5))
+CHAT_MAX_FRAME_BYTES = int(os.getenv('CHAT_MAX_FRAME_BYTES', 4096))
+CHAT_FLUSH_MS = int(os.getenv('CHAT_FLUSH_MS', 100))
+CHAT_MAX_QUEUED = int(os.getenv('CHAT_MAX_QUEUED', 200))
+
+# Live group test progress (exams/progress.py): aggregates are pushed at
+# most every BATCH_MS, and re-read every REFRESH_SECONDS even without events.
+GROUP_TEST_PROGRESS_BATCH_MS = int(os.getenv('GROUP_TEST_PROGRESS_BATCH_MS', 300))
+GROUP_TEST_PROGRESS_REFRESH_SECONDS = 5
+GROUP_TEST_PROGRESS_CLOCK_SECONDS = 1
+
+#
+# Cache
+#
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
     }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Extracted page text of uploaded documents, keyed by content hash
+CACHES['extraction'] = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': os.getenv('EXTRACTION_CACHE_DIR', str(BASE_DIR / 'cache' / 'extraction')),
+    'OPTIONS': {'MAX_ENTRIES': 2000},
 }
+EXTRACTION_CACHE = 'extraction'
+EXTRACTION_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+# PDF pages handed to each process-pool task during extraction
+PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', 8))
+
+# Approved-question id pools (see exams/question_pool.py).  With Redis the
+# pools are shared, so every worker sees invalidations; the per-process
+# backend can only expire them.
+QUESTION_POOL_BACKEND = os.getenv(
+    'QUESTION_POOL_BACKEND',
+    'exams.question_pool.CachePoolBackend' if os.getenv('REDIS_URL')
+    else 'exams.question_pool.LocalMemoryPoolBackend',
+)
+QUESTION_POOL_CACHE = 'default'
+QUESTION_POOL_TIMEOUT = 60 * 60
+QUESTION_POOL_LOCAL_TIMEOUT = int(os.getenv('QUESTION_POOL_LOCAL_TIMEOUT', 60))
+
+# Questions inserted per bulk INSERT when ingesting past-paper uploads
+QUESTION_UPLOAD_BATCH_SIZE = int(os.getenv('QUESTION_UPLOAD_BATCH_SIZE', 500))
+
+# Material search (see exams/search.py).  Leave the backend empty to pick
+# Postgres full-text, SQLite FTS5 or the in-process index automatically.
+MATERIAL_SEARCH_BACKEND = os.getenv('MATERIAL_SEARCH_BACKEND', '')
+MATERIAL_SEARCH_MAX_RESULTS = int(os.getenv('MATERIAL_SEARCH_MAX_RESULTS', 500))
+MATERIAL_SEARCH_MIN_PREFIX = 2
+MATERIAL_AUTOCOMPLETE_LIMIT = 10
+
+# Material files (see exams/storage_backends.py).  USE_LOCAL_BUCKET keeps
+# them under LOCAL_BUCKET_ROOT instead of GCS, for tests and development
+# without credentials; the GCS client is only built on first use.
+USE_LOCAL_BUCKET = os.getenv('USE_LOCAL_BUCKET', 'false').lower() in ('1', 'true', 'yes')
+LOCAL_BUCKET_ROOT = os.getenv('LOCAL_BUCKET_ROOT', str(BASE_DIR / 'uploads' / 'bucket'))
+LOCAL_BUCKET_URL = '/media/bucket/'
+MATERIAL_STORAGE = os.getenv('MATERIAL_STORAGE', (
+    'exams.storage_backends.LocalMediaStorage' if USE_LOCAL_BUCKET
+    else 'exams.storage_backends.GoogleCloudMediaStorage'
+))
+# Connections kept open to storage.googleapis.com per process
+GCS_HTTP_POOL_SIZE = int(os.getenv('GCS_HTTP_POOL_SIZE', 10))
+GCS_HTTP_RETRIES = int(os.getenv('GCS_HTTP_RETRIES', 3))
+# Serve materials through V4 signed URLs instead of public bucket URLs.
+# Each URL is reused until REFRESH_SECONDS before it expires.
+GCS_SIGNED_URLS = os.getenv('GCS_SIGNED_URLS', 'false').lower() in ('1', 'true', 'yes')
+GCS_SIGNED_URL_SECONDS = int(os.getenv('GCS_SIGNED_URL_SECONDS', 60 * 60))
+GCS_SIGNED_URL_REFRESH_SECONDS = 5 * 60
+# Material previews (see exams/previews.py): leading text kept for search
+# results and the index, and the thumbnail's longest side in pixels
+MATERIAL_PREVIEW_TEXT_BYTES = int(os.getenv('MATERIAL_PREVIEW_TEXT_BYTES', 8 * 1024))
+MATERIAL_THUMBNAIL_SIZE = 320
+MATERIAL_PREVIEW_SNIPPET_CHARS = 280
+MATERIAL_PREVIEW_CACHE_SECONDS = 60 * 60
+# Per-process blob metadata cache (see exams/blob_cache.py)
+BLOB_CACHE_SECONDS = int(os.getenv('BLOB_CACHE_SECONDS', 10 * 60))
+BLOB_CACHE_MAX_ENTRIES = int(os.getenv('BLOB_CACHE_MAX_ENTRIES', 10000))
+
+# Resumable material uploads (see exams/uploads.py).  Chunks go straight
+# to the bucket; exams.uploads.LocalUploadTarget keeps objects under
+# LOCAL_BUCKET_ROOT and takes the chunks itself, for working offline.
+MATERIAL_UPLOAD_TARGET = os.getenv('MATERIAL_UPLOAD_TARGET', (
+    'exams.uploads.LocalUploadTarget' if USE_LOCAL_BUCKET
+    else 'exams.uploads.GcsUploadTarget'
+))
+# GCS only accepts chunks in multiples of 256 KiB
+MATERIAL_UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024
+MATERIAL_UPLOAD_MAX_BYTES = int(os.getenv('MATERIAL_UPLOAD_MAX_BYTES', 2 * 1024 ** 3))
+MATERIAL_UPLOAD_SESSION_HOURS = 24
+# Finished and aborted upload rows are kept this long (expire_material_uploads)
+MATERIAL_UPLOAD_RETENTION_DAYS = 7
+
+# How long a user's dashboard rank may be served from cache
+USER_RANK_CACHE_SECONDS = int(os.getenv('USER_RANK_CACHE_SECONDS', 30))
+
+# Pre-built group test papers (exams/papers.py): participants are spread
+# over this many shuffled variants, cached until the test ends plus grace.
+GROUP_TEST_PAPER_VARIANTS = int(os.getenv('GROUP_TEST_PAPER_VARIANTS', 4))
+GROUP_TEST_PAPER_CACHE_GRACE = 60 * 60
+
+#
+# Background jobs (exams/jobs.py, run with `manage.py run_jobs`)
+#
+JOB_UPLOAD_DIR = os.getenv('JOB_UPLOAD_DIR', str(BASE_DIR / 'uploads' / 'jobs'))
+JOB_WORKER_PROCESSES = int(os.getenv('JOB_WORKER_PROCESSES', 2))
+JOB_WORKER_THREADS = int(os.getenv('JOB_WORKER_THREADS', 2))
+# A claimed job still running this long lost its worker and is retried
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 60 * 60))
+JOB_MAX_ATTEMPTS = 3
 
 #
 # Internationalization
@@ -173,7 +323,7 @@ USE_TZ = True
 #
 # Email Configuration
 #
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 465
 EMAIL_USE_TLS = False
@@ -182,6 +332,13 @@ EMAIL_HOST_USER = 'thecbsteam8@gmail.com'
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_PASSWORD' ) # CHANGE THIS IMMEDIATELY!
 DEFAULT_FROM_EMAIL = 'Petrox Assessment <thecbsteam8@gmail.com>'
 
+# Email outbox (exams/outbox.py, delivered by `manage.py send_outbox`)
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 50))
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_SECONDS = 60
+OUTBOX_LEASE_SECONDS = 5 * 60
+OUTBOX_RENDER_CACHE_SECONDS = 24 * 60 * 60
+
 # Frontend domain for email links
 FRONTEND_DOMAIN = 'http://localhost:3000'  # Change in production
 
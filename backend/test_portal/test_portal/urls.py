@@ -1,5 +1,7 @@
 # test_portal/urls.py
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -17,4 +19,8 @@ urlpatterns = [
 
     # All other exam-related API routes under /api/
     path('api/', include('exams.urls')),
-]
\ No newline at end of file
+]
+
+# Serve the local stand-in bucket in development
+if settings.USE_LOCAL_BUCKET:
+    urlpatterns += static(settings.LOCAL_BUCKET_URL, document_root=settings.LOCAL_BUCKET_ROOT)
@@ -27,6 +27,9 @@ export default function GroupTestPage() {
   const [error, setError] = useState('');
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [score, setScore] = useState(null);
+  // Live feed from ws/group-test/<id>/progress/; `reloadKey` refetches on start
+  const [progress, setProgress] = useState(null);
+  const [reloadKey, setReloadKey] = useState(0);
 
   // Helper: compute how many whole seconds between now and a given Date object
   const computeSecondsBetween = (futureDate) => {
@@ -219,6 +222,36 @@ export default function GroupTestPage() {
     };
 
     fetchTest();
+  }, [testId, reloadKey]);
+
+  // Server-pushed start signal, countdown and progress instead of polling
+  useEffect(() => {
+    const wsUrl = process.env.REACT_APP_WS_URL || `ws://${window.location.host}`;
+    const socket = new WebSocket(`${wsUrl}/ws/group-test/${testId}/progress/`);
+
+    socket.onmessage = (e) => {
+      let data;
+      try {
+        data = JSON.parse(e.data);
+      } catch (err) {
+        return;
+      }
+      if ((data.type === 'state' || data.type === 'clock') && data.phase === 'waiting') {
+        setTimeLeft(data.seconds_to_start);
+      }
+      if (data.type === 'state' && data.progress) {
+        setProgress(data.progress);
+      }
+      if (data.type === 'progress') {
+        setProgress({ joined: data.joined, submitted: data.submitted, distribution: data.distribution });
+      }
+      if (data.type === 'start') {
+        // Fetch the questions and session now that the test has started
+        setReloadKey((k) => k + 1);
+      }
+    };
+
+    return () => socket.close();
   }, [testId]);
 
   // PHASE-0 TIMER: countdown to start
@@ -335,6 +368,9 @@ export default function GroupTestPage() {
             <p className="text-sm text-gray-500 mb-2">Time until test starts</p>
             <p className="text-4xl font-bold text-blue-600">{formatTime(timeLeft)}</p>
           </div>
+          {progress && (
+            <p className="text-sm text-gray-500 mt-4">{progress.joined} joined · {progress.submitted} submitted</p>
+          )}
         </div>
 
         <div className="bg-white rounded-xl shadow-sm p-6 mb-8 text-left">
@@ -431,12 +467,15 @@ export default function GroupTestPage() {
               {formatTime(groupTest?.duration_minutes * 60 || 0)}
             </p>
           </div>
+          {progress && (
+            <p className="text-sm text-gray-500 mt-4">{progress.joined} joined · {progress.submitted} submitted</p>
+          )}
         </div>
 
         <div className="mb-8 bg-white rounded-xl shadow-sm p-6 text-left">
           <h3 className="font-bold text-lg text-gray-800 mb-4">Instructions</h3>
           <ul className="list-disc pl-5 space-y-2 text-gray-600">
-            <li style={{color:'green', fontSize:'20px', fontWeight:'700'}}>Refresh your window to start the test</li>
+            <li>Questions load automatically when the test starts</li>
             <li>This test has {questions.length} multiple-choice questions</li>
             <li>You have {groupTest?.duration_minutes || 0} minutes to complete the test</li>
             <li>Answers are saved automatically as you progress</li>
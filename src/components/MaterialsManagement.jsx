@@ -41,6 +41,85 @@ export default function MaterialsManagement() {
     setDownloadedMaterials(savedDownloads);
   }, []);
 
+  // Files up to this size are hashed first so a copy of a stored file
+  // isn't uploaded again
+  const HASH_LIMIT = 100 * 1024 * 1024;
+
+  const sha256Of = async (blob) => {
+    if (blob.size > HASH_LIMIT || !window.crypto?.subtle) {
+      return undefined;
+    }
+    const digest = await window.crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+    return Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('');
+  };
+
+  // Resumable upload: the file goes to the bucket in chunks and the
+  // material is only created once every byte has arrived.
+  const uploadInChunks = async (token) => {
+    const api = 'http://127.0.0.1:8000/api/materials/uploads/';
+    const session = await fetch(api, {
+      method: 'POST',
+      headers: {
+        'Authorization': `Bearer ${token}`,
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify({
+        course: selectedCourseId,
+        name: materialName,
+        tags,
+        filename: file.name,
+        size: file.size,
+        content_type: file.type,
+        sha256: await sha256Of(file)
+      })
+    });
+    if (!session.ok) {
+      throw new Error('Could not start upload');
+    }
+    const upload = await session.json();
+    if (upload.status === 'complete') {
+      // Already stored: nothing to send
+      return complete(upload.id, token);
+    }
+    // Our chunk endpoint needs the token; a GCS session URL must not get it
+    const chunkHeaders = upload.upload_url.startsWith(api) ? { 'Authorization': `Bearer ${token}` } : {};
+
+    let offset = 0;
+    while (offset < file.size) {
+      const end = Math.min(offset + upload.chunk_size, file.size);
+      const response = await fetch(upload.upload_url, {
+        method: 'PUT',
+        headers: {
+          ...chunkHeaders,
+          'Content-Range': `bytes ${offset}-${end - 1}/${file.size}`
+        },
+        body: file.slice(offset, end)
+      });
+      if (response.status === 308 || response.status === 409) {
+        // Carry on from whatever the server says it has
+        const range = response.headers.get('Range');
+        offset = range ? Number(range.split('-')[1]) + 1 : 0;
+      } else if (response.ok) {
+        offset = end;
+      } else {
+        throw new Error('Chunk upload failed');
+      }
+    }
+
+    return complete(upload.id, token);
+  };
+
+  const complete = async (uploadId, token) => {
+    const response = await fetch(`http://127.0.0.1:8000/api/materials/uploads/${uploadId}/complete/`, {
+      method: 'POST',
+      headers: { 'Authorization': `Bearer ${token}` }
+    });
+    if (!response.ok) {
+      throw new Error('Upload failed');
+    }
+    return response.json();
+  };
+
   const handleUpload = async () => {
     if (!selectedCourseId || !materialName || !file) {
       alert('Please fill all required fields');
@@ -48,27 +127,9 @@ export default function MaterialsManagement() {
     }
 
     setIsUploading(true);
-    
-    const formData = new FormData();
-    formData.append('course', selectedCourseId);
-    formData.append('name', materialName);
-    formData.append('tags', tags);
-    formData.append('file', file);
 
     try {
-      const response = await fetch('http://127.0.0.1:8000/api/materials/upload/', {
-        method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('access_token')}`
-        },
-        body: formData,
-      });
-
-      if (!response.ok) {
-        throw new Error('Upload failed');
-      }
-
-      const data = await response.json();
+      const data = await uploadInChunks(localStorage.getItem('access_token'));
       setUploadedMaterials([data, ...uploadedMaterials]);
       
       // Reset form
@@ -481,7 +542,16 @@ export default function MaterialsManagement() {
                     className="border border-indigo-100 rounded-lg md:rounded-2xl overflow-hidden hover:shadow-md md:hover:shadow-lg transition-all bg-white flex flex-col"
                   >
                     <div className="p-3 md:p-4 bg-gradient-to-r from-indigo-50 to-purple-50 flex justify-center">
-                      {getFileIcon(material.name)}
+                      {material.thumbnail_url ? (
+                        <img
+                          src={material.thumbnail_url}
+                          alt=""
+                          loading="lazy"
+                          className="h-24 md:h-32 object-contain rounded"
+                        />
+                      ) : (
+                        getFileIcon(material.name)
+                      )}
                     </div>
                     <div className="p-3 md:p-4 flex-grow">
                       <h4 className="font-bold text-gray-800 mb-1 truncate text-sm md:text-base" title={material.name}>
@@ -502,6 +572,11 @@ export default function MaterialsManagement() {
                           ))}
                         </div>
                       )}
+                      {material.preview && (
+                        <p className="text-[10px] md:text-xs text-gray-600 mb-2 line-clamp-3">
+                          {material.preview}
+                        </p>
+                      )}
                       <p className="text-[10px] md:text-xs text-gray-500 mt-1 md:mt-2 flex items-center">
                         <svg xmlns="http://www.w3.org/2000/svg" className="h-2.5 w-2.5 md:h-3 md:w-3 mr-1" fill="none" viewBox="0 0 24 24" stroke="currentColor">
                           <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M12 8v4l3 3m6-3a9 9 0 11-18 0 9 9 0 0118 0z" />
@@ -1,9 +1,11 @@
 import React, { useState, useEffect, useRef, useCallback } from 'react';
 
-export default function Chat() {
+// `room` is e.g. 'course/12' or 'group-test/3'; omit it for the lobby.
+export default function Chat({ room, title = 'Group Chat' }) {
   const [messages, setMessages] = useState([]);
   const [message, setMessage] = useState('');
   const [isConnected, setIsConnected] = useState(false);
+  const [notice, setNotice] = useState('');
   const ws = useRef(null);
   const username = localStorage.getItem('username') || 'Anonymous';
 
@@ -12,13 +14,21 @@ export default function Chat() {
     
     // Use fallback URL if env variable is missing
     const wsUrl = process.env.REACT_APP_WS_URL || `ws://${window.location.host}`;
-    ws.current = new WebSocket(`${wsUrl}/ws/chat/`);
+    ws.current = new WebSocket(room ? `${wsUrl}/ws/chat/${room}/` : `${wsUrl}/ws/chat/`);
 
     ws.current.onopen = () => setIsConnected(true);
     ws.current.onmessage = (e) => {
       try {
         const data = JSON.parse(e.data);
-        setMessages(m => [...m, data]);
+        if (data.type === 'batch') {
+          // The server coalesces messages into one frame per tick
+          setMessages(m => [...m, ...data.messages]);
+        } else if (data.type === 'error') {
+          setNotice(data.error);
+          setTimeout(() => setNotice(''), 3000);
+        } else {
+          setMessages(m => [...m, data]);
+        }
       } catch (error) {
         console.error('Error parsing message:', error);
       }
@@ -30,7 +40,7 @@ export default function Chat() {
       setTimeout(connectWS, 3000);
     };
     ws.current.onclose = () => setIsConnected(false);
-  }, []);
+  }, [room]);
 
   useEffect(() => {
     connectWS();
@@ -46,14 +56,14 @@ export default function Chat() {
     e.preventDefault();
     if (!message.trim() || !ws.current || ws.current.readyState !== WebSocket.OPEN) return;
     
-    const payload = JSON.stringify({ username, text: message });
+    const payload = JSON.stringify({ username, message });
     ws.current.send(payload);
     setMessage('');
   };
 
   return (
     <div className="max-w-2xl mx-auto bg-white rounded-xl shadow p-6">
-      <h2 className="text-xl font-bold mb-4 text-blue-600">Group Chat</h2>
+      <h2 className="text-xl font-bold mb-4 text-blue-600">{title}</h2>
       <div className="mb-2 text-sm">
         {isConnected ? (
           <span className="text-green-500">🟢 Connected</span>
@@ -67,11 +77,12 @@ export default function Chat() {
         ) : (
           messages.map((msg, i) => (
             <div key={i} className="">
-              <span className="font-semibold">{msg.username}:</span> {msg.text}
+              <span className="font-semibold">{msg.username}:</span> {msg.message}
             </div>
           ))
         )}
       </div>
+      {notice && <div className="mb-2 text-sm text-red-500">{notice}</div>}
       <form onSubmit={sendMsg} className="flex space-x-2">
         <input
           type="text"